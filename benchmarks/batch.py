@@ -0,0 +1,42 @@
+from typing import List
+
+from pylspci.batch import parse_many
+
+DEVICE: str = """Slot:	{bus:02x}:{device:02x}.{function}
+Class:	PCI bridge [0604]
+Vendor:	Intel Corporation [8086]
+Device:	82801 PCI Bridge [244e]
+SVendor:	Intel Corporation [8086]
+SDevice:	82801 PCI Bridge [244e]
+Rev:	d5
+Driver:	pcieport
+Module:	shpchp
+NUMANode:	0
+IOMMUGroup:	{bus}
+
+"""
+
+
+def make_output(count: int) -> str:
+    """
+    Build an output of lspci -vvvmmnnk as saved from a single machine.
+    """
+    return ''.join(
+        DEVICE.format(bus=i >> 5, device=i & 0x1f, function=i % 8)
+        for i in range(count)
+    )
+
+
+class ParseManySuite(object):
+    """
+    Throughput of batch parsing, depending on the number of processes.
+    """
+
+    params = [1, 2, 4]
+    param_names = ['workers']
+
+    def setup(self, workers: int) -> None:
+        self.outputs: List[str] = [make_output(60)] * 400
+
+    def time_parse_many(self, workers: int) -> None:
+        parse_many(texts=self.outputs, workers=workers, chunksize=25)
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from typing import List
+
+from pylspci.cache import LspciCache, SysfsInvalidator
+
+# Stands for a call to lspci, which may not be installed
+COMMAND: List[str] = [sys.executable, '-c', 'print("00:00.0")']
+
+
+def call() -> str:
+    return subprocess.check_output(COMMAND, universal_newlines=True)
+
+
+class LspciCacheSuite(object):
+    """
+    Reusing a cached output, compared with starting a new process.
+    """
+
+    def setup(self) -> None:
+        self.cache = LspciCache(ttl=3600)
+        self.cache.get(COMMAND, call)
+        self.hotplug_cache = LspciCache(ttl=3600)
+        self.hotplug_cache.add_invalidator(SysfsInvalidator())
+        self.hotplug_cache.get(COMMAND, call)
+
+    def time_call(self) -> None:
+        call()
+
+    def time_hit(self) -> None:
+        self.cache.get(COMMAND, call)
+
+    def time_hit_with_sysfs_invalidator(self) -> None:
+        self.hotplug_cache.get(COMMAND, call)
@@ -0,0 +1,37 @@
+import struct
+
+from pylspci.capabilities import ConfigSpace
+
+
+def make_config() -> bytes:
+    """
+    Build a 4096-byte configuration space with PCI Express, MSI-X
+    and SR-IOV capabilities.
+    """
+    config = bytearray(4096)
+    struct.pack_into('<HHHH', config, 0, 0x15b3, 0x1017, 0x0406, 0x0010)
+    config[0x34] = 0x60
+    struct.pack_into('<BBH', config, 0x60, 0x10, 0x9c, 0x0002)
+    struct.pack_into('<BBHII', config, 0x9c, 0x11, 0x00, 0x803f, 0, 0)
+    struct.pack_into('<I', config, 0x100, 0x0010 | 1 << 16)
+    return bytes(config)
+
+
+class ConfigSpaceSuite(object):
+    """
+    Walking the capability lists and decoding capabilities.
+    """
+
+    def setup(self) -> None:
+        self.data = make_config()
+
+    def time_capabilities(self) -> None:
+        ConfigSpace(self.data).capabilities
+
+    def time_decode_all(self) -> None:
+        config = ConfigSpace(self.data)
+        config.pci_express
+        config.msi
+        config.msix
+        config.sriov
+        config.acs
@@ -0,0 +1,33 @@
+from pylspci.command import CommandBuilder, IDResolveOption, lspci_args
+
+
+class CommandSuite(object):
+    """
+    Building lspci command lines, which happens before each call to lspci.
+    """
+
+    def time_lspci_args(self) -> None:
+        lspci_args()
+
+    def time_lspci_args_full(self) -> None:
+        lspci_args(
+            access_method='linux-sysfs',
+            pcilib_params={'dump.name': 'dump.txt'},
+            verbose=True,
+            kernel_drivers=True,
+            bridge_paths=True,
+            hide_single_domain=False,
+            id_resolve_option=IDResolveOption.Both,
+            slot_filter='*:1c.*',
+            device_filter='8086::0604',
+        )
+
+    def time_builder(self) -> None:
+        CommandBuilder() \
+            .use_access_method('linux-sysfs') \
+            .include_kernel_drivers() \
+            .include_bridge_paths() \
+            .with_ids() \
+            .slot_filter('*:1c.*') \
+            .device_filter('8086::0604') \
+            .with_default_parser()
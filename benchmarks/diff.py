@@ -0,0 +1,21 @@
+from benchmarks.table import make_devices
+from pylspci.diff import diff
+
+
+class DiffSuite(object):
+    """
+    Comparing fleet-sized snapshots with a few changes.
+    """
+
+    def setup(self) -> None:
+        self.old = make_devices(10000)
+        self.new = list(self.old)
+        for i in range(0, len(self.new), 100):
+            self.new[i] = self.new[i]._replace(driver='vfio-pci')
+        del self.new[-10:]
+
+    def time_diff_same(self) -> None:
+        diff(self.old, self.old)
+
+    def time_diff_changed(self) -> None:
+        diff(self.old, self.new)
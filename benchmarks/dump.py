@@ -0,0 +1,46 @@
+import os
+import tempfile
+from pathlib import Path
+
+from pylspci.dump import DumpReader
+
+HEADER: str = """{bus:02x}:{device:02x}.{function} Host bridge: Intel
+00: 86 80 04 59 06 00 90 20 02 00 00 06 00 00 00 00
+10: 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00
+20: 00 00 00 00 00 00 00 00 00 00 00 00 aa 17 4f 22
+30: 00 00 00 00 e0 00 00 00 00 00 00 00 00 00 00 00
+{extra}
+"""
+
+EXTRA: str = ''.join(
+    '{:02x}: {}\n'.format(offset, ' '.join(['00'] * 16))
+    for offset in range(0x40, 0x100, 0x10)
+)
+
+
+class DumpReaderSuite(object):
+    """
+    Reading a large archive of hex dumps, from lspci -x and lspci -xxx.
+    """
+
+    params = ['x', 'xxx']
+    param_names = ['mode']
+
+    def setup(self, mode: str) -> None:
+        fd, name = tempfile.mkstemp()
+        self.path = Path(name)
+        with os.fdopen(fd, 'w') as f:
+            for i in range(5000):
+                f.write(HEADER.format(
+                    bus=i >> 8 & 0xff,
+                    device=i >> 3 & 0x1f,
+                    function=i & 7,
+                    extra=EXTRA if mode == 'xxx' else '',
+                ))
+        self.reader = DumpReader(self.path)
+
+    def teardown(self, mode: str) -> None:
+        self.path.unlink()
+
+    def time_read_devices(self, mode: str) -> None:
+        self.reader.read_devices()
@@ -0,0 +1,64 @@
+import tracemalloc
+from typing import List
+
+from pylspci.fields import NameWithID, Slot
+
+SLOTS: List[str] = [
+    '0000:{:02x}:{:02x}.{}'.format(bus, device, function)
+    for bus in range(4)
+    for device in range(0x20)
+    for function in range(2)
+]
+
+NAMES: List[str] = [
+    'Intel Corporation [8086]',
+    'PCI bridge [0604]',
+    '82801 PCI Bridge [244e]',
+    'Ethernet controller [0200]',
+    'Advanced Micro Devices, Inc. [AMD/ATI] [1002]',
+] * 50
+
+
+class FieldsSuite(object):
+    """
+    Parsing slots and names, with the instance cache warmed up by a previous
+    scan, compared with parsing every string again.
+    """
+
+    def setup(self) -> None:
+        for value in SLOTS:
+            Slot(value)
+        for name in NAMES:
+            NameWithID(name)
+
+    def time_slot(self) -> None:
+        for value in SLOTS:
+            Slot(value)
+
+    def time_slot_uncached(self) -> None:
+        parse = Slot._parse.__wrapped__  # type: ignore
+        for value in SLOTS:
+            parse(Slot, value)
+
+    def time_name_with_id(self) -> None:
+        for name in NAMES:
+            NameWithID(name)
+
+    def time_name_with_id_uncached(self) -> None:
+        parse = NameWithID._parse.__wrapped__  # type: ignore
+        for name in NAMES:
+            parse(NameWithID, name)
+
+    def track_names_memory(self) -> int:
+        """
+        Memory used by the names of 250 devices, in bytes.
+        """
+        NameWithID._parse.cache_clear()  # type: ignore
+        tracemalloc.start()
+        names = [NameWithID(name) for name in NAMES]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del names
+        return size
+
+    track_names_memory.unit = 'bytes'  # type: ignore
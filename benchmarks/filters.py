@@ -0,0 +1,41 @@
+from benchmarks.table import make_devices
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
+
+
+class FilterParseSuite(object):
+    """
+    Parsing slot and device filters, as given to lspci -s and -d.
+    """
+
+    def time_slot_filter_parse(self) -> None:
+        SlotFilter.parse('0000:00:1c.3')
+
+    def time_slot_filter_parse_wildcards(self) -> None:
+        SlotFilter.parse('*:1c.*')
+
+    def time_device_filter_parse(self) -> None:
+        DeviceFilter.parse('8086:244e:0604')
+
+    def time_device_filter_parse_wildcards(self) -> None:
+        DeviceFilter.parse('10de::')
+
+
+class DeviceQuerySuite(object):
+    """
+    Applying slot and device filters to devices, as done when reading
+    devices without lspci.
+    """
+
+    params = [1000, 100000]
+    param_names = ['devices']
+    timeout = 300
+
+    def setup(self, count: int) -> None:
+        self.devices = make_devices(count)
+        self.query = DeviceQuery(
+            slot_filter=SlotFilter.parse('*:1c.*'),
+            device_filter=DeviceFilter.parse('8086::'),
+        )
+
+    def time_filter(self, count: int) -> None:
+        self.query.filter(self.devices)
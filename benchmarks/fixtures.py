@@ -0,0 +1,59 @@
+"""
+Generated lspci outputs of various sizes, shared by the benchmarks.
+"""
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+
+from benchmarks.table import VENDORS
+
+SIZES: List[int] = [10, 1000, 100000]
+"""
+Numbers of devices in the generated outputs: a laptop, a large server,
+and a fleet of hosts gathered in a single output.
+"""
+
+
+def _devices(count: int) -> Iterator[Tuple[int, str, str, str, str, str]]:
+    """
+    Generate the fields of devices with a realistic amount of repeated names,
+    like :func:`benchmarks.table.make_devices`, without building devices.
+    """
+    for i in range(count):
+        yield (
+            i,
+            '{:04x}:{:02x}:{:02x}.{}'.format(
+                i >> 13, (i >> 5) & 0xff, i & 0x1f, i % 8),
+            'Class number {} [{:04x}]'.format(i % 16, 0x0100 + i % 16),
+            VENDORS[i % len(VENDORS)],
+            'Device number {} [{:04x}]'.format(i % 64, 0x1000 + i % 64),
+            'Subsystem [{:04x}]'.format(0x2000 + i % 32),
+        )
+
+
+@lru_cache(maxsize=None)
+def simple_output(count: int) -> str:
+    """
+    Generate the output of ``lspci -mmnn`` for a number of devices.
+    """
+    return ''.join(
+        '{} "{}" "{}" "{}" -r{:02x} "{}" "{}"\n'.format(
+            slot, cls, vendor, device, i % 4, vendor, subsystem)
+        for i, slot, cls, vendor, device, subsystem in _devices(count)
+    )
+
+
+@lru_cache(maxsize=None)
+def verbose_output(count: int) -> str:
+    """
+    Generate the output of ``lspci -vvvmmnnk`` for a number of devices.
+    """
+    return ''.join(
+        'Slot:\t{}\nClass:\t{}\nVendor:\t{}\nDevice:\t{}\n'
+        'SVendor:\t{}\nSDevice:\t{}\nRev:\t{:02x}\n'
+        'Driver:\tdriver{}\nModule:\tdriver{}\nModule:\tmodule\n'
+        'NUMANode:\t{}\nIOMMUGroup:\t{}\n\n'.format(
+            slot, cls, vendor, device, vendor, subsystem, i % 4,
+            i % 16, i % 16, i % 2, i,
+        )
+        for i, slot, cls, vendor, device, subsystem in _devices(count)
+    )
@@ -0,0 +1,47 @@
+import random
+from typing import List
+
+from benchmarks.table import make_devices
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
+from pylspci.index import DeviceIndex
+
+
+class DeviceIndexSuite(object):
+    """
+    Answering many queries about one scan, from a DeviceIndex
+    or by checking every device.
+    """
+
+    params = [100, 1000]
+    param_names = ['devices']
+
+    def setup(self, count: int) -> None:
+        self.devices = make_devices(count)
+        self.index = DeviceIndex(self.devices)
+        rng = random.Random(42)
+        self.queries: List[DeviceQuery] = []
+        for _ in range(500):
+            self.queries.append(DeviceQuery(device_filter=DeviceFilter(
+                vendor=0x8086, device=rng.randrange(64))))
+            self.queries.append(DeviceQuery(slot_filter=SlotFilter(
+                bus=rng.randrange(32), device=rng.randrange(32))))
+        self.numa_nodes = [rng.randrange(2) for _ in range(1000)]
+
+    def time_build_index(self, count: int) -> None:
+        DeviceIndex(self.devices)
+
+    def time_queries_scan(self, count: int) -> None:
+        for query in self.queries:
+            query.filter(self.devices)
+
+    def time_queries_index(self, count: int) -> None:
+        for query in self.queries:
+            self.index.query(query)
+
+    def time_numa_node_scan(self, count: int) -> None:
+        for node in self.numa_nodes:
+            [device for device in self.devices if device.numa_node == node]
+
+    def time_numa_node_index(self, count: int) -> None:
+        for node in self.numa_nodes:
+            self.index.by_numa_node(node)
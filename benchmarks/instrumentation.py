@@ -0,0 +1,59 @@
+from typing import Callable, Dict, Optional
+
+from benchmarks.fixtures import simple_output
+from pylspci.instrumentation import (
+    NullSink, Sink, SummarySink, count, set_sink, span
+)
+from pylspci.parsers import SimpleParser
+
+SINKS: Dict[str, Callable[[], Optional[Sink]]] = {
+    'disabled': lambda: None,
+    'null': NullSink,
+    'summary': SummarySink,
+}
+
+
+class InstrumentationSuite(object):
+    """
+    Cost of a span and a counter, when instrumentation is disabled and with
+    sinks doing nothing or adding everything up.
+    """
+
+    params = list(SINKS)
+    param_names = ['sink']
+
+    def setup(self, sink: str) -> None:
+        self.previous = set_sink(SINKS[sink]())
+
+    def teardown(self, sink: str) -> None:
+        set_sink(self.previous)
+
+    def time_span(self, sink: str) -> None:
+        for _ in range(10000):
+            with span('parse'):
+                pass
+
+    def time_count(self, sink: str) -> None:
+        for _ in range(10000):
+            count('devices_parsed')
+
+
+class InstrumentedParseSuite(object):
+    """
+    Parsing with and without instrumentation, to check that instrumenting
+    the hot paths does not slow them down.
+    """
+
+    params = list(SINKS)
+    param_names = ['sink']
+
+    def setup(self, sink: str) -> None:
+        self.output = simple_output(1000)
+        self.parser = SimpleParser()
+        self.previous = set_sink(SINKS[sink]())
+
+    def teardown(self, sink: str) -> None:
+        set_sink(self.previous)
+
+    def time_parse(self, sink: str) -> None:
+        self.parser.parse(self.output)
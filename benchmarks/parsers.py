@@ -0,0 +1,114 @@
+import shlex
+from typing import List
+
+from benchmarks.fixtures import SIZES, simple_output, verbose_output
+from pylspci.parsers import SimpleParser, VerboseParser
+from pylspci.parsers.base import Parser
+
+SIMPLE_LINE: str = (
+    '00:1c.3 "PCI bridge [0604]" "Intel Corporation [8086]" '
+    '"82801 PCI Bridge [244e]" -rd5 -p01 "Intel Corporation [8086]" '
+    '"82801 PCI Bridge [244e]"'
+)
+
+VERBOSE_DEVICE: List[str] = [
+    'Slot:\t00:1c.3',
+    'Class:\tPCI bridge [0604]',
+    'Vendor:\tIntel Corporation [8086]',
+    'Device:\t82801 PCI Bridge [244e]',
+    'SVendor:\tIntel Corporation [8086]',
+    'SDevice:\t82801 PCI Bridge [244e]',
+    'Rev:\td5',
+    'ProgIf:\t01',
+    'Driver:\tpcieport',
+    'Module:\tshpchp',
+    'NUMANode:\t0',
+    'IOMMUGroup:\t12',
+]
+
+
+class SimpleParserSuite(object):
+    """
+    Compare the line regex of the SimpleParser with the shlex and argparse
+    parsing it falls back to.
+    """
+
+    def setup(self) -> None:
+        self.parser = SimpleParser()
+        # Build the argparse parser outside of the timings
+        self.parser._parse_args(shlex.split(SIMPLE_LINE))
+
+    def time_parse_line(self) -> None:
+        self.parser.parse_line(SIMPLE_LINE)
+
+    def time_parse_line_argparse(self) -> None:
+        self.parser._parse_args(shlex.split(SIMPLE_LINE))
+
+
+class VerboseParserSuite(object):
+    """
+    Parsing a single device from lspci -vvvmmnnk.
+    """
+
+    def setup(self) -> None:
+        self.parser = VerboseParser()
+
+    def time_parse_device(self) -> None:
+        self.parser._parse_device(VERBOSE_DEVICE)
+
+
+class ParseSuite(object):
+    """
+    Parsing whole outputs of lspci -mmnn and lspci -vvvmmnnk of various
+    sizes, at once or line by line as they would be read from a pipe.
+    """
+
+    params = (SIZES, ['simple', 'verbose'])
+    param_names = ['devices', 'format']
+    timeout = 300
+
+    def setup(self, count: int, format: str) -> None:
+        self.parser: Parser
+        if format == 'simple':
+            self.parser = SimpleParser()
+            self.output = simple_output(count)
+        else:
+            self.parser = VerboseParser()
+            self.output = verbose_output(count)
+        self.lines = self.output.splitlines(keepends=True)
+
+    def time_parse(self, count: int, format: str) -> None:
+        self.parser.parse(self.output)
+
+    def time_iter_parse(self, count: int, format: str) -> None:
+        for _ in self.parser.iter_parse(self.lines):
+            pass
+
+    def peakmem_parse(self, count: int, format: str) -> None:
+        self.parser.parse(self.output)
+
+
+class LazyParseSuite(object):
+    """
+    Enumerating devices from lspci -vvvmmnnk and only reading two fields,
+    as most callers do, with regular and lazy devices.
+    """
+
+    params = (SIZES, ['eager', 'lazy'])
+    param_names = ['devices', 'mode']
+    timeout = 300
+
+    def setup(self, count: int, mode: str) -> None:
+        self.parser = VerboseParser(lazy=mode == 'lazy')
+        self.output = verbose_output(count)
+
+    def time_parse(self, count: int, mode: str) -> None:
+        self.parser.parse(self.output)
+
+    def time_read_two_fields(self, count: int, mode: str) -> None:
+        for device in self.parser.parse(self.output):
+            device.vendor.id
+            device.driver
+
+    def peakmem_parse(self, count: int, mode: str) -> None:
+        self.parser.parse(self.output)
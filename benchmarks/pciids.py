@@ -0,0 +1,106 @@
+import random
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import default_timer
+from typing import List, Tuple
+
+from pylspci.pciids import CachedPciIdsDatabase, PciIdsDatabase
+
+
+def make_pciids(path: Path,
+                vendors: int = 2500,
+                devices: int = 10,
+                subsystems: int = 1) -> List[Tuple[int, int]]:
+    """
+    Write a fake pci.ids file roughly the size of the real one, and return
+    the list of vendor and device IDs it contains.
+    """
+    ids: List[Tuple[int, int]] = []
+    lines: List[str] = ['# Fake PCI ID database']
+    for vendor in range(1, vendors + 1):
+        lines.append('{:04x}  Vendor number {}'.format(vendor, vendor))
+        for device in range(1, devices + 1):
+            ids.append((vendor, device))
+            lines.append('\t{:04x}  Device number {} from vendor {}'.format(
+                device, device, vendor))
+            for subsystem in range(1, subsystems + 1):
+                lines.append('\t\t{:04x} {:04x}  Subsystem number {}'.format(
+                    vendor, subsystem, subsystem))
+    for cls in range(0x14):
+        lines.append('C {:02x}  Class number {}'.format(cls, cls))
+        for subclass in range(8):
+            lines.append('\t{:02x}  Subclass number {}'.format(
+                subclass, subclass))
+    path.write_text('\n'.join(lines) + '\n')
+    return ids
+
+
+class PciIdsDatabaseSuite(object):
+    """
+    Load times and lookups of the pci.ids database.
+    """
+
+    def setup(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / 'pci.ids'
+        self.ids = make_pciids(self.path)
+        self.lookups = random.Random(42).sample(self.ids, 1000)
+        self.warm_db = PciIdsDatabase(self.path)
+        self.warm_db.load()
+
+    def teardown(self) -> None:
+        self.tempdir.cleanup()
+
+    def time_load_full(self) -> None:
+        PciIdsDatabase(self.path).load()
+
+    def time_first_lookup(self) -> None:
+        PciIdsDatabase(self.path).device_name(0x0042, 0x0004)
+
+    def time_lookup_cold_1000(self) -> None:
+        db = PciIdsDatabase(self.path)
+        for vendor, device in self.lookups:
+            db.device_name(vendor, device)
+
+    def time_lookup_warm_1000(self) -> None:
+        for vendor, device in self.lookups:
+            self.warm_db.device_name(vendor, device)
+
+    def track_lookups_per_second(self) -> float:
+        start = default_timer()
+        for _ in range(10):
+            for vendor, device in self.lookups:
+                self.warm_db.device_name(vendor, device)
+        return 10 * len(self.lookups) / (default_timer() - start)
+
+
+class CachedPciIdsDatabaseSuite(object):
+    """
+    Load times and lookups from the binary cache of the pci.ids database,
+    as seen by a new process once the cache has been built.
+    """
+
+    def setup(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / 'pci.ids'
+        self.cache_dir = Path(self.tempdir.name) / 'cache'
+        self.ids = make_pciids(self.path)
+        self.lookups = random.Random(42).sample(self.ids, 1000)
+        CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir).load()
+
+    def teardown(self) -> None:
+        self.tempdir.cleanup()
+
+    def time_build_cache(self) -> None:
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        db.cache_path.unlink()
+        db.load()
+
+    def time_first_lookup(self) -> None:
+        CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir) \
+            .device_name(0x0042, 0x0004)
+
+    def time_lookup_cold_1000(self) -> None:
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        for vendor, device in self.lookups:
+            db.device_name(vendor, device)
@@ -0,0 +1,84 @@
+import os
+import re
+import stat
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List
+
+from benchmarks.fixtures import simple_output
+from pylspci.command import CommandBuilder, lspci_args
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
+from pylspci.parsers import SimpleParser
+
+# Stands for lspci, which may not be installed: prints the output
+# saved for the exact same arguments, as lspci would filter it.
+SCRIPT: str = """#!/bin/sh
+exec cat "{}/$(printf '%s' "$*" | tr -c 'A-Za-z0-9' '_')"
+"""
+
+
+def _key(args: List[str]) -> str:
+    return re.sub(r'[^A-Za-z0-9]', '_', ' '.join(args[1:]))
+
+
+def make_queries(count: int) -> List[DeviceQuery]:
+    """
+    Build queries mixing slot and device filters, as an inventory would to
+    find each kind of device on each bus.
+    """
+    return [
+        DeviceQuery(
+            slot_filter=SlotFilter(bus=i % 32),
+            device_filter=DeviceFilter(cls=0x0100 + i % 16),
+        ) if i % 2 else DeviceQuery(
+            device_filter=DeviceFilter(vendor=0x8086, device=0x1000 + i % 64),
+        )
+        for i in range(count)
+    ]
+
+
+class QueryManySuite(object):
+    """
+    Answering many queries with one call to lspci, compared with one call
+    for each query.
+    """
+
+    params = [1, 10, 100]
+    param_names = ['queries']
+
+    def setup(self, queries: int) -> None:
+        self.tempdir = TemporaryDirectory()
+        path = Path(self.tempdir.name)
+        output = simple_output(1000)
+        lines = output.splitlines(keepends=True)
+        devices = SimpleParser().parse(output)
+        self.queries = make_queries(queries)
+        for query in self.queries + [DeviceQuery()]:
+            args = lspci_args(
+                slot_filter=query.slot_filter,
+                device_filter=query.device_filter,
+            )
+            (path / _key(args)).write_text(''.join(
+                line
+                for line, device in zip(lines, devices)
+                if query.matches(device)
+            ))
+        script = path / 'lspci'
+        script.write_text(SCRIPT.format(path))
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        self.path = os.environ['PATH']
+        os.environ['PATH'] = '{}{}{}'.format(path, os.pathsep, self.path)
+
+    def teardown(self, queries: int) -> None:
+        os.environ['PATH'] = self.path
+        self.tempdir.cleanup()
+
+    def time_separate(self, queries: int) -> None:
+        for query in self.queries:
+            list(CommandBuilder(
+                slot_filter=query.slot_filter,
+                device_filter=query.device_filter,
+            ).with_default_parser())
+
+    def time_query_many(self, queries: int) -> None:
+        CommandBuilder().with_default_parser().query_many(self.queries)
@@ -0,0 +1,52 @@
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.fixtures import simple_output
+from pylspci.parsers import SimpleParser
+from pylspci.scanner import Scanner
+
+# Stands for lspci, which may not be installed, and takes some time to scan
+# the buses as lspci would.
+SCRIPT: str = """#!/bin/sh
+sleep 0.05
+exec cat "{}"
+"""
+
+
+class ScannerSuite(object):
+    """
+    Many threads asking for the same devices at once, each calling lspci
+    or sharing a scanner.
+    """
+
+    params = [1, 8, 32]
+    param_names = ['threads']
+
+    def setup(self, threads: int) -> None:
+        self.tempdir = TemporaryDirectory()
+        path = Path(self.tempdir.name)
+        (path / 'output').write_text(simple_output(100))
+        script = path / 'lspci'
+        script.write_text(SCRIPT.format(path / 'output'))
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        self.path = os.environ['PATH']
+        os.environ['PATH'] = '{}{}{}'.format(path, os.pathsep, self.path)
+        self.parser = SimpleParser()
+        self.scanner = Scanner()
+
+    def teardown(self, threads: int) -> None:
+        os.environ['PATH'] = self.path
+        self.tempdir.cleanup()
+
+    def time_separate(self, threads: int) -> None:
+        with ThreadPoolExecutor(threads) as executor:
+            for _ in range(threads):
+                executor.submit(self.parser.run)
+
+    def time_scanner(self, threads: int) -> None:
+        with ThreadPoolExecutor(threads) as executor:
+            for _ in range(threads):
+                executor.submit(self.scanner.run, self.parser)
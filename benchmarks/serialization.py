@@ -0,0 +1,59 @@
+import json
+
+from benchmarks.table import make_devices
+from pylspci.serialization import (
+    FORMATS, decode, dumps, encode, iter_decode_ndjson, loads
+)
+
+
+class SerializationSuite(object):
+    """
+    Throughput of serializing and deserializing fleet-sized snapshots.
+    """
+
+    params = ['json', 'msgpack']
+    param_names = ['format']
+
+    def setup(self, format: str) -> None:
+        if format not in FORMATS:
+            raise NotImplementedError
+        self.devices = make_devices(10000)
+        self.data = dumps(self.devices, format)
+
+    def time_dumps(self, format: str) -> None:
+        dumps(self.devices, format)
+
+    def time_loads(self, format: str) -> None:
+        loads(self.data, format)
+
+
+class DictSuite(object):
+    """
+    Converting devices to and from dicts, compared with Device.as_dict
+    and the json module.
+    """
+
+    def setup(self) -> None:
+        self.devices = make_devices(10000)
+        self.dicts = [device.as_dict() for device in self.devices]
+        self.json = json.dumps(self.dicts)
+        self.ndjson = [json.dumps(data).encode('utf-8') for data in self.dicts]
+
+    def time_as_dict(self) -> None:
+        [device.as_dict() for device in self.devices]
+
+    def time_encode(self) -> None:
+        list(map(encode, self.devices))
+
+    def time_decode(self) -> None:
+        list(map(decode, self.dicts))
+
+    def time_json_dumps_as_dict(self) -> None:
+        json.dumps([device.as_dict() for device in self.devices])
+
+    def time_json_loads_decode(self) -> None:
+        list(map(decode, json.loads(self.json)))
+
+    def time_iter_decode_ndjson(self) -> None:
+        for device in iter_decode_ndjson(self.ndjson):
+            pass
@@ -0,0 +1,87 @@
+import tracemalloc
+from typing import Any, Callable, List
+
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+from pylspci.filters import DeviceFilter
+from pylspci.table import DeviceTable
+
+VENDORS: List[str] = [
+    'Intel Corporation [8086]',
+    'Advanced Micro Devices, Inc. [AMD] [1022]',
+    'NVIDIA Corporation [10de]',
+    'Mellanox Technologies [15b3]',
+]
+
+
+def make_devices(count: int) -> List[Device]:
+    """
+    Build a list of devices with a realistic amount of repeated names,
+    as found when storing the devices of many similar hosts.
+    """
+    return [
+        Device(
+            slot=Slot('{:04x}:{:02x}:{:02x}.{}'.format(
+                i >> 13, (i >> 5) & 0xff, i & 0x1f, i % 8)),
+            cls=NameWithID('Class number {} [{:04x}]'.format(i % 16, i % 16)),
+            vendor=NameWithID(VENDORS[i % len(VENDORS)]),
+            device=NameWithID('Device number {} [{:04x}]'.format(
+                i % 64, i % 64)),
+            subsystem_vendor=NameWithID(VENDORS[i % len(VENDORS)]),
+            subsystem_device=NameWithID('Subsystem [{:04x}]'.format(i % 32)),
+            revision=i % 4,
+            driver='driver{}'.format(i % 16),
+            kernel_modules=['driver{}'.format(i % 16), 'module'],
+            numa_node=i % 2,
+            iommu_group=i,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(build: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+class DeviceTableSuite(object):
+    """
+    Memory usage and filtering of a DeviceTable,
+    compared with a list of devices.
+    """
+
+    params = [1000, 10000]
+    param_names = ['devices']
+
+    def setup(self, count: int) -> None:
+        self.devices = make_devices(count)
+        self.table = DeviceTable(self.devices)
+        self.device_filter = DeviceFilter(vendor=0x8086, cls=0x0003)
+
+    def track_memory_list(self, count: int) -> int:
+        # Build the devices from the table so that names are not shared
+        # with the already existing devices.
+        return measure(lambda: list(self.table))
+
+    track_memory_list.unit = 'bytes'  # type: ignore
+
+    def track_memory_table(self, count: int) -> int:
+        return measure(lambda: DeviceTable(self.devices))
+
+    track_memory_table.unit = 'bytes'  # type: ignore
+
+    def time_build_table(self, count: int) -> None:
+        DeviceTable(self.devices)
+
+    def time_select_list(self, count: int) -> None:
+        [
+            device for device in self.devices
+            if device.vendor.id == 0x8086 and device.cls.id == 0x0003
+        ]
+
+    def time_select_table(self, count: int) -> None:
+        self.table.select(device_filter=self.device_filter)
@@ -1,11 +1,55 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import sys
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, TextIO, Union
 
 from pylspci.command import CommandBuilder, IDResolveOption
+from pylspci.device import Device
+from pylspci.fields import PCIAccessParameter
 from pylspci.filters import DeviceFilter, SlotFilter
+from pylspci.instrumentation import SummarySink, instrument, span
+
+JSONItem = Union[str, Device, PCIAccessParameter]
+
+
+def _serialize(item: JSONItem) -> Any:
+    return item if isinstance(item, str) else item.as_dict()
+
+
+def write_json(items: Iterable[JSONItem], output: TextIO) -> None:
+    """
+    Write items as a JSON list, one item at a time as they arrive, instead of
+    building the whole JSON string in memory. The output is the same as
+    ``json.dumps`` on a list of the items, followed by a newline.
+
+    :param items: Strings, devices or parameters to write.
+    :type items: Iterable[str or Device or PCIAccessParameter]
+    :param output: The text stream to write to.
+    :type output: TextIO
+    """
+    separator = '['
+    for item in items:
+        output.write(separator)
+        output.write(json.dumps(_serialize(item)))
+        separator = ', '
+    output.write('[]\n' if separator == '[' else ']\n')
+
+
+def write_ndjson(items: Iterable[JSONItem], output: TextIO) -> None:
+    """
+    Write items as newline-delimited JSON, with one JSON value on each line,
+    as soon as each item arrives.
+
+    :param items: Strings, devices or parameters to write.
+    :type items: Iterable[str or Device or PCIAccessParameter]
+    :param output: The text stream to write to.
+    :type output: TextIO
+    """
+    for item in items:
+        output.write(json.dumps(_serialize(item)))
+        output.write('\n')
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -78,6 +122,14 @@ def get_parser() -> argparse.ArgumentParser:
         default=True,
         dest='json',
     )
+    output_modes.add_argument(
+        '--ndjson',
+        help='Parse the lspci output and write one JSON object per line, '
+             'as soon as each device is parsed.',
+        action='store_true',
+        default=False,
+        dest='ndjson',
+    )
     output_modes.add_argument(
         '--raw',
         help="Return lspci's output directly, without parsing.",
@@ -138,6 +190,14 @@ def get_parser() -> argparse.ArgumentParser:
         dest='file',
         metavar='FILE',
     )
+    access_exclusive.add_argument(
+        '--sysfs',
+        help='Read devices directly from sysfs instead of calling lspci. '
+             'Names are looked up from the PCI ID list unless -n is set.',
+        action='store_true',
+        default=False,
+        dest='sysfs',
+    )
     access_exclusive.add_argument(
         '-H1',
         help='Access hardware using Intel configuration mechanism 1. '
@@ -154,17 +214,73 @@ def get_parser() -> argparse.ArgumentParser:
         const='intel-conf2',
         dest='access_method',
     )
+    parser.add_argument(
+        '--native',
+        help='With -F, read the hex dump without calling lspci. '
+             'Names are looked up from the PCI ID list unless -n is set.',
+        action='store_true',
+        default=False,
+        dest='native',
+    )
+    parser.add_argument(
+        '--watch',
+        help='Read devices from sysfs, then print a JSON event on each line '
+             'whenever a device is added, removed or changed, until '
+             'interrupted. Names are looked up from the PCI ID list unless '
+             '-n is set.',
+        action='store_true',
+        default=False,
+        dest='watch',
+    )
+    parser.add_argument(
+        '--profile',
+        help='Print the time spent in each phase, such as calling lspci, '
+             'parsing or writing the output, to the standard error. '
+             'Devices are not streamed, so that each phase is measured '
+             'separately.',
+        action='store_true',
+        default=False,
+        dest='profile',
+    )
     return parser
 
 
+def _write(items: Iterable[JSONItem], json_output: bool, ndjson: bool) -> None:
+    if not json_output:  # Raw mode
+        for item in items:
+            print(item)
+    elif ndjson:
+        write_ndjson(items, sys.stdout)
+    else:
+        write_json(items, sys.stdout)
+
+
 def main() -> None:
     parser: argparse.ArgumentParser = get_parser()
     args: Dict[str, Any] = vars(parser.parse_args())
 
     json_output: bool = args.pop('json', True)
+    ndjson: bool = args.pop('ndjson', False)
     kernel_modules: bool = args.pop('kernel_modules', False)
     access_method: Optional[str] = args.pop('access_method', None)
     pcilib_params = args.pop('pcilib_params', []) or []
+    sysfs: bool = args.pop('sysfs', False)
+    native: bool = args.pop('native', False)
+    watch: bool = args.pop('watch', False)
+    profile: bool = args.pop('profile', False)
+
+    if sysfs and not json_output:
+        parser.error('--sysfs cannot be used with --raw')
+    if native and not args.get('file'):
+        parser.error('--native requires -F')
+    if native and not json_output:
+        parser.error('--native cannot be used with --raw')
+    if watch and not json_output:
+        parser.error('--watch cannot be used with --raw')
+    if watch and (native or access_method or args.get('file')):
+        parser.error('--watch can only be used with --sysfs')
+    if watch and profile:
+        parser.error('--watch cannot be used with --profile')
 
     builder: CommandBuilder = CommandBuilder(**args)
     if kernel_modules:
@@ -186,19 +302,32 @@ def main() -> None:
         key, value = map(str.strip, param.split('=', 2))
         builder = builder.with_pcilib_params(**{key: value})
 
-    if json_output:
-        builder = builder.with_default_parser()
+    if sysfs:
+        builder = builder.use_sysfs()
+    elif native:
+        builder = builder.from_file(args['file'], native=True)
+    elif json_output:
+        builder = builder.with_default_parser().stream(not profile)
 
-    result = list(builder)
-    if not json_output:  # Raw mode
-        for item in result:
-            print(item)
+    if watch:
+        try:
+            for event in builder.watch(initial=True):
+                print(json.dumps(event.as_dict()), flush=True)
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            parser.error(str(e))
+        return
+
+    if profile:
+        with instrument(SummarySink()) as sink:
+            items = list(builder)
+            with span('write'):
+                _write(items, json_output, ndjson)
+        print(sink.report(), file=sys.stderr)
         return
 
-    print(json.dumps([
-        item if isinstance(item, str) else item.as_dict()
-        for item in result
-    ]))
+    _write(builder, json_output, ndjson)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Parse many saved ``lspci`` outputs at once, spreading them over
+several processes.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    Deque, Iterable, Iterator, List, Optional, Sequence, Union, cast
+)
+
+from pylspci.device import Device
+from pylspci.parsers import Parser, SimpleParser, VerboseParser
+
+PathLike = Union[str, Path]
+
+# Paths to files holding outputs, or outputs held in memory
+_Source = Union[Path, str]
+
+PENDING_CHUNKS_PER_WORKER = 2
+"""
+Number of chunks submitted in advance to each worker process, so that
+workers never wait for the results to be consumed while only a few chunks
+of devices are kept in memory.
+"""
+
+
+def _read(source: _Source) -> str:
+    if isinstance(source, Path):
+        return source.read_text()
+    return source
+
+
+def _parse_chunk(parser: Parser,
+                 sources: Sequence[_Source]) -> List[List[Device]]:
+    """
+    Parse a chunk of sources in a worker process. Names and slots are
+    interned, so devices sharing them are pickled only once per chunk.
+    """
+    return [parser.parse(_read(source)) for source in sources]
+
+
+def _chunks(sources: Iterable[_Source],
+            chunksize: int) -> Iterator[List[_Source]]:
+    chunk: List[_Source] = []
+    for source in sources:
+        chunk.append(source)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_parse_many(paths: Optional[Iterable[PathLike]] = None,
+                    parser: Optional[Parser] = None,
+                    workers: Optional[int] = None,
+                    chunksize: int = 16,
+                    texts: Optional[Iterable[str]] = None,
+                    ) -> Iterator[List[Device]]:
+    """
+    Parse many ``lspci`` outputs in a pool of processes, and yield the devices
+    of each output in the same order as the paths or texts, as soon as they
+    are available. This avoids keeping all the devices in memory: outputs
+    are only read and parsed a few chunks ahead of the results being
+    consumed.
+
+    See :func:`parse_many` for a description of the arguments.
+
+    :returns: An iterator of lists of devices, one for each output.
+    :rtype: Iterator[List[Device]]
+    """
+    assert (paths is None) != (texts is None), \
+        'Either paths or texts must be set'
+    if parser is None:
+        parser = VerboseParser()
+    assert chunksize > 0, 'The chunk size must be positive'
+    sources: Iterable[_Source]
+    if paths is not None:
+        sources = map(Path, paths)
+    else:
+        sources = cast(Iterable[str], texts)
+    chunks = _chunks(sources, chunksize)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _parse_chunk(parser, chunk)
+        return
+
+    limit = PENDING_CHUNKS_PER_WORKER * (workers or os.cpu_count() or 1)
+    pending: Deque['Future[List[List[Device]]]'] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in chunks:
+            if len(pending) >= limit:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_parse_chunk, parser, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parse_many(paths: Optional[Iterable[PathLike]] = None,
+               parser: Optional[Parser] = None,
+               workers: Optional[int] = None,
+               chunksize: int = 16,
+               texts: Optional[Iterable[str]] = None,
+               ) -> List[List[Device]]:
+    """
+    Parse many ``lspci`` outputs in a pool of processes, either from files
+    or from strings. Exactly one of ``paths`` or ``texts`` must be set.
+
+    :param paths: Paths to files holding the outputs to parse.
+       Files are read by the worker processes.
+    :type paths: Iterable[str or Path] or None
+    :param parser: The parser to use. Defaults to a
+       :class:`VerboseParser <pylspci.parsers.VerboseParser>`.
+    :type parser: Parser or None
+    :param workers: Number of processes to start. Defaults to the number of
+       processors. Set to 1 to parse in the current process.
+    :type workers: int or None
+    :param int chunksize: Number of sources to send to a worker at once.
+       Larger chunks reduce the communication between processes.
+    :param texts: Outputs to parse, held in memory, instead of files.
+    :type texts: Iterable[str] or None
+    :returns: A list of devices for each output, in the same order.
+    :rtype: List[List[Device]]
+    """
+    return list(iter_parse_many(
+        paths,
+        parser=parser,
+        workers=workers,
+        chunksize=chunksize,
+        texts=texts,
+    ))
+
+
+def find_files(paths: Iterable[Path]) -> List[Path]:
+    """
+    List the files to parse from a list of paths; directories are replaced
+    with the files they contain, sorted by name.
+
+    :param paths: Files or directories.
+    :type paths: Iterable[Path]
+    :returns: A list of files.
+    :rtype: List[Path]
+    """
+    files: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='Parse many saved lspci outputs to JSON',
+    )
+    parser.add_argument(
+        'paths',
+        help='Files holding lspci outputs, or directories of such files.',
+        nargs='+',
+        type=Path,
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        help='Number of processes to use. Defaults to the number of '
+             'processors.',
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        '--chunksize',
+        help='Number of files to send to a process at once.',
+        type=int,
+        default=16,
+    )
+    parser.add_argument(
+        '--simple',
+        help='Parse outputs from lspci -mm instead of lspci -vvvmm.',
+        action='store_true',
+        default=False,
+    )
+    return parser
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = get_parser()
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error('The number of workers must be positive')
+    if args.chunksize < 1:
+        parser.error('The chunk size must be positive')
+
+    files = find_files(args.paths)
+    results = iter_parse_many(
+        files,
+        parser=SimpleParser() if args.simple else VerboseParser(),
+        workers=args.workers,
+        chunksize=args.chunksize,
+    )
+    # Write each output as soon as it is parsed, as a single JSON object
+    sys.stdout.write('{')
+    for i, (path, devices) in enumerate(zip(files, results)):
+        if i:
+            sys.stdout.write(', ')
+        sys.stdout.write(json.dumps(str(path)))
+        sys.stdout.write(': ')
+        sys.stdout.write(json.dumps([device.as_dict() for device in devices]))
+    sys.stdout.write('}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from pylspci.instrumentation import count
+from pylspci.sysfs import DEFAULT_SYSFS_PATH
+
+CacheKey = Tuple[str, ...]
+
+Invalidator = Callable[[], bool]
+"""
+A callable returning ``True`` when all cached results should be discarded,
+for example because a device has been plugged or removed.
+"""
+
+
+class LspciCache(object):
+    """
+    An opt-in cache for the output of ``lspci``, to avoid calling it again
+    when its output was already obtained recently with the same arguments.
+
+    Results are keyed on the full ``lspci`` command line, as built by
+    :func:`pylspci.command.lspci_args`. They expire after a delay, and the
+    least recently used results are evicted when the cache is full.
+
+    A single cache can safely be shared between threads.
+
+    :param float ttl: Time in seconds during which a result is reused.
+    :param int maxsize: Maximum number of results to keep.
+    :param clock: A function returning the current time in seconds,
+       to compute the expiration of the results.
+    :type clock: Callable[[], float]
+    """
+
+    ttl: float
+    """
+    Time in seconds during which a result is reused.
+    """
+
+    maxsize: int
+    """
+    Maximum number of results to keep.
+    """
+
+    hits: int
+    """
+    Number of times a result was returned from the cache.
+    """
+
+    misses: int
+    """
+    Number of times ``lspci`` had to be called.
+    """
+
+    def __init__(self,
+                 ttl: float = 1.0,
+                 maxsize: int = 32,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        assert ttl >= 0, 'The TTL cannot be negative'
+        assert maxsize > 0, 'The maximum size must be positive'
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._results: 'OrderedDict[CacheKey, Tuple[float, str]]' = \
+            OrderedDict()
+        self._invalidators: List[Invalidator] = []
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __repr__(self) -> str:
+        return '{}(ttl={!r}, maxsize={!r})'.format(
+            self.__class__.__name__, self.ttl, self.maxsize)
+
+    def get(self, args: Sequence[str], call: Callable[[], str]) -> str:
+        """
+        Get the output of ``lspci`` for a command line, from the cache if it
+        has not expired, or by calling a function and caching its result.
+
+        :param args: The ``lspci`` command line, used as the cache key.
+        :type args: Sequence[str]
+        :param call: A function calling ``lspci`` and returning its output.
+        :type call: Callable[[], str]
+        :returns: The output of ``lspci``.
+        :rtype: str
+        """
+        key = tuple(args)
+        if any([invalidator() for invalidator in self._invalidators]):
+            self.invalidate()
+
+        with self._lock:
+            entry = self._results.get(key)
+            hit = entry is not None and entry[0] > self._clock()
+            if hit:
+                self._results.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            count('cache_hits')
+            assert entry is not None
+            return entry[1]
+        count('cache_misses')
+
+        result = call()
+        with self._lock:
+            self._results[key] = (self._clock() + self.ttl, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def invalidate(self, args: Optional[Sequence[str]] = None) -> None:
+        """
+        Discard cached results.
+
+        :param args: A ``lspci`` command line to discard the result of.
+           When omitted, discard all results.
+        :type args: Sequence[str] or None
+        """
+        with self._lock:
+            if args is None:
+                self._results.clear()
+            else:
+                self._results.pop(tuple(args), None)
+
+    def add_invalidator(self, invalidator: Invalidator) -> None:
+        """
+        Register a function to call before every lookup, which can discard
+        all cached results by returning ``True``.
+        See :class:`SysfsInvalidator` to detect hotplug events.
+
+        :param invalidator: A function returning whether to invalidate
+           the cache.
+        :type invalidator: Callable[[], bool]
+        """
+        self._invalidators.append(invalidator)
+
+    def remove_invalidator(self, invalidator: Invalidator) -> None:
+        """
+        Unregister a function previously registered with
+        :meth:`add_invalidator`.
+
+        :param invalidator: The function to unregister.
+        :type invalidator: Callable[[], bool]
+        :raises ValueError: The function was not registered.
+        """
+        self._invalidators.remove(invalidator)
+
+    def reset_stats(self) -> None:
+        """
+        Reset the :attr:`hits` and :attr:`misses` counters.
+        """
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+class SysfsInvalidator(object):
+    """
+    Cache invalidator that detects plugged or removed PCI devices by listing
+    ``/sys/bus/pci/devices``, which is much faster than calling ``lspci``.
+    See :meth:`LspciCache.add_invalidator`.
+
+    This only works on Linux; elsewhere, it never invalidates the cache.
+
+    :param root: Path to the sysfs mount point.
+    :type root: str or Path
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_SYSFS_PATH) -> None:
+        self.path = Path(root) / 'bus' / 'pci' / 'devices'
+        self._devices: Optional[FrozenSet[str]] = self._list()
+
+    def _list(self) -> Optional[FrozenSet[str]]:
+        try:
+            return frozenset(os.listdir(str(self.path)))
+        except OSError:
+            return None
+
+    def __call__(self) -> bool:
+        devices = self._list()
+        changed = devices != self._devices
+        self._devices = devices
+        return changed
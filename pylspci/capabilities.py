@@ -0,0 +1,516 @@
+import struct
+from enum import IntFlag
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Set, Tuple, Union
+
+from cached_property import cached_property
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+CAPABILITY_ID_POWER_MANAGEMENT = 0x01
+CAPABILITY_ID_MSI = 0x05
+CAPABILITY_ID_SSVID = 0x0d
+CAPABILITY_ID_PCI_EXPRESS = 0x10
+CAPABILITY_ID_MSIX = 0x11
+
+EXTENDED_CAPABILITY_ID_AER = 0x0001
+EXTENDED_CAPABILITY_ID_ACS = 0x000d
+EXTENDED_CAPABILITY_ID_SRIOV = 0x0010
+
+LINK_SPEEDS = {
+    1: 2.5,
+    2: 5.0,
+    3: 8.0,
+    4: 16.0,
+    5: 32.0,
+    6: 64.0,
+}
+"""
+PCI Express link speeds in GT/s, by their encoding in the link registers.
+"""
+
+
+class Capability(NamedTuple):
+    """
+    Describes an entry of the capability list or of the extended capability
+    list of a device's configuration space.
+    """
+
+    id: int
+    """
+    The capability's ID, such as ``0x10`` for PCI Express.
+    """
+
+    offset: int
+    """
+    Offset of the capability in the configuration space.
+    """
+
+    extended: bool = False
+    """
+    Whether this capability is from the extended capability list, found
+    after the first 256 bytes of the configuration space of PCI Express
+    devices.
+    """
+
+    version: int = 0
+    """
+    Version of an extended capability. Always zero for other capabilities.
+    """
+
+
+class PciExpress(NamedTuple):
+    """
+    The PCI Express capability, describing the device's link.
+    """
+
+    offset: int
+    """
+    Offset of the capability in the configuration space.
+    """
+
+    version: int
+    """
+    Version of the capability structure.
+    """
+
+    port_type: int
+    """
+    Device or port type, such as ``0`` for an endpoint or ``4`` for
+    a root port.
+    """
+
+    max_link_speed: Optional[float]
+    """
+    Maximum link speed, in GT/s, or None if unknown.
+    """
+
+    max_link_width: int
+    """
+    Maximum link width, in lanes.
+    """
+
+    link_speed: Optional[float]
+    """
+    Current link speed, in GT/s, or None if unknown.
+    """
+
+    link_width: int
+    """
+    Negotiated link width, in lanes.
+    """
+
+
+class Msi(NamedTuple):
+    """
+    The Message Signaled Interrupts capability.
+    """
+
+    offset: int
+    """
+    Offset of the capability in the configuration space.
+    """
+
+    enabled: bool
+    """
+    Whether MSI is enabled.
+    """
+
+    vectors: int
+    """
+    Number of vectors the device can use.
+    """
+
+    enabled_vectors: int
+    """
+    Number of vectors allocated to the device.
+    """
+
+    is_64bit: bool
+    """
+    Whether the device supports 64-bit message addresses.
+    """
+
+    per_vector_masking: bool
+    """
+    Whether the device supports masking each vector.
+    """
+
+
+class MsiX(NamedTuple):
+    """
+    The MSI-X capability.
+    """
+
+    offset: int
+    """
+    Offset of the capability in the configuration space.
+    """
+
+    enabled: bool
+    """
+    Whether MSI-X is enabled.
+    """
+
+    masked: bool
+    """
+    Whether all the vectors are masked.
+    """
+
+    table_size: int
+    """
+    Number of entries in the MSI-X table.
+    """
+
+    table_bar: int
+    """
+    Index of the base address register mapping the MSI-X table.
+    """
+
+    table_offset: int
+    """
+    Offset of the MSI-X table in the memory mapped by its BAR.
+    """
+
+    pba_bar: int
+    """
+    Index of the base address register mapping the Pending Bit Array.
+    """
+
+    pba_offset: int
+    """
+    Offset of the Pending Bit Array in the memory mapped by its BAR.
+    """
+
+
+class SrIov(NamedTuple):
+    """
+    The Single Root I/O Virtualization extended capability.
+    """
+
+    offset: int
+    """
+    Offset of the capability in the configuration space.
+    """
+
+    enabled: bool
+    """
+    Whether virtual functions are enabled.
+    """
+
+    initial_vfs: int
+    """
+    Initial number of virtual functions.
+    """
+
+    total_vfs: int
+    """
+    Maximum number of virtual functions.
+    """
+
+    num_vfs: int
+    """
+    Number of virtual functions currently set.
+    """
+
+    vf_offset: int
+    """
+    Routing ID offset of the first virtual function.
+    """
+
+    vf_stride: int
+    """
+    Routing ID stride between virtual functions.
+    """
+
+    vf_device: int
+    """
+    Device ID of the virtual functions.
+    """
+
+
+class AcsFlags(IntFlag):
+    """
+    Access Control Services features, as found both in the ACS capability
+    register and the ACS control register.
+    """
+
+    SourceValidation = 0x01
+    TranslationBlocking = 0x02
+    RequestRedirect = 0x04
+    CompletionRedirect = 0x08
+    UpstreamForwarding = 0x10
+    EgressControl = 0x20
+    DirectTranslatedP2P = 0x40
+
+
+class Acs(NamedTuple):
+    """
+    The Access Control Services extended capability.
+    """
+
+    offset: int
+    """
+    Offset of the capability in the configuration space.
+    """
+
+    capabilities: AcsFlags
+    """
+    Features supported by the device.
+    """
+
+    control: AcsFlags
+    """
+    Features enabled on the device.
+    """
+
+
+class ConfigSpace(object):
+    """
+    The raw configuration space of a PCI device, as read from a sysfs
+    ``config`` file or from a hex dump, and a decoder for its capabilities.
+
+    Nothing is decoded until an attribute is accessed, so listing devices
+    does not pay for capabilities that are never used.
+
+    Only the first 64 bytes are available when the configuration space
+    was dumped with ``lspci -x``, or read from sysfs without root privileges;
+    the capabilities are then unavailable. The extended capabilities require
+    the 4096 bytes of ``lspci -xxxx``.
+
+    :param data: The bytes of the configuration space.
+    :type data: bytes or bytearray or memoryview
+    """
+
+    path: Optional[Path] = None
+    """
+    Path to the file the configuration space is read from, if any.
+    """
+
+    def __init__(self, data: Buffer) -> None:
+        # Set the cached property directly
+        self.__dict__['data'] = memoryview(data)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> 'ConfigSpace':
+        """
+        Create a configuration space that will be read from a file,
+        such as ``/sys/bus/pci/devices/*/config``, on first access.
+        The configuration space is empty if the file cannot be read.
+
+        As the file is read on first access, including when comparing or
+        hashing, such a configuration space is not a snapshot of the device.
+        Read the file directly to get one.
+
+        :param path: Path to the file holding the configuration space.
+        :type path: str or Path
+        :returns: A configuration space.
+        :rtype: ConfigSpace
+        """
+        self = cls.__new__(cls)
+        self.path = Path(path)
+        return self
+
+    @cached_property
+    def data(self) -> memoryview:
+        """
+        The bytes of the configuration space.
+        """
+        assert self.path is not None
+        try:
+            return memoryview(self.path.read_bytes())
+        except OSError:
+            return memoryview(b'')
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ConfigSpace):
+            return NotImplemented
+        return self.data == other.data
+
+    def __hash__(self) -> int:
+        return hash(bytes(self.data))
+
+    def __repr__(self) -> str:
+        if 'data' not in self.__dict__:
+            return '<{} from {}>'.format(self.__class__.__name__, self.path)
+        return '<{} of {} bytes>'.format(self.__class__.__name__, len(self))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (bytes(self.data), ))
+
+    def _unpack(self, fmt: str, offset: int) -> Optional[Tuple[int, ...]]:
+        """
+        Read little-endian values at an offset, or return None if the
+        configuration space is too short.
+        """
+        if offset + struct.calcsize(fmt) > len(self.data):
+            return None
+        return struct.unpack_from(fmt, self.data, offset)
+
+    def _standard_capabilities(self) -> List[Capability]:
+        data = self.data
+        # The capability list is only valid when the status register says so
+        if len(data) < 0x40 or not data[0x06] & 0x10:
+            return []
+        # CardBus bridges have their capability pointer elsewhere
+        pointer = data[0x14 if data[0x0e] & 0x7f == 2 else 0x34] & 0xfc
+        capabilities: List[Capability] = []
+        seen: Set[int] = set()
+        while 0x40 <= pointer <= len(data) - 2 and pointer not in seen:
+            seen.add(pointer)
+            capabilities.append(Capability(id=data[pointer], offset=pointer))
+            pointer = data[pointer + 1] & 0xfc
+        return capabilities
+
+    def _extended_capabilities(self) -> List[Capability]:
+        capabilities: List[Capability] = []
+        seen: Set[int] = set()
+        pointer = 0x100
+        while pointer >= 0x100 and pointer not in seen:
+            values = self._unpack('<I', pointer)
+            if values is None:
+                break
+            header = values[0]
+            if header in (0, 0xffffffff):
+                break
+            seen.add(pointer)
+            capabilities.append(Capability(
+                id=header & 0xffff,
+                offset=pointer,
+                extended=True,
+                version=(header >> 16) & 0xf,
+            ))
+            pointer = (header >> 20) & 0xffc
+        return capabilities
+
+    @cached_property
+    def capabilities(self) -> List[Capability]:
+        """
+        All the capabilities of the device, in the order of the capability
+        list, followed by the extended capabilities.
+        """
+        return self._standard_capabilities() + self._extended_capabilities()
+
+    def find(self, id: int, extended: bool = False) -> Optional[Capability]:
+        """
+        Find a capability by its ID.
+
+        :param int id: The capability ID.
+        :param bool extended: Whether to look for an extended capability.
+        :returns: The first capability with this ID, if found.
+        :rtype: Capability or None
+        """
+        for capability in self.capabilities:
+            if capability.id == id and capability.extended == extended:
+                return capability
+        return None
+
+    @cached_property
+    def pci_express(self) -> Optional[PciExpress]:
+        """
+        The decoded PCI Express capability, if found.
+        """
+        capability = self.find(CAPABILITY_ID_PCI_EXPRESS)
+        if capability is None:
+            return None
+        flags = self._unpack('<H', capability.offset + 0x02)
+        link_capabilities = self._unpack('<I', capability.offset + 0x0c)
+        link_status = self._unpack('<H', capability.offset + 0x12)
+        if flags is None or link_capabilities is None or link_status is None:
+            return None
+        return PciExpress(
+            offset=capability.offset,
+            version=flags[0] & 0xf,
+            port_type=(flags[0] >> 4) & 0xf,
+            max_link_speed=LINK_SPEEDS.get(link_capabilities[0] & 0xf),
+            max_link_width=(link_capabilities[0] >> 4) & 0x3f,
+            link_speed=LINK_SPEEDS.get(link_status[0] & 0xf),
+            link_width=(link_status[0] >> 4) & 0x3f,
+        )
+
+    @cached_property
+    def msi(self) -> Optional[Msi]:
+        """
+        The decoded MSI capability, if found.
+        """
+        capability = self.find(CAPABILITY_ID_MSI)
+        if capability is None:
+            return None
+        values = self._unpack('<H', capability.offset + 0x02)
+        if values is None:
+            return None
+        control = values[0]
+        return Msi(
+            offset=capability.offset,
+            enabled=bool(control & 0x1),
+            vectors=1 << ((control >> 1) & 0x7),
+            enabled_vectors=1 << ((control >> 4) & 0x7),
+            is_64bit=bool(control & 0x80),
+            per_vector_masking=bool(control & 0x100),
+        )
+
+    @cached_property
+    def msix(self) -> Optional[MsiX]:
+        """
+        The decoded MSI-X capability, if found.
+        """
+        capability = self.find(CAPABILITY_ID_MSIX)
+        if capability is None:
+            return None
+        values = self._unpack('<HII', capability.offset + 0x02)
+        if values is None:
+            return None
+        control, table, pba = values
+        return MsiX(
+            offset=capability.offset,
+            enabled=bool(control & 0x8000),
+            masked=bool(control & 0x4000),
+            table_size=(control & 0x7ff) + 1,
+            table_bar=table & 0x7,
+            table_offset=table & ~0x7,
+            pba_bar=pba & 0x7,
+            pba_offset=pba & ~0x7,
+        )
+
+    @cached_property
+    def sriov(self) -> Optional[SrIov]:
+        """
+        The decoded SR-IOV extended capability, if found.
+        """
+        capability = self.find(EXTENDED_CAPABILITY_ID_SRIOV, extended=True)
+        if capability is None:
+            return None
+        values = self._unpack('<H2xHHH2xHH2xH', capability.offset + 0x08)
+        if values is None:
+            return None
+        control, initial, total, num, vf_offset, vf_stride, vf_device = values
+        return SrIov(
+            offset=capability.offset,
+            enabled=bool(control & 0x1),
+            initial_vfs=initial,
+            total_vfs=total,
+            num_vfs=num,
+            vf_offset=vf_offset,
+            vf_stride=vf_stride,
+            vf_device=vf_device,
+        )
+
+    @cached_property
+    def acs(self) -> Optional[Acs]:
+        """
+        The decoded ACS extended capability, if found.
+        """
+        capability = self.find(EXTENDED_CAPABILITY_ID_ACS, extended=True)
+        if capability is None:
+            return None
+        values = self._unpack('<HH', capability.offset + 0x04)
+        if values is None:
+            return None
+        return Acs(
+            offset=capability.offset,
+            capabilities=AcsFlags(values[0] & 0x7f),
+            control=AcsFlags(values[1] & 0x7f),
+        )
@@ -1,16 +1,32 @@
+import asyncio
+import locale
 import subprocess
 from enum import Enum
+from functools import partial
 from pathlib import Path
 from typing import (
-    Any, Iterator, List, Mapping, MutableMapping, Optional, Union
+    Any, AsyncIterator, Awaitable, Generator, Hashable, Iterable, Iterator,
+    List, Mapping, MutableMapping, Optional, Tuple, TypeVar, Union, cast
 )
 
+from pylspci.cache import LspciCache
 from pylspci.device import Device
+from pylspci.dump import DumpReader
 from pylspci.fields import PCIAccessParameter
-from pylspci.filters import DeviceFilter, SlotFilter
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
+from pylspci.index import DeviceIndex
+from pylspci.instrumentation import count, span
 from pylspci.parsers.base import Parser
+from pylspci.pciids import CachedPciIdsDatabase, find_pciids
+from pylspci.sysfs import DEFAULT_SYSFS_PATH, SysfsReader
+from pylspci.watch import DeviceEvent, DeviceWatcher
 
 OptionalPath = Optional[Union[str, Path]]
+QueryArgs = Tuple[
+    Optional[Union[SlotFilter, str]],
+    Optional[Union[DeviceFilter, str]],
+]
+T = TypeVar('T')
 
 
 class IDResolveOption(Enum):
@@ -35,7 +51,7 @@ class IDResolveOption(Enum):
     """
 
 
-def lspci(
+def lspci_args(
         pciids: OptionalPath = None,
         pcimap: OptionalPath = None,
         access_method: Optional[str] = None,
@@ -48,47 +64,15 @@ def lspci(
         id_resolve_option: IDResolveOption = IDResolveOption.Both,
         slot_filter: Optional[Union[SlotFilter, str]] = None,
         device_filter: Optional[Union[DeviceFilter, str]] = None,
-        ) -> str:
+        ) -> List[str]:
     """
-    Call the ``lspci`` command with various parameters.
+    Build the command line used by :func:`lspci` to call ``lspci``,
+    without running it.
 
-    :param pciids: An optional path to a ``pciids`` file,
-       to convert hexadecimal class, vendor or device IDs into names.
-    :type pciids: str or Path or None
-    :param pcimap: An optional path to a ``pcimap`` file,
-       linking Linux kernel modules and their supported PCI IDs.
-    :type pcimap: str or Path or None
-    :param access_method: The access method to use to find devices.
-       Set this to ``help`` to list the available access methods in a
-       human-readable format. For the machine-readable format, see
-       :func:`list_access_methods`.
-    :type access_method: str or None
-    :param pcilib_params: Parameters passed to pcilib's access methods.
-       To list the available parameters with their description and default
-       values, see :func:`list_pcilib_params`.
-    :type pcilib_params: Mapping[str, Any] or None
-    :param file: An hexadecimal dump from ``lspci -x`` to load data from,
-       instead of accessing real hardware.
-    :type file: str or Path or None
-    :param bool verbose: Increase verbosity.
-       This radically changes the output format.
-    :param bool kernel_drivers: Also include kernel modules and drivers
-       in the output. Only has effect with the verbose output.
-    :param bool bridge_paths: Add PCI bridge paths to slot numbers.
-    :param bool hide_single_domain: If there is a single PCI domain on this
-       machine and it is numbered ``0000``, hide it from the slot numbers.
-    :param id_resolve_option: Device, vendor or class ID outputting mode.
-       See the :class:`IDResolveOption` docs for more details.
-    :type id_resolve_option: IDResolveOption
-    :param slot_filter: Filter devices by their slot
-      (domain, bus, device, function)
-    :type slot_filter: SlotFilter or str or None
-    :param device_filter: Filter devices by their vendor, device or class ID
-    :type device_filter: DeviceFilter or str or None
-    :return: Any output from the ``lspci`` command.
-    :rtype: str
-    :raises subprocess.CalledProcessError:
-       ``lspci`` returned a non-zero error code.
+    This accepts the same arguments as :func:`lspci`.
+
+    :return: The ``lspci`` command and its arguments.
+    :rtype: List[str]
     """
     args: List[str] = ['lspci', '-mm']
     if verbose:
@@ -138,12 +122,242 @@ def lspci(
     for key, value in pcilib_params.items():
         args.append('-O{}={}'.format(key, value))
 
-    return subprocess.check_output(
-        args,
-        universal_newlines=True,
+    return args
+
+
+def lspci(
+        pciids: OptionalPath = None,
+        pcimap: OptionalPath = None,
+        access_method: Optional[str] = None,
+        pcilib_params: Mapping[str, Any] = {},
+        file: OptionalPath = None,
+        verbose: bool = False,
+        kernel_drivers: bool = False,
+        bridge_paths: bool = False,
+        hide_single_domain: bool = True,
+        id_resolve_option: IDResolveOption = IDResolveOption.Both,
+        slot_filter: Optional[Union[SlotFilter, str]] = None,
+        device_filter: Optional[Union[DeviceFilter, str]] = None,
+        cache: Optional[LspciCache] = None,
+        ) -> str:
+    """
+    Call the ``lspci`` command with various parameters.
+
+    :param pciids: An optional path to a ``pciids`` file,
+       to convert hexadecimal class, vendor or device IDs into names.
+    :type pciids: str or Path or None
+    :param pcimap: An optional path to a ``pcimap`` file,
+       linking Linux kernel modules and their supported PCI IDs.
+    :type pcimap: str or Path or None
+    :param access_method: The access method to use to find devices.
+       Set this to ``help`` to list the available access methods in a
+       human-readable format. For the machine-readable format, see
+       :func:`list_access_methods`.
+    :type access_method: str or None
+    :param pcilib_params: Parameters passed to pcilib's access methods.
+       To list the available parameters with their description and default
+       values, see :func:`list_pcilib_params`.
+    :type pcilib_params: Mapping[str, Any] or None
+    :param file: An hexadecimal dump from ``lspci -x`` to load data from,
+       instead of accessing real hardware.
+    :type file: str or Path or None
+    :param bool verbose: Increase verbosity.
+       This radically changes the output format.
+    :param bool kernel_drivers: Also include kernel modules and drivers
+       in the output. Only has effect with the verbose output.
+    :param bool bridge_paths: Add PCI bridge paths to slot numbers.
+    :param bool hide_single_domain: If there is a single PCI domain on this
+       machine and it is numbered ``0000``, hide it from the slot numbers.
+    :param id_resolve_option: Device, vendor or class ID outputting mode.
+       See the :class:`IDResolveOption` docs for more details.
+    :type id_resolve_option: IDResolveOption
+    :param slot_filter: Filter devices by their slot
+      (domain, bus, device, function)
+    :type slot_filter: SlotFilter or str or None
+    :param device_filter: Filter devices by their vendor, device or class ID
+    :type device_filter: DeviceFilter or str or None
+    :param cache: An optional cache to reuse a recent output of ``lspci``
+       called with the same arguments.
+    :type cache: LspciCache or None
+    :return: Any output from the ``lspci`` command.
+    :rtype: str
+    :raises subprocess.CalledProcessError:
+       ``lspci`` returned a non-zero error code.
+    """
+    args = lspci_args(
+        pciids=pciids,
+        pcimap=pcimap,
+        access_method=access_method,
+        pcilib_params=pcilib_params,
+        file=file,
+        verbose=verbose,
+        kernel_drivers=kernel_drivers,
+        bridge_paths=bridge_paths,
+        hide_single_domain=hide_single_domain,
+        id_resolve_option=id_resolve_option,
+        slot_filter=slot_filter,
+        device_filter=device_filter,
+    )
+    with span('lspci'):
+        if cache is not None:
+            output = cache.get(args, partial(_check_output, args))
+        else:
+            output = _check_output(args)
+    count('lspci_chars', len(output))
+    return output
+
+
+def _check_output(args: List[str]) -> str:
+    return subprocess.check_output(args, universal_newlines=True)
+
+
+def iter_lspci(**kwargs: Any) -> Generator[str, None, None]:
+    """
+    Call the ``lspci`` command through a pipe and yield its output line by
+    line, as soon as each line is available, instead of waiting for
+    the command to exit.
+
+    If the iterator is closed before the end of the output, ``lspci`` is
+    killed. When a ``cache`` is set, the whole output is read or taken from
+    the cache before yielding the lines.
+
+    :param \\**kwargs: Arguments sent to :func:`lspci`. See its
+       documentation for a list of available arguments.
+    :type \\**kwargs: Any
+    :return: A generator of lines from the ``lspci`` output.
+    :rtype: Generator[str, None, None]
+    :raises subprocess.CalledProcessError:
+       ``lspci`` returned a non-zero error code.
+    """
+    cache: Optional[LspciCache] = kwargs.pop('cache', None)
+    if cache is not None:
+        yield from lspci(cache=cache, **kwargs).splitlines(keepends=True)
+        return
+
+    args = lspci_args(**kwargs)
+    with subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            universal_newlines=True) as process:
+        assert process.stdout is not None
+        chars = 0
+        try:
+            for line in process.stdout:
+                chars += len(line)
+                yield line
+        except GeneratorExit:
+            process.kill()
+            raise
+        finally:
+            count('lspci_chars', chars)
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args)
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    try:
+        process.kill()
+    except ProcessLookupError:  # Already exited
+        pass
+
+
+# asyncio.get_running_loop is only available since Python 3.7
+_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+async def _wait_until(awaitable: Awaitable[T],
+                      deadline: Optional[float]) -> T:
+    if deadline is None:
+        return await awaitable
+    return await asyncio.wait_for(
+        awaitable,
+        max(0, deadline - _running_loop().time()),
     )
 
 
+async def async_lspci(timeout: Optional[float] = None, **kwargs: Any) -> str:
+    """
+    Call the ``lspci`` command without blocking the event loop.
+
+    If the call times out or the task is cancelled, ``lspci`` is killed.
+
+    :param timeout: An optional timeout, in seconds.
+    :type timeout: float or None
+    :param \\**kwargs: Arguments sent to :func:`lspci`. See its
+       documentation for a list of available arguments; a ``cache`` is
+       ignored.
+    :type \\**kwargs: Any
+    :return: Any output from the ``lspci`` command.
+    :rtype: str
+    :raises subprocess.CalledProcessError:
+       ``lspci`` returned a non-zero error code.
+    :raises asyncio.TimeoutError: ``lspci`` did not exit in time.
+    """
+    # Caches are only used synchronously
+    kwargs.pop('cache', None)
+    args = lspci_args(**kwargs)
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE)
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except BaseException:
+        _kill(process)
+        await process.wait()
+        raise
+    output = stdout.decode(locale.getpreferredencoding(False))
+    if process.returncode:
+        raise subprocess.CalledProcessError(
+            process.returncode, args, output=output)
+    return output
+
+
+async def aiter_lspci(timeout: Optional[float] = None,
+                      **kwargs: Any) -> AsyncIterator[str]:
+    """
+    Call the ``lspci`` command without blocking the event loop, and yield its
+    output line by line, as soon as each line is available.
+
+    If the call times out, the task is cancelled or the iterator is closed
+    before the end of the output, ``lspci`` is killed.
+
+    :param timeout: An optional timeout, in seconds, for the whole output.
+    :type timeout: float or None
+    :param \\**kwargs: Arguments sent to :func:`lspci`. See its
+       documentation for a list of available arguments; a ``cache`` is
+       ignored.
+    :type \\**kwargs: Any
+    :return: An asynchronous iterator of lines from the ``lspci`` output.
+    :rtype: AsyncIterator[str]
+    :raises subprocess.CalledProcessError:
+       ``lspci`` returned a non-zero error code.
+    :raises asyncio.TimeoutError: ``lspci`` did not exit in time.
+    """
+    # Caches are only used synchronously
+    kwargs.pop('cache', None)
+    args = lspci_args(**kwargs)
+    deadline: Optional[float] = None
+    if timeout is not None:
+        deadline = _running_loop().time() + timeout
+    encoding = locale.getpreferredencoding(False)
+
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE)
+    assert process.stdout is not None
+    try:
+        while True:
+            line = await _wait_until(process.stdout.readline(), deadline)
+            if not line:
+                break
+            yield line.decode(encoding)
+        await _wait_until(process.wait(), deadline)
+    except BaseException:
+        _kill(process)
+        await process.wait()
+        raise
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args)
+
+
 def list_access_methods() -> List[str]:
     """
     Calls ``lspci(access_method='help')`` to list the PCI access methods
@@ -201,6 +415,10 @@ class CommandBuilder(object):
     Iterating over the builder will result in the command being called,
     and will return strings, devices or pcilib parameters, one at a time,
     depending on the parsing settings.
+
+    The builder also supports asynchronous iteration, with ``async for``,
+    which calls lspci without blocking the event loop and parses devices
+    as the output arrives.
     """
 
     _list_access_methods: bool = False
@@ -208,6 +426,11 @@ class CommandBuilder(object):
     _list_pcilib_params_raw: bool = False
     _params: MutableMapping[str, Any] = {}
     _parser: Optional[Parser] = None
+    _sysfs_path: Optional[Path] = None
+    _sysfs_config: bool = False
+    _native_dump: bool = False
+    _stream: bool = False
+    _timeout: Optional[float] = None
 
     def __init__(self, **kwargs: Any):
         self._params = kwargs
@@ -221,6 +444,23 @@ class CommandBuilder(object):
                 result = list_pcilib_params_raw()
             else:
                 result = list_pcilib_params()
+        elif self._sysfs_path:
+            with span('sysfs'):
+                devices = self._query().filter(
+                    SysfsReader(self._sysfs_path).read_devices(
+                        kernel_modules=self._params.get(
+                            'kernel_drivers', False),
+                        config=self._sysfs_config,
+                    )
+                )
+            result = self._resolve(devices)
+        elif self._native_dump and self._params.get('file'):
+            with span('dump'):
+                devices = self._query().filter(
+                    DumpReader(self._params['file']).iter_devices())
+            result = self._resolve(devices)
+        elif self._parser and self._stream:
+            return self._parser.iter_parse(iter_lspci(**self._params))
         elif self._parser:
             result = self._parser.parse(lspci(**self._params))
         else:
@@ -230,6 +470,159 @@ class CommandBuilder(object):
             return iter([result, ])
         return iter(result)
 
+    def _query(self) -> DeviceQuery:
+        return DeviceQuery(
+            slot_filter=self._params.get('slot_filter'),
+            device_filter=self._params.get('device_filter'),
+        )
+
+    def _database(self) -> Optional[CachedPciIdsDatabase]:
+        """
+        Get the database to add names to devices read without lspci,
+        unless names are disabled.
+        """
+        pciids = self._params.get('pciids') or find_pciids()
+        if pciids and self._params.get('id_resolve_option') \
+                != IDResolveOption.IDOnly:
+            return CachedPciIdsDatabase(pciids)
+        return None
+
+    def _resolve(self, devices: List[Device]) -> List[Device]:
+        """
+        Add names to devices read without lspci, unless names are disabled.
+        """
+        database = self._database()
+        if database is not None:
+            with span('resolve'):
+                return list(map(database.resolve, devices))
+        return devices
+
+    def watch(self,
+              source: Optional[Iterable[bytes]] = None,
+              initial: bool = False) -> Iterator[DeviceEvent]:
+        """
+        Watch for devices being added, removed or changed, from kernel
+        uevents instead of polling lspci. Devices are read from the sysfs
+        mount point set with :meth:`use_sysfs`, or ``/sys``, with the same
+        settings as when listing devices from sysfs.
+
+        See :class:`pylspci.watch.DeviceWatcher`.
+
+        :param source: An iterable of raw uevent messages. Defaults to a
+           netlink socket.
+        :type source: Iterable[bytes] or None
+        :param bool initial: Start by reporting all the current devices
+           as added.
+        :returns: An endless iterator of events.
+        :rtype: Iterator[DeviceEvent]
+        :raises OSError: Netlink is unavailable.
+        """
+        return DeviceWatcher(
+            self._sysfs_path or DEFAULT_SYSFS_PATH,
+            kernel_modules=self._params.get('kernel_drivers', False),
+            query=self._query(),
+            database=self._database(),
+        ).watch(source, initial=initial)
+
+    def query_many(self,
+                   queries: Iterable[Union[DeviceQuery, QueryArgs]],
+                   ) -> List[List[Device]]:
+        """
+        Answer many queries with a single call to lspci, or a single read of
+        sysfs or of a hex dump, instead of calling lspci once for each
+        combination of filters. The devices are then selected for each query
+        with a :class:`DeviceIndex <pylspci.index.DeviceIndex>`, and the
+        results are the same as with one filtered call for each query.
+
+        Filters set on the builder itself still apply to all queries.
+
+        :param queries: Device queries, or pairs of slot and device filters
+           as filter objects, strings in lspci's syntax, or None.
+        :type queries: Iterable[DeviceQuery or Tuple[SlotFilter or str or
+           None, DeviceFilter or str or None]]
+        :returns: The matching devices for each query, in the same order as
+           the queries.
+        :rtype: List[List[Device]]
+        :raises ValueError: The builder does not list devices, or a query
+           filters devices by IDs that are not in the output of lspci.
+        """
+        device_queries = [
+            query if isinstance(query, DeviceQuery) else DeviceQuery(*query)
+            for query in queries
+        ]
+        native = self._sysfs_path \
+            or (self._native_dump and self._params.get('file'))
+        if self._list_access_methods or self._list_pcilib_params \
+                or not (native or self._parser):
+            raise ValueError('Queries require a parser, sysfs or a hex dump')
+        if not native \
+                and any(query.device_filter for query in device_queries) \
+                and self._params.get('id_resolve_option') \
+                == IDResolveOption.NameOnly:
+            raise ValueError(
+                'Device filters cannot be checked without IDs; '
+                'use with_ids() to include them in the output of lspci')
+        index = DeviceIndex(cast(Iterator[Device], iter(self)))
+        return list(map(index.query, device_queries))
+
+    def key(self) -> Hashable:
+        """
+        Get a key identifying the results of iterating over this builder,
+        equal for builders with the same settings. ``lspci`` arguments are
+        keyed on their command line, like
+        :class:`LspciCache <pylspci.cache.LspciCache>` does, and the cache
+        and streaming settings are ignored.
+
+        See :meth:`Scanner.scan <pylspci.scanner.Scanner.scan>`.
+
+        :returns: A hashable key.
+        :rtype: Hashable
+        """
+        parser: Optional[Tuple[Any, ...]] = None
+        if self._parser is not None:
+            parser = (type(self._parser), tuple(sorted(
+                (name, value)
+                for name, value in vars(self._parser).items()
+                if not name.startswith('_')
+            )))
+        params = {
+            name: value for name, value in self._params.items()
+            if name != 'cache'
+        }
+        return (
+            self._list_access_methods,
+            self._list_pcilib_params,
+            self._list_pcilib_params_raw,
+            self._sysfs_path,
+            self._sysfs_config,
+            self._native_dump,
+            parser,
+            tuple(lspci_args(**params)),
+        )
+
+    def __aiter__(self) -> AsyncIterator[
+            Union[str, Device, PCIAccessParameter]]:
+        return self._aiter()
+
+    async def _aiter(self) -> AsyncIterator[
+            Union[str, Device, PCIAccessParameter]]:
+        if self._list_access_methods or self._list_pcilib_params \
+                or self._sysfs_path \
+                or (self._native_dump and self._params.get('file')):
+            # Those are quick enough; avoid blocking the loop anyway
+            results = await _running_loop().run_in_executor(
+                None, list, self)
+            for result in results:
+                yield result
+            return
+
+        if self._parser:
+            async for device in self._parser.aiter_parse(
+                    aiter_lspci(timeout=self._timeout, **self._params)):
+                yield device
+        else:
+            yield await async_lspci(timeout=self._timeout, **self._params)
+
     def use_pciids(self,
                    path: OptionalPath,
                    check: bool = True) -> 'CommandBuilder':
@@ -287,6 +680,92 @@ class CommandBuilder(object):
         self._params['access_method'] = method
         return self
 
+    def use_cache(self, cache: Optional[LspciCache]) -> 'CommandBuilder':
+        """
+        Reuse recent outputs of lspci called with the same arguments.
+        A cache can be shared between many builders. The cache is not used
+        when iterating asynchronously over the builder.
+
+        See :class:`pylspci.cache.LspciCache`.
+
+        :param cache: The cache to use. Set to None to always call lspci.
+        :type cache: LspciCache or None
+        :returns: The current CommandBuilder instance.
+        :rtype: CommandBuilder
+        """
+        self._params['cache'] = cache
+        return self
+
+    def with_timeout(self, timeout: Optional[float]) -> 'CommandBuilder':
+        """
+        Kill lspci if it does not exit in time when iterating asynchronously
+        over the builder, with ``async for``.
+
+        :param timeout: The timeout, in seconds. Set to None to wait forever.
+        :type timeout: float or None
+        :returns: The current CommandBuilder instance.
+        :rtype: CommandBuilder
+        """
+        self._timeout = timeout
+        return self
+
+    def stream(self, value: bool = True) -> 'CommandBuilder':
+        """
+        When iterating over the builder with a parser, read the output of
+        lspci through a pipe and yield each device as soon as it has been
+        parsed, instead of parsing the whole output first. This lowers the
+        memory usage and the delay until the first device, but errors from
+        lspci are only raised at the end of the output.
+
+        See :func:`iter_lspci` and
+        :meth:`Parser.iter_parse <pylspci.parsers.base.Parser.iter_parse>`.
+
+        :param bool value: Enable or disable streaming.
+        :returns: The current CommandBuilder instance.
+        :rtype: CommandBuilder
+        """
+        self._stream = value
+        return self
+
+    def use_sysfs(self,
+                  path: OptionalPath = DEFAULT_SYSFS_PATH,
+                  check: bool = True,
+                  config: bool = False) -> 'CommandBuilder':
+        """
+        Read devices directly from sysfs instead of calling lspci.
+        The parser settings are ignored. Devices always include IDs; names
+        are looked up in the PCI ID database set with :meth:`use_pciids`,
+        or the system's database, unless names are disabled with
+        :meth:`with_names`. Kernel modules are only included if kernel
+        drivers are enabled with :meth:`include_kernel_drivers`.
+        Slot and device filters are applied to the devices read from sysfs;
+        see :class:`pylspci.filters.DeviceQuery`.
+
+        See :class:`pylspci.sysfs.SysfsReader` and
+        :class:`pylspci.pciids.CachedPciIdsDatabase`.
+
+        :param path: A string or path-like object pointing to the sysfs
+           mount point. Set to None to call lspci instead.
+        :type path: str or Path or None
+        :param bool check: Whether to check for the folder's existence
+           immediately, or delay that to the sysfs reading.
+        :param bool config: Also read the configuration space of each device
+           into :attr:`Device.config <pylspci.device.Device.config>`, to
+           decode its capabilities.
+        :returns: The current CommandBuilder instance.
+        :rtype: CommandBuilder
+        """
+        self._sysfs_config = config
+        if path:
+            if not isinstance(path, Path):
+                path = Path(path)
+            if check:
+                assert path.is_dir(), 'sysfs folder not found'
+            self._sysfs_path = path
+        else:
+            self._sysfs_path = None
+        return self
+
     def list_access_methods(self, value: bool = True) -> 'CommandBuilder':
         """
         List the pcilib access methods instead of listing devices.
@@ -343,7 +822,8 @@ class CommandBuilder(object):
 
     def from_file(self,
                   path: OptionalPath,
-                  check: bool = True) -> 'CommandBuilder':
+                  check: bool = True,
+                  native: bool = False) -> 'CommandBuilder':
         """
         Use a hexadecimal dump from a previous run of lspci instead of
         accessing the host's devices directly.
@@ -353,6 +833,11 @@ class CommandBuilder(object):
         :type path: str or Path or None
         :param bool check: Whether to check for the file's existence
            immediately, or delay that to the lspci invocation.
+        :param bool native: Read the dump file without calling lspci, using
+           a :class:`pylspci.dump.DumpReader`. The parser settings are then
+           ignored, and devices are built from their configuration space
+           headers only. Names are looked up as with :meth:`use_sysfs`,
+           and slot and device filters are applied.
         :returns: The current CommandBuilder instance.
         :rtype: CommandBuilder
         """
@@ -362,6 +847,7 @@ class CommandBuilder(object):
             if check:
                 assert path.is_file(), 'Hex dump file not found'
         self._params['file'] = path
+        self._native_dump = native
         return self
 
     def verbose(self, value: bool = True) -> 'CommandBuilder':
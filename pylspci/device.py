@@ -1,5 +1,8 @@
-from typing import Dict, List, NamedTuple, Optional, Union
+from typing import (
+    Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+)
 
+from pylspci.capabilities import ConfigSpace
 from pylspci.fields import NameWithID, NameWithIDDict, Slot, SlotDict
 
 DeviceDict = Dict[str, Union[
@@ -82,6 +85,13 @@ class Device(NamedTuple):
     The device's physical slot number (Linux only).
     """
 
+    config: Optional[ConfigSpace] = None
+    """
+    The device's raw configuration space, to decode its capabilities,
+    when read from a hex dump, or from sysfs when requested. It is not
+    included in :meth:`as_dict`.
+    """
+
     def as_dict(self) -> DeviceDict:
         """
         Serialize this device as a JSON-serializable `dict`.
@@ -109,3 +119,218 @@ class Device(NamedTuple):
             "iommu_group": self.iommu_group,
             "physical_slot": self.physical_slot,
         }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'Device':
+        """
+        Build a device from a `dict`, as returned by :meth:`as_dict`,
+        without parsing any string. Optional fields may be omitted.
+
+        :param data: The serialized device.
+        :type data: Mapping[str, Any]
+        :returns: The device.
+        :rtype: Device
+        :raises KeyError: A required field is missing.
+        :raises TypeError: A field has an invalid type.
+        :raises ValueError: The slot is invalid.
+        """
+        cls_data = data['cls']
+        vendor = data['vendor']
+        device = data['device']
+        subsystem_vendor = data.get('subsystem_vendor')
+        subsystem_device = data.get('subsystem_device')
+        # Calling the name cache directly and building the tuple directly,
+        # without keyword arguments, make decoding large snapshots faster
+        name = NameWithID._intern
+        return cls._make((
+            Slot.from_dict(data['slot']),
+            name(cls_data.get('id'), cls_data.get('name')),
+            name(vendor.get('id'), vendor.get('name')),
+            name(device.get('id'), device.get('name')),
+            name(subsystem_vendor.get('id'), subsystem_vendor.get('name'))
+            if subsystem_vendor is not None else None,
+            name(subsystem_device.get('id'), subsystem_device.get('name'))
+            if subsystem_device is not None else None,
+            data.get('revision'),
+            data.get('progif'),
+            data.get('driver'),
+            data.get('kernel_modules') or [],
+            data.get('numa_node'),
+            data.get('iommu_group'),
+            data.get('physical_slot'),
+            None,  # config
+        ))
+
+
+class LazyDevice(object):
+    """
+    Keeps the raw record a device was parsed from, and only decodes each
+    field of the device the first time it is accessed, to avoid building
+    slots, names and lists that are never read. Decoded fields are cached.
+
+    Lazy devices have the same fields as a :class:`Device`. They can be
+    compared with devices, serialized with :meth:`as_dict`, and
+    :meth:`_replace` returns a regular :class:`Device`. Comparing or
+    pickling a lazy device decodes all of its fields. Errors in a field,
+    such as a missing slot, are only raised when the field is accessed.
+
+    Lazy devices are neither tuples nor :class:`Device` instances, so they
+    cannot be indexed, unpacked, iterated over or concatenated like devices.
+    Use :meth:`as_device` to get a regular device for positional use.
+
+    Lazy devices are built by parsers, such as with
+    ``VerboseParser(lazy=True)``.
+
+    :param record: The raw record of the device, such as its lines.
+    :type record: Any
+    :param read: A function splitting a record into the raw value of each
+       field, by field name. Missing fields take their default value.
+    :type read: Callable[[Any], Mapping[str, Any]]
+    :param decode: A function decoding the raw value of a field from its
+       name and raw value.
+    :type decode: Callable[[str, Any], Any]
+    """
+
+    _fields = Device._fields
+
+    # The fields are class descriptors storing their values in __dict__
+    slot: Slot
+    cls: NameWithID
+    vendor: NameWithID
+    device: NameWithID
+    subsystem_vendor: Optional[NameWithID]
+    subsystem_device: Optional[NameWithID]
+    revision: Optional[int]
+    progif: Optional[int]
+    driver: Optional[str]
+    kernel_modules: List[str]
+    numa_node: Optional[int]
+    iommu_group: Optional[int]
+    physical_slot: Optional[str]
+    config: Optional[ConfigSpace]
+
+    def __init__(self,
+                 record: Any,
+                 read: Callable[[Any], Mapping[str, Any]],
+                 decode: Callable[[str, Any], Any]) -> None:
+        self._record = record
+        self._read = read
+        self._decode = decode
+
+    def _raw(self) -> Mapping[str, Any]:
+        raw = self.__dict__.get('_raw_values')
+        if raw is None:
+            raw = self.__dict__['_raw_values'] = self._read(self._record)
+        return raw
+
+    def _get(self, name: str) -> Any:
+        raw = self._raw()
+        if name in raw:
+            return self._decode(name, raw[name])
+        if name not in Device._field_defaults:
+            raise TypeError('Missing required field {!r}'.format(name))
+        return Device._field_defaults[name]
+
+    def as_device(self) -> Device:
+        """
+        Decode all the fields into a regular :class:`Device`.
+
+        :returns: The decoded device.
+        :rtype: Device
+        """
+        device = self.__dict__.get('_decoded')
+        if device is None:
+            device = self.__dict__['_decoded'] = Device._make(
+                getattr(self, name) for name in Device._fields)
+        return device
+
+    def as_dict(self) -> DeviceDict:
+        """
+        Serialize this device as a JSON-serializable `dict`.
+        See :meth:`Device.as_dict`.
+        """
+        return self.as_device().as_dict()
+
+    def _asdict(self) -> Dict[str, Any]:
+        return self.as_device()._asdict()
+
+    def _replace(self, **kwargs: Any) -> Device:
+        return self.as_device()._replace(**kwargs)
+
+    @staticmethod
+    def _tuple(other: Any) -> Optional[Tuple[Any, ...]]:
+        if isinstance(other, LazyDevice):
+            return other.as_device()
+        if isinstance(other, tuple):
+            return other
+        return None
+
+    def __eq__(self, other: Any) -> bool:
+        other = self._tuple(other)
+        if other is None:
+            return NotImplemented
+        return self.as_device() == other
+
+    def __ne__(self, other: Any) -> bool:
+        other = self._tuple(other)
+        if other is None:
+            return NotImplemented
+        return self.as_device() != other
+
+    def __lt__(self, other: Any) -> bool:
+        other = self._tuple(other)
+        if other is None:
+            return NotImplemented
+        return self.as_device() < other
+
+    def __le__(self, other: Any) -> bool:
+        other = self._tuple(other)
+        if other is None:
+            return NotImplemented
+        return self.as_device() <= other
+
+    def __gt__(self, other: Any) -> bool:
+        other = self._tuple(other)
+        if other is None:
+            return NotImplemented
+        return self.as_device() > other
+
+    def __ge__(self, other: Any) -> bool:
+        other = self._tuple(other)
+        if other is None:
+            return NotImplemented
+        return self.as_device() >= other
+
+    def __hash__(self) -> int:
+        return hash(self.as_device())
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + repr(self.as_device())[6:]
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Unpickled as a regular device, without the decoding functions
+        return (Device._make, (tuple(self.as_device()), ))
+
+
+class _LazyField(object):
+    """
+    Decodes a field of a :class:`LazyDevice` on first access. This is
+    a non-data descriptor, so once the value is stored in the instance's
+    dict, it is found there without calling the descriptor again.
+    """
+
+    __slots__ = ('name', )
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Optional[LazyDevice], owner: Any) -> Any:
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = instance._get(self.name)
+        return value
+
+
+for _name in Device._fields:
+    setattr(LazyDevice, _name, _LazyField(_name))
+del _name
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Compare two snapshots of the PCI devices of a host, to detect hotplug
+events and configuration drift.
+"""
+import argparse
+import json
+import sys
+from functools import lru_cache
+from operator import attrgetter
+from typing import (
+    Any, Callable, Dict, Iterable, List, NamedTuple, Sequence, Set, Tuple
+)
+
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+
+DIFF_FIELDS = tuple(
+    field for field in Device._fields if field not in ('slot', 'config'))
+"""
+The device fields compared by default; devices are matched on their slot,
+and configuration spaces are ignored.
+"""
+
+
+class FieldChange(NamedTuple):
+    """
+    Describes a change of a single field of a device.
+    """
+
+    field: str
+    """
+    Name of the changed :class:`Device <pylspci.device.Device>` field,
+    such as ``driver``.
+    """
+
+    old: Any
+    """
+    The field's value in the old snapshot.
+    """
+
+    new: Any
+    """
+    The field's value in the new snapshot.
+    """
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Serialize this change as a JSON-serializable `dict`.
+        """
+        return {
+            'field': self.field,
+            'old': _serialize(self.old),
+            'new': _serialize(self.new),
+        }
+
+
+class DeviceChange(NamedTuple):
+    """
+    Describes a device found in both snapshots, with different fields.
+    """
+
+    old: Device
+    """
+    The device in the old snapshot.
+    """
+
+    new: Device
+    """
+    The device in the new snapshot.
+    """
+
+    changes: List[FieldChange]
+    """
+    The changed fields.
+    """
+
+    @property
+    def slot(self) -> Slot:
+        """
+        The device's slot, which is the same in both snapshots.
+        """
+        return self.new.slot
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Serialize this change as a JSON-serializable `dict`.
+        """
+        return {
+            'slot': str(self.slot),
+            'changes': [change.as_dict() for change in self.changes],
+        }
+
+
+class DeviceDiff(NamedTuple):
+    """
+    Differences between two snapshots of the devices of a host.
+    """
+
+    added: List[Device]
+    """
+    Devices only found in the new snapshot, in their order in that snapshot.
+    """
+
+    removed: List[Device]
+    """
+    Devices only found in the old snapshot, in their order in that snapshot.
+    """
+
+    changed: List[DeviceChange]
+    """
+    Devices found in both snapshots with different fields, in their order
+    in the new snapshot.
+    """
+
+    @property
+    def empty(self) -> bool:
+        """
+        Whether both snapshots hold the same devices.
+        """
+        return not (self.added or self.removed or self.changed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Serialize this diff as a JSON-serializable `dict`.
+        """
+        return {
+            'added': [device.as_dict() for device in self.added],
+            'removed': [device.as_dict() for device in self.removed],
+            'changed': [change.as_dict() for change in self.changed],
+        }
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, (Slot, NameWithID)):
+        return value.as_dict()
+    return value
+
+
+@lru_cache(maxsize=32)
+def _key_function(
+        fields: Tuple[str, ...],
+        ) -> Callable[[Device], Tuple[Any, ...]]:
+    """
+    Build a function returning the values of some fields of a device as
+    a hashable tuple. Fields are read by name rather than by position, so
+    that lazy devices, which are not tuples, can also be compared.
+    """
+    getter: Callable[[Device], Tuple[Any, ...]]
+    if len(fields) > 1:
+        getter = attrgetter(*fields)
+    else:
+        # attrgetter would not return a tuple for a single field
+        name = fields[0]
+
+        def getter(device: Device) -> Tuple[Any, ...]:
+            return (getattr(device, name), )
+
+    if 'kernel_modules' not in fields:
+        return getter
+    # Lists are not hashable
+    i = fields.index('kernel_modules')
+
+    def key(device: Device) -> Tuple[Any, ...]:
+        values = getter(device)
+        return values[:i] + (tuple(values[i]), ) + values[i + 1:]
+
+    return key
+
+
+def fingerprint(device: Device, fields: Sequence[str] = DIFF_FIELDS) -> int:
+    """
+    Compute a hash of the compared fields of a device. Two devices with the
+    same fields have the same fingerprint, but different devices may also
+    share a fingerprint, so different fingerprints only prove that a device
+    changed.
+
+    Fingerprints rely on Python's :func:`hash`, so they should not be stored
+    or compared across processes.
+
+    :param device: The device to compute a fingerprint for.
+    :type device: Device
+    :param fields: Names of the fields to include.
+    :type fields: Sequence[str]
+    :returns: The fingerprint.
+    :rtype: int
+    """
+    return hash(_key_function(tuple(fields))(device))
+
+
+def diff(old_devices: Iterable[Device],
+         new_devices: Iterable[Device],
+         fields: Sequence[str] = DIFF_FIELDS) -> DeviceDiff:
+    """
+    Compare two snapshots of the devices of a host. Devices are matched on
+    their :class:`Slot <pylspci.fields.Slot>`; devices whose slot is only
+    found in one snapshot are added or removed, and devices whose fields
+    differ are changed, with one :class:`FieldChange` for each field.
+
+    Devices are matched through a dictionary and compared on a tuple of
+    their fields, so the comparison takes a time proportional to the
+    number of devices.
+
+    :param old_devices: The devices from the old snapshot.
+    :type old_devices: Iterable[Device]
+    :param new_devices: The devices from the new snapshot.
+    :type new_devices: Iterable[Device]
+    :param fields: Names of the fields to compare, to ignore expected
+       changes. Defaults to all fields except the slot and configuration
+       space.
+    :type fields: Sequence[str]
+    :returns: The differences between the snapshots.
+    :rtype: DeviceDiff
+    :raises ValueError: A field name is invalid.
+    """
+    unknown = set(fields).difference(Device._fields)
+    if unknown:
+        raise ValueError('Unknown device fields: {}'.format(
+            ', '.join(sorted(unknown))))
+    key = _key_function(tuple(fields))
+
+    old_by_slot: Dict[Slot, Device] = {
+        device.slot: device for device in old_devices}
+    added: List[Device] = []
+    changed: List[DeviceChange] = []
+    seen: Set[Slot] = set()
+    for new in new_devices:
+        seen.add(new.slot)
+        old = old_by_slot.get(new.slot)
+        if old is None:
+            added.append(new)
+            continue
+        if key(old) == key(new):
+            continue
+        changes = [
+            FieldChange(field, getattr(old, field), getattr(new, field))
+            for field in fields
+            if getattr(old, field) != getattr(new, field)
+        ]
+        if changes:
+            changed.append(DeviceChange(old=old, new=new, changes=changes))
+
+    removed = [
+        device for slot, device in old_by_slot.items() if slot not in seen]
+    return DeviceDiff(added=added, removed=removed, changed=changed)
+
+
+def load_snapshot(path: str) -> List[Device]:
+    """
+    Load devices from a JSON snapshot, as written by ``pylspci``.
+
+    :param str path: Path to the JSON file.
+    :returns: The devices in the snapshot.
+    :rtype: List[Device]
+    :raises ValueError: The file is not a valid snapshot.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON list of devices')
+    try:
+        return list(map(Device.from_dict, data))
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError('Invalid device in snapshot: {!r}'.format(e))
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='Compare two JSON snapshots written by pylspci. '
+                    'Exits with status 1 if they differ.',
+    )
+    parser.add_argument('old', help='Path to the old snapshot.')
+    parser.add_argument('new', help='Path to the new snapshot.')
+    parser.add_argument(
+        '-I', '--ignore',
+        help='Device field to ignore, such as numa_node. '
+             'Can be set multiple times.',
+        action='append',
+        choices=DIFF_FIELDS,
+        default=[],
+        metavar='FIELD',
+    )
+    return parser
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = get_parser()
+    args = parser.parse_args()
+    try:
+        old = load_snapshot(args.old)
+        new = load_snapshot(args.new)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    result = diff(
+        old,
+        new,
+        fields=[field for field in DIFF_FIELDS if field not in args.ignore],
+    )
+    print(json.dumps(result.as_dict()))
+    sys.exit(0 if result.empty else 1)
+
+
+if __name__ == '__main__':
+    main()
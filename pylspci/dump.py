@@ -0,0 +1,226 @@
+import mmap
+import re
+import struct
+from binascii import unhexlify
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from pylspci.capabilities import ConfigSpace
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+
+CONFIG_SPACE_SIZE = 4096
+"""
+Size of the extended configuration space of a PCI Express device,
+as dumped by ``lspci -xxxx``.
+"""
+
+HEADER_TYPE_NORMAL = 0
+HEADER_TYPE_BRIDGE = 1
+HEADER_TYPE_CARDBUS = 2
+
+CAPABILITY_ID_SSVID = 0x0d
+"""
+ID of the Bridge Subsystem Vendor ID capability, which holds the subsystem
+IDs of PCI-to-PCI bridges.
+"""
+
+# Either a slot at the start of a device's header line, such as
+# "00:1c.3 PCI bridge: Intel Corporation ...", or a line of configuration
+# space data, such as "00: 86 80 4e 24 ...". Any other line is ignored,
+# as lspci -F does.
+_LINE_REGEX = re.compile(
+    rb'^(?:'
+    rb'(?P<slot>(?:[0-9a-fA-F]{4,}:)?[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7])'
+    rb'(?:[ \t].*)?'
+    rb'|(?P<offset>[0-9a-fA-F]{1,3}):(?P<data>(?: [0-9a-fA-F]{2})+)[ \t]*'
+    rb')\r?$',
+    re.MULTILINE,
+)
+
+
+class DumpReader(object):
+    """
+    Reads devices from a hexadecimal dump of the configuration space of
+    PCI devices, as written by ``lspci -x``, ``-xxx`` or ``-xxxx``,
+    without calling ``lspci -F``. The file is read through a memory map,
+    so large dumps holding many devices are never loaded in memory at once.
+
+    Only the configuration space header is decoded. Devices are built with
+    IDs, but no names, the class and programming interface, the revision
+    and the subsystem IDs; their other fields are left unset. The whole
+    configuration space is available in :attr:`Device.config
+    <pylspci.device.Device.config>` to decode capabilities.
+
+    :param path: Path to the hex dump file.
+    :type path: str or Path
+    """
+
+    path: Path
+    """
+    Path to the hex dump file.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+
+    def iter_configs(self) -> Iterator[Tuple[Slot, memoryview]]:
+        """
+        Iterate over the devices in the dump file, as their slots and
+        the bytes of their configuration space.
+
+        The dump holds hexadecimal text, so the configuration space of each
+        device is decoded and copied into a new buffer, of at most
+        :data:`CONFIG_SPACE_SIZE` bytes; only the text of the file is read
+        through the memory map. The buffers are returned as memory views,
+        which can be sliced without further copies.
+
+        Configuration space bytes that were not dumped are set to zero.
+        The buffers are truncated after the last dumped byte.
+
+        :returns: An iterator of slots and configuration spaces.
+        :rtype: Iterator[Tuple[Slot, memoryview]]
+        """
+        with self.path.open('rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return
+        with data:
+            slot: Optional[Slot] = None
+            config = bytearray()
+            for match in _LINE_REGEX.finditer(data):
+                if match.group('slot'):
+                    if slot is not None:
+                        yield slot, memoryview(config)
+                    slot = Slot(match.group('slot').decode('ascii'))
+                    config = bytearray()
+                    continue
+                if slot is None:
+                    continue
+                offset = int(match.group('offset'), 16)
+                values = unhexlify(match.group('data').replace(b' ', b''))
+                end = min(offset + len(values), CONFIG_SPACE_SIZE)
+                if end > len(config):
+                    config.extend(bytes(end - len(config)))
+                config[offset:end] = values[:end - offset]
+            if slot is not None:
+                yield slot, memoryview(config)
+
+    def iter_devices(self) -> Iterator[Device]:
+        """
+        Iterate over the devices in the dump file.
+
+        :returns: An iterator of devices.
+        :rtype: Iterator[Device]
+        """
+        for slot, config in self.iter_configs():
+            yield decode_header(slot, config)
+
+    def read_devices(self) -> List[Device]:
+        """
+        Read all the devices in the dump file, in the order of the file.
+
+        :returns: A list of devices.
+        :rtype: List[Device]
+        """
+        return list(self.iter_devices())
+
+
+def _name(value: int) -> NameWithID:
+    return NameWithID._from_fields(value, None)
+
+
+def _find_capability(config: memoryview,
+                     pointer_offset: int,
+                     capability_id: int) -> Optional[int]:
+    """
+    Find the offset of a capability by walking the capability list,
+    as found in the standard configuration space.
+    """
+    if len(config) <= pointer_offset:
+        return None
+    pointer = config[pointer_offset] & 0xfc
+    # Guard against loops in broken dumps; there can be at most
+    # 48 capabilities in the standard configuration space.
+    for _ in range(48):
+        if pointer < 0x40 or pointer + 2 > len(config):
+            return None
+        if config[pointer] == capability_id:
+            return pointer
+        pointer = config[pointer + 1] & 0xfc
+    return None
+
+
+def _subsystem(config: memoryview) -> Tuple[int, int]:
+    """
+    Read the subsystem vendor and device IDs from the location that depends
+    on the header type, as lspci does, or return zeros when unavailable.
+    """
+    header_type = config[0x0e] & 0x7f
+    if header_type == HEADER_TYPE_NORMAL:
+        offset: Optional[int] = 0x2c
+    elif header_type == HEADER_TYPE_CARDBUS:
+        offset = 0x40
+    else:
+        offset = None
+        # Capabilities are only listed when the status register says so
+        if config[0x06] & 0x10:
+            capability = _find_capability(
+                config, 0x34, CAPABILITY_ID_SSVID)
+            if capability is not None:
+                offset = capability + 4
+    if offset is None or len(config) < offset + 4:
+        return 0, 0
+    vendor, device = struct.unpack_from('<HH', config, offset)
+    return vendor, device
+
+
+def decode_header(slot: Slot, config: memoryview) -> Device:
+    """
+    Decode the configuration space header of a device into a
+    :class:`Device <pylspci.device.Device>`, with IDs but no names.
+
+    :param slot: The slot of the device.
+    :type slot: Slot
+    :param config: The bytes of the configuration space of the device.
+       At least the first 64 bytes, as dumped by ``lspci -x``, are required.
+    :type config: memoryview
+    :returns: The decoded device.
+    :rtype: Device
+    :raises ValueError: The configuration space is too short.
+    """
+    if len(config) < 0x40:
+        raise ValueError(
+            'Configuration space of {} is too short: expected at least 64 '
+            'bytes, got {}'.format(slot, len(config)))
+    vendor, device, revision, progif, cls = \
+        struct.unpack_from('<HH4xBBH', config)
+    subsystem_vendor, subsystem_device = _subsystem(config)
+    has_subsystem = subsystem_vendor not in (0, 0xffff)
+    return Device(
+        slot=slot,
+        cls=_name(cls),
+        vendor=_name(vendor),
+        device=_name(device),
+        subsystem_vendor=_name(subsystem_vendor) if has_subsystem else None,
+        subsystem_device=_name(subsystem_device) if has_subsystem else None,
+        # lspci omits the revision and programming interface when zero
+        revision=revision or None,
+        progif=progif or None,
+        config=ConfigSpace(config),
+    )
+
+
+def read_devices(path: Union[str, Path]) -> List[Device]:
+    """
+    Read all the devices from a hex dump file, without calling ``lspci``.
+    Shortcut for :meth:`DumpReader.read_devices`.
+
+    :param path: Path to the hex dump file.
+    :type path: str or Path
+    :returns: A list of devices.
+    :rtype: List[Device]
+    """
+    return DumpReader(path).read_devices()
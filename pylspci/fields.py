@@ -1,6 +1,6 @@
 import re
-from functools import partial
-from typing import Any, Dict, Optional, Union
+from functools import lru_cache, partial
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
 
 # mypy does not support recursive type definitions
 # SlotDict = Dict[str, Union[int, 'SlotDict', None]]
@@ -9,6 +9,12 @@ NameWithIDDict = Dict[str, Union[int, str, None]]
 
 hexstring = partial(int, base=16)
 
+CACHE_SIZE = 4096
+"""
+Maximum number of parsed :class:`Slot` and :class:`NameWithID` instances
+to keep for reuse, for each class.
+"""
+
 
 class Slot(object):
     """
@@ -16,9 +22,14 @@ class Slot(object):
     where ``D`` is the domain, ``B`` the bus, ``d`` the device
     and ``f`` the function. The first three are hexadecimal numbers, but
     ``f`` is in octal.
+
+    Slots are immutable and hashable. Parsed slots are kept in a bounded
+    cache, so parsing the same string twice returns the same instance.
     """
 
-    domain: int = 0x0000
+    __slots__ = ('domain', 'bus', 'device', 'function', 'parent')
+
+    domain: int
     """
     The slot's domain, as a four-digit hexadecimal number.
     When omitted, defaults to ``0x0000``.
@@ -39,26 +50,102 @@ class Slot(object):
     The slot's function, as a single octal digit.
     """
 
-    parent: Optional["Slot"] = None
+    parent: Optional["Slot"]
     """
     The slot's parent bridge, if present.
     """
 
-    def __init__(self, value: str) -> None:
-        parent, _, me = value.rpartition('/')
-        if parent:
-            self.parent = Slot(parent)
+    def __new__(cls, value: str) -> 'Slot':
+        return cls._parse(value)
+
+    @classmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _parse(cls, value: str) -> 'Slot':
+        parent_value, _, me = value.rpartition('/')
+        parent = Slot(parent_value) if parent_value else None
 
         data = list(map(hexstring, re.split(r'[:\.]', me)))
         if len(data) == 3:
-            data.insert(0, self.parent.domain if self.parent else 0)
-        self.domain, self.bus, self.device, self.function = data
-
-        if self.device > 0x1f:
+            data.insert(0, parent.domain if parent else 0)
+        domain, bus, device, function = data
+        return cls._from_fields(domain, bus, device, function, parent)
+
+    @classmethod
+    def _from_fields(cls,
+                     domain: int,
+                     bus: int,
+                     device: int,
+                     function: int,
+                     parent: Optional['Slot'] = None) -> 'Slot':
+        """
+        Build a slot from its fields, without any parsing or caching.
+        """
+        if device > 0x1f:
             raise ValueError('Device numbers cannot be above 0x1f')
-        if self.function > 0x7:
+        if function > 0x7:
             raise ValueError('Function numbers cannot be above 7')
 
+        self = super().__new__(cls)
+        object.__setattr__(self, 'domain', domain)
+        object.__setattr__(self, 'bus', bus)
+        object.__setattr__(self, 'device', device)
+        object.__setattr__(self, 'function', function)
+        object.__setattr__(self, 'parent', parent)
+        return self
+
+    @classmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _intern(cls,
+                domain: int,
+                bus: int,
+                device: int,
+                function: int,
+                parent: Optional['Slot']) -> 'Slot':
+        return cls._from_fields(domain, bus, device, function, parent)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'Slot':
+        """
+        Build a slot from a `dict`, as returned by :meth:`as_dict`, without
+        any parsing. Like parsed slots, slots built from dicts are kept in
+        a bounded cache, so devices behind the same bridges share the same
+        parent instances.
+
+        :param data: The serialized slot.
+        :type data: Mapping[str, Any]
+        :returns: The slot.
+        :rtype: Slot
+        :raises KeyError: A required field is missing.
+        :raises ValueError: The device or function number is invalid.
+        """
+        parent = data.get('parent')
+        return cls._intern(
+            data['domain'],
+            data['bus'],
+            data['device'],
+            data['function'],
+            cls.from_dict(parent) if parent else None,
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('Slot objects are immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('Slot objects are immutable')
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (str(self), ))
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Slot) and \
+            (self.domain, self.bus, self.device, self.function, self.parent) \
+            == (other.domain, other.bus, other.device, other.function,
+                other.parent)
+
+    def __hash__(self) -> int:
+        return hash(
+            (self.domain, self.bus, self.device, self.function, self.parent))
+
     def __str__(self) -> str:
         output: str = '{:04x}:{:02x}:{:02x}.{:01x}'.format(
             self.domain, self.bus, self.device, self.function,
@@ -87,8 +174,13 @@ class NameWithID(object):
     """
     Describes a device, vendor or class with either
     a name, an hexadecimal PCI ID, or both.
+
+    Names are immutable and hashable. Parsed names are kept in a bounded
+    cache, so parsing the same string twice returns the same instance.
     """
 
+    __slots__ = ('id', 'name')
+
     id: Optional[int]
     """
     The PCI ID as a four-digit hexadecimal number.
@@ -101,25 +193,71 @@ class NameWithID(object):
 
     _NAME_ID_REGEX = re.compile(r'^(?P<name>.+)\s\[(?P<id>[0-9a-fA-F]{4})\]$')
 
-    def __init__(self, value: Optional[str]) -> None:
+    def __new__(cls, value: Optional[str]) -> 'NameWithID':
+        return cls._parse(value)
+
+    @classmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _parse(cls, value: Optional[str]) -> 'NameWithID':
         if value and value.endswith(']'):
             # Holds both an ID and a name
-            match = self._NAME_ID_REGEX.match(value)
+            match = cls._NAME_ID_REGEX.match(value)
             if not match:  # Except it doesn't
-                self.id = None
-                self.name = value
-                return
+                return cls._from_fields(None, value)
             gd = match.groupdict()
-            self.id = hexstring(gd['id'])
-            self.name = gd['name']
-            return
+            return cls._from_fields(hexstring(gd['id']), gd['name'])
 
         try:
-            self.id = hexstring(value)
-            self.name = None
+            return cls._from_fields(hexstring(value), None)
         except (TypeError, ValueError):
-            self.id = None
-            self.name = value
+            return cls._from_fields(None, value)
+
+    @classmethod
+    def _from_fields(cls,
+                     id: Optional[int],
+                     name: Optional[str]) -> 'NameWithID':
+        """
+        Build a name from its ID and name, without any parsing or caching.
+        """
+        self = super().__new__(cls)
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'name', name)
+        return self
+
+    @classmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _intern(cls, id: Optional[int], name: Optional[str]) -> 'NameWithID':
+        return cls._from_fields(id, name)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'NameWithID':
+        """
+        Build a name from a `dict`, as returned by :meth:`as_dict`, without
+        any parsing. Names built from dicts are kept in a bounded cache,
+        like parsed names.
+
+        :param data: The serialized name and ID.
+        :type data: Mapping[str, Any]
+        :returns: The name and ID.
+        :rtype: NameWithID
+        """
+        return cls._intern(data.get('id'), data.get('name'))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('NameWithID objects are immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('NameWithID objects are immutable')
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self._from_fields, (self.id, self.name))
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, NameWithID) and \
+            (self.id, self.name) == (other.id, other.name)
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.name))
 
     def __str__(self) -> str:
         if self.id and self.name:
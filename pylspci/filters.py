@@ -1,8 +1,12 @@
 import re
 from abc import ABC, abstractmethod
-from typing import Any, ClassVar, Dict, Optional, Pattern, Type, TypeVar
+from typing import (
+    Any, ClassVar, Dict, Iterable, List, Optional, Pattern, Type, TypeVar,
+    Union
+)
 
-from pylspci.fields import hexstring
+from pylspci.device import Device
+from pylspci.fields import NameWithID, hexstring
 
 T = TypeVar('T', bound='Filter')
 
@@ -32,6 +36,30 @@ class Filter(ABC):
     def __init__(self, **kwargs: Any) -> None:
         "Create a filter."
 
+    @abstractmethod
+    def matches(self, device: Device) -> bool:
+        """
+        Check whether a parsed device would be selected by this filter,
+        as lspci would.
+
+        :param device: The device to check.
+        :type device: Device
+        :returns: Whether the device matches.
+        :rtype: bool
+        """
+
+    def filter(self, devices: Iterable[Device]) -> List[Device]:
+        """
+        Select the parsed devices matching this filter, as lspci would,
+        without running lspci again.
+
+        :param devices: The devices to filter.
+        :type devices: Iterable[Device]
+        :returns: The matching devices, in the same order.
+        :rtype: List[Device]
+        """
+        return [device for device in devices if self.matches(device)]
+
 
 class SlotFilter(Filter):
     """
@@ -97,6 +125,13 @@ class SlotFilter(Filter):
         return (self.domain, self.bus, self.device, self.function) == \
             (other.domain, other.bus, other.device, other.function)
 
+    def matches(self, device: Device) -> bool:
+        slot = device.slot
+        return (self.domain is None or self.domain == slot.domain) \
+            and (self.bus is None or self.bus == slot.bus) \
+            and (self.device is None or self.device == slot.device) \
+            and (self.function is None or self.function == slot.function)
+
 
 class DeviceFilter(Filter):
     """
@@ -152,3 +187,97 @@ class DeviceFilter(Filter):
             return NotImplemented
         return (self.vendor, self.device, self.cls) == \
             (other.vendor, other.device, other.cls)
+
+    def matches(self, device: Device) -> bool:
+        """
+        Check whether a parsed device would be selected by this filter,
+        as lspci would. Devices parsed without IDs, for example with
+        ``lspci -mm`` instead of ``lspci -nnmm``, never match a filter
+        on the missing IDs.
+
+        :param device: The device to check.
+        :type device: Device
+        :returns: Whether the device matches.
+        :rtype: bool
+        """
+        return self._match_id(self.vendor, device.vendor) \
+            and self._match_id(self.device, device.device) \
+            and self._match_id(self.cls, device.cls)
+
+    @staticmethod
+    def _match_id(expected: Optional[int], value: NameWithID) -> bool:
+        return expected is None or expected == value.id
+
+
+class DeviceQuery(object):
+    """
+    Combines a slot filter and a device filter, as with the ``-s`` and ``-d``
+    options of lspci, to select devices from an already parsed device list.
+    A single lspci run can then answer many queries; see
+    :meth:`CommandBuilder.query_many
+    <pylspci.command.CommandBuilder.query_many>`.
+
+    :param slot_filter: A slot filter, or a string in lspci's slot filter
+       syntax.
+    :type slot_filter: SlotFilter or str or None
+    :param device_filter: A device filter, or a string in lspci's device
+       filter syntax.
+    :type device_filter: DeviceFilter or str or None
+    :raises ValueError: A filter string is invalid.
+    """
+
+    slot_filter: Optional[SlotFilter]
+    """
+    Optional slot filter.
+    """
+
+    device_filter: Optional[DeviceFilter]
+    """
+    Optional device filter.
+    """
+
+    def __init__(self,
+                 slot_filter: Optional[Union[SlotFilter, str]] = None,
+                 device_filter: Optional[Union[DeviceFilter, str]] = None,
+                 ) -> None:
+        if isinstance(slot_filter, str):
+            slot_filter = SlotFilter.parse(slot_filter)
+        if isinstance(device_filter, str):
+            device_filter = DeviceFilter.parse(device_filter)
+        self.slot_filter = slot_filter
+        self.device_filter = device_filter
+
+    def __repr__(self) -> str:
+        return '{}(slot_filter={!r}, device_filter={!r})'.format(
+            self.__class__.__name__, self.slot_filter, self.device_filter,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return (self.slot_filter, self.device_filter) == \
+            (other.slot_filter, other.device_filter)
+
+    def matches(self, device: Device) -> bool:
+        """
+        Check whether a parsed device matches both filters.
+
+        :param device: The device to check.
+        :type device: Device
+        :returns: Whether the device matches.
+        :rtype: bool
+        """
+        return (not self.slot_filter or self.slot_filter.matches(device)) \
+            and (not self.device_filter
+                 or self.device_filter.matches(device))
+
+    def filter(self, devices: Iterable[Device]) -> List[Device]:
+        """
+        Select the parsed devices matching both filters.
+
+        :param devices: The devices to filter.
+        :type devices: Iterable[Device]
+        :returns: The matching devices, in the same order.
+        :rtype: List[Device]
+        """
+        return [device for device in devices if self.matches(device)]
@@ -0,0 +1,260 @@
+from bisect import bisect_left, bisect_right
+from typing import (
+    Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+)
+
+from pylspci.device import Device
+from pylspci.fields import Slot
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
+
+SlotKey = Tuple[int, int, int, int]
+K = TypeVar('K')
+
+
+class DeviceIndex(object):
+    """
+    Indexes a list of parsed devices to answer many queries without going
+    through the whole list each time. Hash indexes are built for vendor,
+    device and class IDs, drivers, NUMA nodes and IOMMU groups, and a sorted
+    index is built on slots.
+
+    Results are always returned in the same order as in the original list.
+
+    :param devices: The devices to index.
+    :type devices: Iterable[Device]
+    """
+
+    devices: List[Device]
+    """
+    The indexed devices.
+    """
+
+    def __init__(self, devices: Iterable[Device]) -> None:
+        self.devices = list(devices)
+        self._vendors: Dict[int, List[int]] = {}
+        self._devices: Dict[Tuple[int, int], List[int]] = {}
+        self._classes: Dict[int, List[int]] = {}
+        self._drivers: Dict[str, List[int]] = {}
+        self._numa_nodes: Dict[int, List[int]] = {}
+        self._iommu_groups: Dict[int, List[int]] = {}
+
+        for i, device in enumerate(self.devices):
+            self._add(self._vendors, device.vendor.id, i)
+            if device.vendor.id is not None and device.device.id is not None:
+                self._add(
+                    self._devices, (device.vendor.id, device.device.id), i)
+            self._add(self._classes, device.cls.id, i)
+            self._add(self._drivers, device.driver, i)
+            self._add(self._numa_nodes, device.numa_node, i)
+            self._add(self._iommu_groups, device.iommu_group, i)
+
+        slots = sorted(
+            (self._slot_key(device.slot), i)
+            for i, device in enumerate(self.devices)
+        )
+        self._slot_keys: List[SlotKey] = [key for key, _ in slots]
+        self._slot_positions: List[int] = [i for _, i in slots]
+        self._domains: List[int] = sorted({key[0] for key in self._slot_keys})
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self.devices)
+
+    def __repr__(self) -> str:
+        return '<{} of {} devices>'.format(self.__class__.__name__, len(self))
+
+    @staticmethod
+    def _slot_key(slot: Slot) -> SlotKey:
+        return (slot.domain, slot.bus, slot.device, slot.function)
+
+    def _get(self, positions: Iterable[int]) -> List[Device]:
+        # Lists in the hash indexes are already sorted
+        return [self.devices[i] for i in positions]
+
+    @staticmethod
+    def _add(index: Dict[K, List[int]], key: Optional[K], i: int) -> None:
+        if key is not None:
+            index.setdefault(key, []).append(i)
+
+    @staticmethod
+    def _lookup(index: Dict[K, List[int]], key: K) -> List[int]:
+        return index.get(key, [])
+
+    def by_vendor(self,
+                  vendor: int,
+                  device: Optional[int] = None) -> List[Device]:
+        """
+        Find devices by vendor ID, and optionally device ID.
+
+        :param int vendor: A vendor ID.
+        :param device: An optional device ID.
+        :type device: int or None
+        :returns: The matching devices.
+        :rtype: List[Device]
+        """
+        if device is None:
+            return self._get(self._lookup(self._vendors, vendor))
+        return self._get(self._lookup(self._devices, (vendor, device)))
+
+    def by_class(self, cls: int) -> List[Device]:
+        """
+        Find devices by class ID, including the subclass, such as ``0x0604``.
+
+        :param int cls: A class ID.
+        :returns: The matching devices.
+        :rtype: List[Device]
+        """
+        return self._get(self._lookup(self._classes, cls))
+
+    def by_driver(self, driver: str) -> List[Device]:
+        """
+        Find devices by the name of the driver they use.
+
+        :param str driver: A driver name.
+        :returns: The matching devices.
+        :rtype: List[Device]
+        """
+        return self._get(self._lookup(self._drivers, driver))
+
+    def by_numa_node(self, numa_node: int) -> List[Device]:
+        """
+        Find devices connected to a NUMA node.
+
+        :param int numa_node: A NUMA node.
+        :returns: The matching devices.
+        :rtype: List[Device]
+        """
+        return self._get(self._lookup(self._numa_nodes, numa_node))
+
+    def by_iommu_group(self, iommu_group: int) -> List[Device]:
+        """
+        Find devices in an IOMMU group.
+
+        :param int iommu_group: An IOMMU group.
+        :returns: The matching devices.
+        :rtype: List[Device]
+        """
+        return self._get(self._lookup(self._iommu_groups, iommu_group))
+
+    def by_slot(self, slot: Union[Slot, str]) -> Optional[Device]:
+        """
+        Find a device by its slot.
+
+        :param slot: A slot, or a slot string such as ``00:1c.3``.
+        :type slot: Slot or str
+        :returns: The device, if found.
+        :rtype: Device or None
+        """
+        if isinstance(slot, str):
+            slot = Slot(slot)
+        key = self._slot_key(slot)
+        start = bisect_left(self._slot_keys, key)
+        end = bisect_right(self._slot_keys, key)
+        for i in self._slot_positions[start:end]:
+            # Devices behind different bridges could share the same numbers
+            if self.devices[i].slot == slot:
+                return self.devices[i]
+        return None
+
+    def _slot_range(self, prefix: Tuple[int, ...]) -> List[int]:
+        start = bisect_left(self._slot_keys, prefix)
+        end = bisect_left(self._slot_keys, prefix[:-1] + (prefix[-1] + 1, ))
+        return self._slot_positions[start:end]
+
+    def _slot_candidates(self, slot_filter: SlotFilter) -> Optional[List[int]]:
+        """
+        Use the sorted slot index to find the devices matching the leading
+        fields of a slot filter, or return None when neither the domain nor
+        the bus are set.
+        """
+        prefix: Tuple[int, ...] = ()
+        for value in (slot_filter.bus, slot_filter.device,
+                      slot_filter.function):
+            if value is None:
+                break
+            prefix += (value, )
+        if slot_filter.domain is not None:
+            return self._slot_range((slot_filter.domain, ) + prefix)
+        if not prefix:
+            return None
+        # lspci usually hides the domain, so look up the prefix
+        # in each domain; there are very few of them.
+        return [
+            i
+            for domain in self._domains
+            for i in self._slot_range((domain, ) + prefix)
+        ]
+
+    def _device_candidates(self,
+                           device_filter: DeviceFilter,
+                           ) -> Optional[List[int]]:
+        """
+        Use the hash indexes to find the smallest list of devices
+        that could match a device filter, or return None when no field
+        is set.
+        """
+        candidates: List[List[int]] = []
+        if device_filter.vendor is not None:
+            if device_filter.device is not None:
+                candidates.append(self._lookup(
+                    self._devices,
+                    (device_filter.vendor, device_filter.device),
+                ))
+            else:
+                candidates.append(
+                    self._lookup(self._vendors, device_filter.vendor))
+        if device_filter.cls is not None:
+            candidates.append(self._lookup(self._classes, device_filter.cls))
+        if not candidates:
+            return None
+        return min(candidates, key=len)
+
+    def select(self,
+               slot_filter: Optional[Union[SlotFilter, str]] = None,
+               device_filter: Optional[Union[DeviceFilter, str]] = None,
+               ) -> List[Device]:
+        """
+        Find devices matching a slot filter and a device filter, as lspci
+        would with the ``-s`` and ``-d`` options, using the indexes to avoid
+        checking every device.
+
+        :param slot_filter: A slot filter, or a string in lspci's slot filter
+           syntax.
+        :type slot_filter: SlotFilter or str or None
+        :param device_filter: A device filter, or a string in lspci's device
+           filter syntax.
+        :type device_filter: DeviceFilter or str or None
+        :returns: The matching devices.
+        :rtype: List[Device]
+        :raises ValueError: A filter string is invalid.
+        """
+        return self.query(DeviceQuery(slot_filter, device_filter))
+
+    def query(self, query: DeviceQuery) -> List[Device]:
+        """
+        Find devices matching a query, using the indexes to avoid checking
+        every device.
+
+        :param query: A device query.
+        :type query: DeviceQuery
+        :returns: The matching devices.
+        :rtype: List[Device]
+        """
+        candidates: List[List[int]] = []
+        if query.slot_filter:
+            slot_candidates = self._slot_candidates(query.slot_filter)
+            if slot_candidates is not None:
+                candidates.append(slot_candidates)
+        if query.device_filter:
+            device_candidates = self._device_candidates(query.device_filter)
+            if device_candidates is not None:
+                candidates.append(device_candidates)
+
+        if not candidates:
+            return query.filter(self.devices)
+        return self._get(sorted(
+            i for i in min(candidates, key=len)
+            if query.matches(self.devices[i])
+        ))
@@ -0,0 +1,397 @@
+"""
+Instrumentation of the time spent in each phase of pylspci, such as calling
+``lspci``, parsing its output or serializing devices, and of counters such
+as the number of parsed devices.
+
+Instrumentation is disabled by default, and then only costs a function
+call and a global lookup for each instrumented call. Use :func:`set_sink`
+or :func:`instrument` to send spans and counters to a :class:`Sink`.
+
+The following spans are measured:
+
+``lspci``
+   Calling ``lspci`` and reading its output, with
+   :func:`pylspci.command.lspci`.
+``parse``
+   Parsing a whole ``lspci`` output, with the parsers' ``parse`` methods.
+   Parsing a stream with ``iter_parse`` is not measured, as it is
+   interleaved with reading the output.
+``sysfs``
+   Reading devices from sysfs, with
+   :meth:`CommandBuilder.use_sysfs <pylspci.command.CommandBuilder.use_sysfs>`.
+``dump``
+   Decoding a hex dump natively, with
+   :meth:`CommandBuilder.from_file <pylspci.command.CommandBuilder.from_file>`.
+``resolve``
+   Looking up names for devices read without ``lspci``.
+``serialize`` and ``deserialize``
+   Converting devices to and from JSON or MessagePack, with
+   :mod:`pylspci.serialization`.
+``write``
+   Writing the output of the ``pylspci`` command, with ``--profile``.
+
+The following counters are incremented:
+
+``lspci_chars``
+   Characters read from the output of ``lspci``, also when streamed with
+   :func:`pylspci.command.iter_lspci`.
+``devices_parsed``
+   Devices parsed by the parsers, also when streamed with ``iter_parse``
+   or ``aiter_parse``.
+``unknown_fields``
+   Unsupported fields found by the
+   :class:`VerboseParser <pylspci.parsers.VerboseParser>`.
+``cache_hits`` and ``cache_misses``
+   Calls to ``lspci`` avoided or not by an
+   :class:`LspciCache <pylspci.cache.LspciCache>`.
+``scans_coalesced``
+   Requests that waited for an identical scan in progress in a
+   :class:`Scanner <pylspci.scanner.Scanner>` instead of starting another.
+"""
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from typing import (
+    Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+)
+
+
+class Sink(object):
+    """
+    Receives spans and counters. Subclasses override :meth:`span` and
+    :meth:`count`, which do nothing by default. Sinks may be called from
+    multiple threads.
+    """
+
+    def span(self, name: str, seconds: float) -> None:
+        """
+        Called each time a span ends.
+
+        :param str name: Name of the span, such as ``parse``.
+        :param float seconds: Duration of the span, in seconds.
+        """
+
+    def count(self, name: str, value: int) -> None:
+        """
+        Called each time a counter is incremented.
+
+        :param str name: Name of the counter, such as ``devices_parsed``.
+        :param int value: Amount to add to the counter.
+        """
+
+
+class NullSink(Sink):
+    """
+    A sink that ignores everything. Setting no sink at all with
+    ``set_sink(None)`` avoids even measuring the spans.
+    """
+
+
+class CallbackSink(Sink):
+    """
+    Sends spans and counters to functions.
+
+    :param on_span: A function called with the name and duration in
+       seconds of each span.
+    :type on_span: Callable[[str, float], Any] or None
+    :param on_count: A function called with the name and increment of each
+       counter.
+    :type on_count: Callable[[str, int], Any] or None
+    """
+
+    def __init__(self,
+                 on_span: Optional[Callable[[str, float], Any]] = None,
+                 on_count: Optional[Callable[[str, int], Any]] = None,
+                 ) -> None:
+        self.on_span = on_span
+        self.on_count = on_count
+
+    def span(self, name: str, seconds: float) -> None:
+        if self.on_span is not None:
+            self.on_span(name, seconds)
+
+    def count(self, name: str, value: int) -> None:
+        if self.on_count is not None:
+            self.on_count(name, value)
+
+
+class LoggingSink(Sink):
+    """
+    Logs each span and counter.
+
+    :param logger: The logger to use. Defaults to the ``pylspci`` logger.
+    :type logger: logging.Logger or None
+    :param int level: The level of the log messages.
+    """
+
+    def __init__(self,
+                 logger: Optional[logging.Logger] = None,
+                 level: int = logging.DEBUG) -> None:
+        self.logger = logger or logging.getLogger('pylspci')
+        self.level = level
+
+    def span(self, name: str, seconds: float) -> None:
+        self.logger.log(self.level, '%s took %.6fs', name, seconds)
+
+    def count(self, name: str, value: int) -> None:
+        self.logger.log(self.level, '%s += %d', name, value)
+
+
+class SummarySink(Sink):
+    """
+    Adds up the spans and counters, to report them at the end of a run.
+    """
+
+    spans: Dict[str, Tuple[int, float]]
+    """
+    Number of calls and total duration in seconds of each span.
+    """
+
+    counters: Dict[str, int]
+    """
+    Total of each counter.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+
+    def span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            calls, total = self.spans.get(name, (0, 0.0))
+            self.spans[name] = (calls + 1, total + seconds)
+
+    def count(self, name: str, value: int) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> str:
+        """
+        Format the spans, with their share of the total time, and the
+        counters as a human-readable table.
+
+        :returns: The report.
+        :rtype: str
+        """
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda item: -item[1][1])
+            counters = sorted(self.counters.items())
+        total = sum(seconds for _, (_, seconds) in spans)
+        lines: List[str] = [
+            '{:<16} {:>8} {:>12} {:>7}'.format(
+                'Phase', 'Calls', 'Seconds', 'Share'),
+        ]
+        for name, (calls, seconds) in spans:
+            lines.append('{:<16} {:>8} {:>12.6f} {:>6.1f}%'.format(
+                name, calls, seconds,
+                100 * seconds / total if total else 0.0))
+        if counters:
+            lines.append('')
+            lines.append('{:<16} {:>8}'.format('Counter', 'Value'))
+            lines.extend(
+                '{:<16} {:>8}'.format(name, value)
+                for name, value in counters)
+        return '\n'.join(lines)
+
+
+class PrometheusTextfileSink(SummarySink):
+    """
+    Adds up the spans and counters, and writes them in the Prometheus text
+    format, for the textfile collector of the node exporter.
+
+    Spans are written as ``<prefix>_span_seconds_total`` and
+    ``<prefix>_span_calls_total`` with a ``span`` label, and counters as
+    ``<prefix>_<counter>_total``.
+
+    :param path: Path of the file to write, usually ending with ``.prom``.
+    :type path: str or Path
+    :param str prefix: Prefix of the metric names.
+    """
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 prefix: str = 'pylspci') -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def render(self) -> str:
+        """
+        Format the spans and counters in the Prometheus text format.
+
+        :returns: The metrics.
+        :rtype: str
+        """
+        with self._lock:
+            spans = sorted(self.spans.items())
+            counters = sorted(self.counters.items())
+        lines: List[str] = []
+        if spans:
+            lines.extend([
+                '# HELP {}_span_seconds_total Time spent in each phase.'
+                .format(self.prefix),
+                '# TYPE {}_span_seconds_total counter'.format(self.prefix),
+            ])
+            lines.extend(
+                '{}_span_seconds_total{{span="{}"}} {!r}'.format(
+                    self.prefix, name, seconds)
+                for name, (_, seconds) in spans)
+            lines.extend([
+                '# HELP {}_span_calls_total Number of runs of each phase.'
+                .format(self.prefix),
+                '# TYPE {}_span_calls_total counter'.format(self.prefix),
+            ])
+            lines.extend(
+                '{}_span_calls_total{{span="{}"}} {}'.format(
+                    self.prefix, name, calls)
+                for name, (calls, _) in spans)
+        for name, value in counters:
+            lines.extend([
+                '# TYPE {}_{}_total counter'.format(self.prefix, name),
+                '{}_{}_total {}'.format(self.prefix, name, value),
+            ])
+        return ''.join(line + '\n' for line in lines)
+
+    def write(self) -> None:
+        """
+        Write the metrics to the file. The file is replaced atomically,
+        so that the collector never reads a partial file, and is readable
+        by all users, so that the collector may run as another user.
+        """
+        f = NamedTemporaryFile(
+            'w',
+            dir=str(self.path.parent),
+            prefix='.{}.'.format(self.path.name),
+            delete=False,
+        )
+        try:
+            with f:
+                f.write(self.render())
+            # Temporary files are only readable by their owner
+            os.chmod(f.name, 0o644)
+            os.replace(f.name, str(self.path))
+        except BaseException:
+            try:
+                os.unlink(f.name)
+            except OSError:
+                pass
+            raise
+
+
+S = TypeVar('S', bound=Sink)
+
+_sink: Optional[Sink] = None
+
+
+def get_sink() -> Optional[Sink]:
+    """
+    Get the current sink.
+
+    :returns: The current sink, or None if instrumentation is disabled.
+    :rtype: Sink or None
+    """
+    return _sink
+
+
+def set_sink(sink: Optional[Sink]) -> Optional[Sink]:
+    """
+    Set the sink receiving the spans and counters, for all threads.
+
+    :param sink: The new sink, or None to disable instrumentation.
+    :type sink: Sink or None
+    :returns: The previous sink.
+    :rtype: Sink or None
+    """
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+@contextmanager
+def instrument(sink: S) -> Iterator[S]:
+    """
+    Use a sink for the duration of a ``with`` block, then restore the
+    previous sink.
+
+    :param sink: The sink to use.
+    :type sink: Sink
+    :returns: A context manager giving the sink.
+    :rtype: ContextManager[Sink]
+    """
+    previous = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        set_sink(previous)
+
+
+def enabled() -> bool:
+    """
+    Whether a sink is set. Use this to skip computing values that are only
+    useful to a counter.
+    """
+    return _sink is not None
+
+
+class _NullSpan(object):
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+class _Span(object):
+
+    __slots__ = ('sink', 'name', 'start')
+
+    def __init__(self, sink: Sink, name: str) -> None:
+        self.sink = sink
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *args: Any) -> None:
+        self.sink.span(self.name, perf_counter() - self.start)
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str) -> Union[_Span, _NullSpan]:
+    """
+    Measure the duration of a ``with`` block, also when it raises an
+    exception::
+
+        with span('parse'):
+            ...
+
+    :param str name: Name of the span.
+    :returns: A context manager.
+    :rtype: ContextManager[None]
+    """
+    sink = _sink
+    if sink is None:
+        return _NULL_SPAN
+    return _Span(sink, name)
+
+
+def count(name: str, value: int = 1) -> None:
+    """
+    Increment a counter.
+
+    :param str name: Name of the counter.
+    :param int value: Amount to add to the counter.
+    """
+    sink = _sink
+    if sink is not None:
+        sink.count(name, value)
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Iterable, List, Union
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Union
+)
 
 from pylspci.device import Device
 
@@ -31,11 +33,64 @@ class Parser(ABC):
         :rtype: List[Device]
         """
 
-    def run(self, **kwargs: Any) -> List[Device]:
+    def iter_parse(self, lines: Iterable[str]) -> Iterator[Device]:
+        """
+        Parse lines of output, such as the lines read from a pipe or a file,
+        and yield each device as soon as all of its lines have been read.
+
+        The default implementation reads all the lines before parsing them;
+        parsers should override it to parse devices one at a time.
+
+        :param lines: An iterable of lines from the lspci output.
+        :type lines: Iterable[str]
+        :returns: An iterator of parsed devices.
+        :rtype: Iterator[Device]
+        """
+        yield from self.parse('\n'.join(line.rstrip('\n') for line in lines))
+
+    async def aiter_parse(self,
+                          lines: AsyncIterable[str]) -> AsyncIterator[Device]:
+        """
+        Parse lines of output read asynchronously, such as from
+        :func:`aiter_lspci <pylspci.command.aiter_lspci>`, and yield each
+        device as soon as all of its lines have been read.
+
+        The default implementation reads all the lines before parsing them;
+        parsers should override it to parse devices one at a time.
+
+        :param lines: An asynchronous iterable of lines from the lspci output.
+        :type lines: AsyncIterable[str]
+        :returns: An asynchronous iterator of parsed devices.
+        :rtype: AsyncIterator[Device]
+        """
+        all_lines = [line async for line in lines]
+        for device in self.iter_parse(all_lines):
+            yield device
+
+    def lspci_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge arguments for :func:`lspci` with the parser's default arguments.
+
+        :param kwargs: Arguments to override the parser's default arguments.
+           See :func:`lspci`'s documentation for a list of available
+           arguments.
+        :type kwargs: Dict[str, Any]
+        :returns: The arguments to send to :func:`lspci` for this parser.
+        :rtype: Dict[str, Any]
+        :raises ValueError: The arguments are not supported by this parser.
+        """
+        lspci_kwargs = self.default_lspci_args.copy()
+        lspci_kwargs.update(kwargs)
+        return lspci_kwargs
+
+    def run(self, stream: bool = False, **kwargs: Any) -> List[Device]:
         """
         Run the lspci command with the given arguments, defaulting to the
         parser's default arguments, and parse the result.
 
+        :param bool stream: Read the output of lspci through a pipe and parse
+           it as it arrives, using :meth:`iter_run`, instead of waiting for
+           the whole output to be available.
         :param \\**kwargs: Optional arguments to override the parser's default
            arguments. See :func:`lspci`'s documentation for a list of
            available arguments.
@@ -43,7 +98,56 @@ class Parser(ABC):
         :returns: A list of parsed devices.
         :rtype: List[Device]
         """
+        if stream:
+            return list(self.iter_run(**kwargs))
         from pylspci.command import lspci
-        lspci_kwargs = self.default_lspci_args.copy()
-        lspci_kwargs.update(kwargs)
-        return self.parse(lspci(**lspci_kwargs))
+        return self.parse(lspci(**self.lspci_kwargs(kwargs)))
+
+    def iter_run(self, **kwargs: Any) -> Iterator[Device]:
+        """
+        Run the lspci command with the given arguments, defaulting to the
+        parser's default arguments, and yield each device as soon as it has
+        been parsed from the lspci output.
+
+        :param \\**kwargs: Optional arguments to override the parser's default
+           arguments. See :func:`lspci`'s documentation for a list of
+           available arguments.
+        :type \\**kwargs: Any
+        :returns: An iterator of parsed devices.
+        :rtype: Iterator[Device]
+        """
+        from pylspci.command import iter_lspci
+        return self.iter_parse(iter_lspci(**self.lspci_kwargs(kwargs)))
+
+    async def arun(self, **kwargs: Any) -> List[Device]:
+        """
+        Run the lspci command with the given arguments, defaulting to the
+        parser's default arguments, without blocking the event loop,
+        and parse the output as it arrives.
+
+        :param \\**kwargs: Optional arguments to override the parser's default
+           arguments. See :func:`aiter_lspci <pylspci.command.aiter_lspci>`'s
+           documentation for a list of available arguments, including
+           a timeout.
+        :type \\**kwargs: Any
+        :returns: A list of parsed devices.
+        :rtype: List[Device]
+        """
+        return [device async for device in self.aiter_run(**kwargs)]
+
+    def aiter_run(self, **kwargs: Any) -> AsyncIterator[Device]:
+        """
+        Run the lspci command with the given arguments, defaulting to the
+        parser's default arguments, without blocking the event loop,
+        and yield each device as soon as it has been parsed.
+
+        :param \\**kwargs: Optional arguments to override the parser's default
+           arguments. See :func:`aiter_lspci <pylspci.command.aiter_lspci>`'s
+           documentation for a list of available arguments, including
+           a timeout.
+        :type \\**kwargs: Any
+        :returns: An asynchronous iterator of parsed devices.
+        :rtype: AsyncIterator[Device]
+        """
+        from pylspci.command import aiter_lspci
+        return self.aiter_parse(aiter_lspci(**self.lspci_kwargs(kwargs)))
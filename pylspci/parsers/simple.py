@@ -1,11 +1,15 @@
 import argparse
+import re
 import shlex
-from typing import Any, Iterable, List, Union
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Union
+)
 
-from cached_property import cached_property
+from cached_property import threaded_cached_property
 
 from pylspci.device import Device
 from pylspci.fields import NameWithID, Slot, hexstring
+from pylspci.instrumentation import count, span
 from pylspci.parsers.base import Parser
 
 
@@ -14,7 +18,23 @@ class SimpleParser(Parser):
     A parser for lspci -mm.
     """
 
-    @cached_property
+    # Matches a whole line in the exact format lspci -mm outputs:
+    # slot "class" "vendor" "device" [-rXX] [-pXX] "svendor" "sdevice"
+    # Anything else, such as backslash escapes or reordered arguments,
+    # falls back to the shlex and argparse-based parsing.
+    _LINE_REGEX = re.compile(
+        r'^\s*(?P<slot>[^\s"\'\\]+)'
+        r'\s+"(?P<cls>[^"\\]*)"'
+        r'\s+"(?P<vendor>[^"\\]*)"'
+        r'\s+"(?P<device>[^"\\]*)"'
+        r'(?:\s+-r(?P<revision>[0-9a-fA-F]+))?'
+        r'(?:\s+-p(?P<progif>[0-9a-fA-F]+))?'
+        r'\s+"(?P<subsystem_vendor>[^"\\]*)"'
+        r'\s+"(?P<subsystem_device>[^"\\]*)"\s*$'
+    )
+
+    # Built once per parser, even when first used from many threads
+    @threaded_cached_property
     def _parser(self) -> argparse.ArgumentParser:
         p = argparse.ArgumentParser()
         p.add_argument(
@@ -55,6 +75,12 @@ class SimpleParser(Parser):
         )
         return p
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # The argparse parser cannot be pickled; it is rebuilt when needed
+        state = self.__dict__.copy()
+        state.pop('_parser', None)
+        return state
+
     def parse(
             self,
             data: Union[str, Iterable[str], Iterable[Iterable[str]]],
@@ -71,9 +97,12 @@ class SimpleParser(Parser):
         :return: A list of parsed devices.
         :rtype: List[Device]
         """
-        if isinstance(data, str):
-            data = data.splitlines()
-        return list(map(self.parse_line, data))
+        with span('parse'):
+            if isinstance(data, str):
+                data = data.splitlines()
+            result = list(map(self.parse_line, data))
+        count('devices_parsed', len(result))
+        return result
 
     def parse_line(self, args: Union[str, Iterable[str]]) -> Device:
         """
@@ -86,13 +115,52 @@ class SimpleParser(Parser):
         :rtype: Device
         """
         if isinstance(args, str):
-            args = shlex.split(args)
+            match = self._LINE_REGEX.match(args)
+            if not match:
+                return self._parse_args(shlex.split(args))
+            revision, progif = match.group('revision', 'progif')
+            return Device(
+                slot=Slot(match.group('slot')),
+                cls=NameWithID(match.group('cls')),
+                vendor=NameWithID(match.group('vendor')),
+                device=NameWithID(match.group('device')),
+                subsystem_vendor=NameWithID(match.group('subsystem_vendor')),
+                subsystem_device=NameWithID(match.group('subsystem_device')),
+                revision=hexstring(revision) if revision else None,
+                progif=hexstring(progif) if progif else None,
+            )
+        return self._parse_args(args)
+
+    def _parse_args(self, args: Iterable[str]) -> Device:
         return Device(**vars(self._parser.parse_args(args)))
 
-    def run(self, **kwargs: Any) -> List[Device]:
+    def iter_parse(self, lines: Iterable[str]) -> Iterator[Device]:
+        parsed = 0
+        try:
+            for line in lines:
+                if line.strip():
+                    device = self.parse_line(line)
+                    parsed += 1
+                    yield device
+        finally:
+            count('devices_parsed', parsed)
+
+    async def aiter_parse(self,
+                          lines: AsyncIterable[str]) -> AsyncIterator[Device]:
+        parsed = 0
+        try:
+            async for line in lines:
+                if line.strip():
+                    device = self.parse_line(line)
+                    parsed += 1
+                    yield device
+        finally:
+            count('devices_parsed', parsed)
+
+    def lspci_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
         if kwargs.get('verbose'):
             raise ValueError(
                 'Verbose output is unsupported from the SimpleParser. '
                 'Please use the pylspci.parsers.VerboseParser instead.'
             )
-        return super().run(**kwargs)
+        return super().lspci_kwargs(kwargs)
@@ -1,8 +1,14 @@
+import re
 import warnings
-from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Union
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator,
+    List, NamedTuple, Optional, Union, cast
+)
 
-from pylspci.device import Device
+from pylspci.capabilities import ConfigSpace
+from pylspci.device import Device, LazyDevice
 from pylspci.fields import NameWithID, Slot, hexstring
+from pylspci.instrumentation import count, span
 from pylspci.parsers.base import Parser
 
 UNKNOWN_FIELD_WARNING = (
@@ -38,6 +44,17 @@ class FieldMapping(NamedTuple):
 class VerboseParser(Parser):
     """
     A parser for lspci -vvvmmk
+
+    When the output includes a hexadecimal dump of the configuration space,
+    as with lspci -vvvmmkx, it is made available in
+    :attr:`Device.config <pylspci.device.Device.config>`.
+
+    :param bool lazy: Return :class:`LazyDevice <pylspci.device.LazyDevice>`
+       instances, which only decode each field when it is first accessed.
+       This is faster when only a few fields of each device are used.
+       Unsupported fields are then only reported on the first access
+       to any field. Lazy devices have the fields of devices, but are not
+       tuples; see :class:`LazyDevice <pylspci.device.LazyDevice>`.
     """
 
     default_lspci_args = {
@@ -45,6 +62,9 @@ class VerboseParser(Parser):
         'kernel_drivers': True,
     }
 
+    _HEXDUMP_REGEX = re.compile(
+        r'^\s*[0-9a-fA-F]{1,3}:(?: [0-9a-fA-F]{2})+\s*$')
+
     # Maps lspci output fields to Device fields with a type
     _field_mapping = {
         'Slot': FieldMapping(field_name='slot', field_type=Slot),
@@ -72,18 +92,86 @@ class VerboseParser(Parser):
         'PhySlot': FieldMapping(field_name='physical_slot', field_type=str),
     }
 
+    # Maps Device fields to their type, to decode the raw values of
+    # LazyDevice instances
+    _fields_by_name = {
+        field.field_name: field for field in _field_mapping.values()
+    }
+
+    def __init__(self, lazy: bool = False) -> None:
+        self.lazy = lazy
+
+    def _read_fields(self,
+                     device_data: Union[str, Iterable[str]],
+                     ) -> Dict[str, Any]:
+        """
+        Split the lines of a device into the raw values of its fields,
+        by Device field name, for :class:`LazyDevice`.
+        """
+        values: Dict[str, Any] = {}
+        if isinstance(device_data, str):
+            device_data = device_data.splitlines()
+
+        config: Optional[bytearray] = None
+        for line in device_data:
+            key, _, value = line.partition(':')
+            # Keys are usually not padded; avoid stripping them
+            field = self._field_mapping.get(key)
+            if field is None:
+                key = key.strip()
+                field = self._field_mapping.get(key)
+            value = value.strip()
+            if field is None:
+                # Hexadecimal dump of the configuration space, from lspci -x
+                if self._HEXDUMP_REGEX.match(line):
+                    config = self._add_config(config, key, value)
+                    continue
+                warnings.warn(
+                    UNKNOWN_FIELD_WARNING.format(key, value),
+                    UserWarning,
+                )
+                count('unknown_fields')
+                continue
+            if field.many:
+                values.setdefault(field.field_name, []).append(value)
+            else:
+                values[field.field_name] = value
+
+        if config is not None:
+            values['config'] = config
+        return values
+
+    def _decode_field(self, name: str, value: Any) -> Any:
+        if name == 'config':
+            return ConfigSpace(value)
+        field = self._fields_by_name[name]
+        if field.many:
+            return list(map(field.field_type, value))
+        return field.field_type(value)
+
     def _parse_device(self, device_data: Union[str, Iterable[str]]) -> Device:
+        if self.lazy:
+            # Lazy devices provide the fields and methods of devices
+            return cast(Device, LazyDevice(
+                device_data, self._read_fields, self._decode_field))
+
         devdict: Dict[str, Any] = {}
         if isinstance(device_data, str):
             device_data = device_data.splitlines()
 
+        config: Optional[bytearray] = None
         for line in device_data:
             key, _, value = map(str.strip, line.partition(':'))
             if key not in self._field_mapping:
+                # Hexadecimal dump of the configuration space, from lspci -x
+                if self._HEXDUMP_REGEX.match(line):
+                    config = self._add_config(config, key, value)
+                    continue
                 warnings.warn(
                     UNKNOWN_FIELD_WARNING.format(key, value),
                     UserWarning,
                 )
+                count('unknown_fields')
                 continue
             field = self._field_mapping[key]
             if field.many:
@@ -92,8 +180,23 @@ class VerboseParser(Parser):
             else:
                 devdict[field.field_name] = field.field_type(value)
 
+        if config is not None:
+            devdict['config'] = ConfigSpace(config)
         return Device(**devdict)
 
+    @staticmethod
+    def _add_config(config: Optional[bytearray],
+                    offset: str,
+                    values: str) -> bytearray:
+        if config is None:
+            config = bytearray()
+        start = int(offset, 16)
+        data = bytes.fromhex(values)
+        if start + len(data) > len(config):
+            config.extend(bytes(start + len(data) - len(config)))
+        config[start:start + len(data)] = data
+        return config
+
     def parse(
             self,
             data: Union[str, Iterable[str], Iterable[Iterable[str]]],
@@ -111,13 +214,74 @@ class VerboseParser(Parser):
         :return: A list of parsed devices.
         :rtype: List[Device]
         """
-        if isinstance(data, str):
-            data = data.split('\n\n')
         result: List[Device] = []
-        for line in data:
-            if isinstance(line, str):
-                line = str.strip(line)
-            if not line:  # Ignore empty strings and lists
-                continue
-            result.append(self._parse_device(line))
+        with span('parse'):
+            if isinstance(data, str):
+                data = data.split('\n\n')
+            for line in data:
+                if isinstance(line, str):
+                    line = str.strip(line)
+                if not line:  # Ignore empty strings and lists
+                    continue
+                result.append(self._parse_device(line))
+        count('devices_parsed', len(result))
         return result
+
+    def iter_parse(self, lines: Iterable[str]) -> Iterator[Device]:
+        """
+        Parse lines from an lspci -vvvmm[nnk] output, such as the lines read
+        from a pipe or a file, and yield each device as soon as the blank line
+        ending it has been read.
+
+        :param lines: An iterable of lines from the lspci output.
+        :type lines: Iterable[str]
+        :return: An iterator of parsed devices.
+        :rtype: Iterator[Device]
+        """
+        device_lines: List[str] = []
+        parsed = 0
+        try:
+            for line in lines:
+                if line.strip():
+                    device_lines.append(line)
+                elif device_lines:
+                    device = self._parse_device(device_lines)
+                    parsed += 1
+                    yield device
+                    device_lines = []
+            if device_lines:
+                device = self._parse_device(device_lines)
+                parsed += 1
+                yield device
+        finally:
+            count('devices_parsed', parsed)
+
+    async def aiter_parse(self,
+                          lines: AsyncIterable[str]) -> AsyncIterator[Device]:
+        """
+        Parse lines from an lspci -vvvmm[nnk] output read asynchronously,
+        and yield each device as soon as the blank line ending it has been
+        read.
+
+        :param lines: An asynchronous iterable of lines from the lspci output.
+        :type lines: AsyncIterable[str]
+        :return: An asynchronous iterator of parsed devices.
+        :rtype: AsyncIterator[Device]
+        """
+        device_lines: List[str] = []
+        parsed = 0
+        try:
+            async for line in lines:
+                if line.strip():
+                    device_lines.append(line)
+                elif device_lines:
+                    device = self._parse_device(device_lines)
+                    parsed += 1
+                    yield device
+                    device_lines = []
+            if device_lines:
+                device = self._parse_device(device_lines)
+                parsed += 1
+                yield device
+        finally:
+            count('devices_parsed', parsed)
@@ -0,0 +1,594 @@
+import gzip
+import hashlib
+import mmap
+import os
+import re
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from pylspci.device import Device
+from pylspci.fields import NameWithID
+
+OptionalPath = Optional[Union[str, Path]]
+
+DEFAULT_PCIIDS_PATHS: List[Path] = [
+    Path('/usr/share/misc/pci.ids'),
+    Path('/usr/share/hwdata/pci.ids'),
+    Path('/usr/share/pci.ids'),
+    Path('/usr/share/misc/pci.ids.gz'),
+    Path('/usr/share/hwdata/pci.ids.gz'),
+    Path('/usr/share/pci.ids.gz'),
+]
+"""
+Usual locations of the PCI ID database, in the order they will be looked up.
+"""
+
+
+def find_pciids() -> Optional[Path]:
+    """
+    Find the system's PCI ID database in one of the
+    :data:`DEFAULT_PCIIDS_PATHS`.
+
+    :returns: Path to the PCI ID database, if one was found.
+    :rtype: Path or None
+    """
+    for path in DEFAULT_PCIIDS_PATHS:
+        if path.is_file():
+            return path
+    return None
+
+
+class PciIdsDatabase(object):
+    """
+    Looks up vendor, device, subsystem and class names from a ``pci.ids``
+    file, the database used by ``lspci`` to resolve names, without
+    calling ``lspci``.
+
+    The file is only read on the first lookup. Vendor names are indexed
+    on that first read, but the devices and subsystems of each vendor are
+    only parsed when one of them is first looked up. Use :meth:`load` to
+    parse the whole file at once.
+
+    :param path: Path to a ``pci.ids`` file, optionally compressed with
+       gzip. Defaults to the system's database; see :func:`find_pciids`.
+    :type path: str or Path or None
+    :raises FileNotFoundError: No path was set and no database was found.
+    """
+
+    path: Path
+    """
+    Path to the ``pci.ids`` file.
+    """
+
+    # Matches the vendor lines, which are the only lines starting with
+    # four hexadecimal digits; devices, subsystems and classes are indented
+    # or start with C.
+    _VENDOR_REGEX = re.compile(rb'^([0-9a-fA-F]{4})  +([^\n]*)$', re.M)
+
+    def __init__(self, path: OptionalPath = None) -> None:
+        if not path:
+            path = find_pciids()
+            if not path:
+                raise FileNotFoundError('PCI ID database not found')
+        self.path = Path(path)
+        self._data: Optional[bytes] = None
+        self._classes_offset: int = 0
+        self._vendor_spans: Dict[int, Tuple[int, int]] = {}
+        self._parsed_vendors: Set[int] = set()
+        self._classes_parsed: bool = False
+
+        self._vendors: Dict[int, str] = {}
+        self._devices: Dict[Tuple[int, int], str] = {}
+        self._subsystems: Dict[Tuple[int, int, int, int], str] = {}
+        self._classes: Dict[int, str] = {}
+        self._subclasses: Dict[Tuple[int, int], str] = {}
+        self._progifs: Dict[Tuple[int, int, int], str] = {}
+
+    def _read(self) -> bytes:
+        """
+        Read the file and index the vendors on the first call.
+        """
+        if self._data is not None:
+            return self._data
+
+        if self.path.suffix == '.gz':
+            with gzip.open(str(self.path), 'rb') as f:
+                data: bytes = f.read()
+        else:
+            data = self.path.read_bytes()
+
+        classes_offset = data.find(b'\nC ')
+        if classes_offset < 0:
+            classes_offset = len(data)
+        self._classes_offset = classes_offset + 1
+
+        start: Optional[int] = None
+        vendor: int = 0
+        for match in self._VENDOR_REGEX.finditer(data, 0, classes_offset):
+            if start is not None:
+                self._vendor_spans[vendor] = (start, match.start())
+            vendor = int(match.group(1), 16)
+            self._vendors[vendor] = \
+                match.group(2).decode('utf-8', 'replace').rstrip()
+            start = match.end()
+        if start is not None:
+            self._vendor_spans[vendor] = (start, classes_offset)
+
+        self._data = data
+        return data
+
+    def _parse_vendor(self, vendor: int) -> None:
+        """
+        Parse the devices and subsystems of a single vendor.
+        """
+        if vendor in self._parsed_vendors:
+            return
+        data = self._read()
+        self._parsed_vendors.add(vendor)
+        if vendor not in self._vendor_spans:
+            return
+
+        start, end = self._vendor_spans[vendor]
+        device: int = 0
+        for line in data[start:end].decode('utf-8', 'replace').splitlines():
+            if line.startswith('\t\t'):
+                parts = line.split(None, 2)
+                if len(parts) == 3:
+                    key = (vendor, device, int(parts[0], 16),
+                           int(parts[1], 16))
+                    self._subsystems[key] = parts[2]
+            elif line.startswith('\t'):
+                parts = line.split(None, 1)
+                if len(parts) == 2:
+                    device = int(parts[0], 16)
+                    self._devices[vendor, device] = parts[1]
+
+    def _parse_classes(self) -> None:
+        """
+        Parse the device classes, subclasses and programming interfaces.
+        """
+        if self._classes_parsed:
+            return
+        data = self._read()
+        self._classes_parsed = True
+
+        cls: int = 0
+        subclass: int = 0
+        lines = data[self._classes_offset:].decode('utf-8', 'replace')
+        for line in lines.splitlines():
+            if line.startswith('C '):
+                parts = line.split(None, 2)
+                if len(parts) == 3:
+                    cls = int(parts[1], 16)
+                    self._classes[cls] = parts[2]
+            elif line.startswith('\t\t'):
+                parts = line.split(None, 1)
+                if len(parts) == 2:
+                    self._progifs[cls, subclass, int(parts[0], 16)] = parts[1]
+            elif line.startswith('\t'):
+                parts = line.split(None, 1)
+                if len(parts) == 2:
+                    subclass = int(parts[0], 16)
+                    self._subclasses[cls, subclass] = parts[1]
+            elif line and not line.startswith('#'):
+                # Another section started
+                break
+
+    def load(self) -> None:
+        """
+        Parse the whole database at once, instead of parsing each vendor
+        on its first lookup.
+        """
+        self._read()
+        for vendor in self._vendor_spans:
+            self._parse_vendor(vendor)
+        self._parse_classes()
+
+    def vendor_name(self, vendor: int) -> Optional[str]:
+        """
+        Look up the name of a vendor.
+
+        :param int vendor: The vendor ID.
+        :returns: The vendor name, if found.
+        :rtype: str or None
+        """
+        self._read()
+        return self._vendors.get(vendor)
+
+    def device_name(self, vendor: int, device: int) -> Optional[str]:
+        """
+        Look up the name of a device.
+
+        :param int vendor: The vendor ID.
+        :param int device: The device ID.
+        :returns: The device name, if found.
+        :rtype: str or None
+        """
+        self._parse_vendor(vendor)
+        return self._devices.get((vendor, device))
+
+    def subsystem_name(self,
+                       vendor: int,
+                       device: int,
+                       subsystem_vendor: int,
+                       subsystem_device: int) -> Optional[str]:
+        """
+        Look up the name of a device's subsystem. As in ``lspci``,
+        when the subsystem IDs are the same as the device's IDs and the
+        subsystem has no name, the device's name is used.
+
+        :param int vendor: The vendor ID.
+        :param int device: The device ID.
+        :param int subsystem_vendor: The subsystem vendor ID.
+        :param int subsystem_device: The subsystem device ID.
+        :returns: The subsystem name, if found.
+        :rtype: str or None
+        """
+        name = self._find_subsystem(
+            vendor, device, subsystem_vendor, subsystem_device)
+        if name is None \
+                and (vendor, device) == (subsystem_vendor, subsystem_device):
+            return self.device_name(vendor, device)
+        return name
+
+    def _find_subsystem(self,
+                        vendor: int,
+                        device: int,
+                        subsystem_vendor: int,
+                        subsystem_device: int) -> Optional[str]:
+        self._parse_vendor(vendor)
+        return self._subsystems.get(
+            (vendor, device, subsystem_vendor, subsystem_device))
+
+    def class_name(self, cls: int) -> Optional[str]:
+        """
+        Look up the name of a device class.
+
+        :param int cls: The class ID, as a single byte.
+        :returns: The class name, if found.
+        :rtype: str or None
+        """
+        self._parse_classes()
+        return self._classes.get(cls)
+
+    def subclass_name(self, cls: int, subclass: int) -> Optional[str]:
+        """
+        Look up the name of a device subclass.
+
+        :param int cls: The class ID, as a single byte.
+        :param int subclass: The subclass ID, as a single byte.
+        :returns: The subclass name, if found.
+        :rtype: str or None
+        """
+        self._parse_classes()
+        return self._subclasses.get((cls, subclass))
+
+    def progif_name(self,
+                    cls: int,
+                    subclass: int,
+                    progif: int) -> Optional[str]:
+        """
+        Look up the name of a programming interface.
+
+        :param int cls: The class ID, as a single byte.
+        :param int subclass: The subclass ID, as a single byte.
+        :param int progif: The programming interface ID.
+        :returns: The programming interface name, if found.
+        :rtype: str or None
+        """
+        self._parse_classes()
+        return self._progifs.get((cls, subclass, progif))
+
+    def resolve(self, device: Device) -> Device:
+        """
+        Fill in the missing names of a device's class, vendor, device and
+        subsystem, using their IDs, for example on devices parsed from
+        ``lspci -n``. Names that are already set are kept.
+
+        :param device: The device to resolve the names of.
+        :type device: Device
+        :returns: A copy of the device, with names.
+        :rtype: Device
+        """
+        cls = device.cls
+        if cls.id is not None and not cls.name:
+            cls = self._with_name(cls, cls.id, self.subclass_name(
+                cls.id >> 8, cls.id & 0xff,
+            ) or self.class_name(cls.id >> 8))
+
+        vendor, dev = device.vendor, device.device
+        vendor_id, device_id = vendor.id, dev.id
+        if vendor_id is not None and not vendor.name:
+            vendor = self._with_name(
+                vendor, vendor_id, self.vendor_name(vendor_id))
+        if vendor_id is not None and device_id is not None and not dev.name:
+            dev = self._with_name(
+                dev, device_id, self.device_name(vendor_id, device_id))
+
+        subsystem_vendor = device.subsystem_vendor
+        subsystem_device = device.subsystem_device
+        subsystem_vendor_id = subsystem_device_id = None
+        if subsystem_vendor:
+            subsystem_vendor_id = subsystem_vendor.id
+        if subsystem_device:
+            subsystem_device_id = subsystem_device.id
+        if subsystem_vendor and subsystem_vendor_id is not None \
+                and not subsystem_vendor.name:
+            subsystem_vendor = self._with_name(
+                subsystem_vendor,
+                subsystem_vendor_id,
+                self.vendor_name(subsystem_vendor_id),
+            )
+        if subsystem_device and not subsystem_device.name \
+                and vendor_id is not None and device_id is not None \
+                and subsystem_vendor_id is not None \
+                and subsystem_device_id is not None:
+            subsystem_device = self._with_name(
+                subsystem_device,
+                subsystem_device_id,
+                self.subsystem_name(
+                    vendor_id, device_id,
+                    subsystem_vendor_id, subsystem_device_id,
+                ),
+            )
+
+        return device._replace(
+            cls=cls,
+            vendor=vendor,
+            device=dev,
+            subsystem_vendor=subsystem_vendor,
+            subsystem_device=subsystem_device,
+        )
+
+    @staticmethod
+    def _with_name(value: NameWithID,
+                   id: int,
+                   name: Optional[str]) -> NameWithID:
+        if not name:
+            return value
+        return NameWithID('{} [{:04x}]'.format(name, id))
+
+
+class _BinaryTable(object):
+    """
+    Sorted table of fixed-size entries, followed by a blob holding
+    the names, read from a cache file through ``mmap``.
+
+    Each entry holds a key (a kind and up to four IDs, packed as big-endian
+    so that comparing the bytes compares the IDs), followed by the offset
+    and length of the name in the blob.
+    """
+
+    HEADER = struct.Struct('>8sQQII')
+    KEY = struct.Struct('>BHHHH')
+    NAME = struct.Struct('>IH')
+    ENTRY_SIZE = KEY.size + NAME.size
+    MAGIC = b'PYLSPCI1'
+
+    VENDOR, DEVICE, SUBSYSTEM, CLASS, SUBCLASS, PROGIF = range(6)
+
+    def __init__(self, data: Union[bytes, mmap.mmap]) -> None:
+        self.data = data
+        magic, self.size, self.mtime, self.count, path_length = \
+            self.HEADER.unpack_from(data)
+        if magic != self.MAGIC:
+            raise ValueError('Not a PCI ID cache file')
+        self.entries_offset = self.HEADER.size + path_length
+        self.source = bytes(data[self.HEADER.size:self.entries_offset])
+        self.names_offset = \
+            self.entries_offset + self.count * self.ENTRY_SIZE
+        if len(data) < self.names_offset:
+            raise ValueError('Truncated PCI ID cache file')
+
+    @classmethod
+    def build(cls,
+              source: bytes,
+              size: int,
+              mtime: int,
+              entries: List[Tuple[Tuple[int, ...], str]]) -> bytes:
+        packed = sorted(
+            (cls.KEY.pack(*(key + (0, ) * (5 - len(key)))), name)
+            for key, name in entries
+        )
+        names = bytearray()
+        table = bytearray(cls.HEADER.pack(
+            cls.MAGIC, size, mtime, len(packed), len(source)))
+        table.extend(source)
+        for key, name in packed:
+            encoded = name.encode('utf-8')[:0xffff]
+            table.extend(key)
+            table.extend(cls.NAME.pack(len(names), len(encoded)))
+            names.extend(encoded)
+        table.extend(names)
+        return bytes(table)
+
+    def lookup(self, *key: int) -> Optional[str]:
+        packed = self.KEY.pack(*(key + (0, ) * (5 - len(key))))
+        data, low, high = self.data, 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            position = self.entries_offset + middle * self.ENTRY_SIZE
+            current = data[position:position + self.KEY.size]
+            if current < packed:
+                low = middle + 1
+            elif current > packed:
+                high = middle
+            else:
+                offset, length = self.NAME.unpack_from(
+                    data, position + self.KEY.size)
+                offset += self.names_offset
+                return data[offset:offset + length].decode('utf-8')
+        return None
+
+
+def default_cache_dir() -> Path:
+    """
+    Default folder for the PCI ID database caches, following the XDG Base
+    Directory specification: ``$XDG_CACHE_HOME/pylspci``,
+    or ``~/.cache/pylspci``.
+
+    :rtype: Path
+    """
+    return Path(
+        os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache',
+        'pylspci',
+    )
+
+
+class CachedPciIdsDatabase(PciIdsDatabase):
+    """
+    A :class:`PciIdsDatabase` that keeps the parsed database in a compact
+    binary cache file, so that other processes can look up names without
+    parsing the ``pci.ids`` file again.
+
+    The cache file is memory-mapped and names are looked up by binary search,
+    so opening it does not depend on the size of the database. It is keyed
+    on the ``pci.ids`` file's path, size and modification time,
+    and is rebuilt when any of those change.
+
+    If the cache cannot be written, names are looked up from the parsed
+    ``pci.ids`` file, like a :class:`PciIdsDatabase`.
+
+    :param path: Path to a ``pci.ids`` file, optionally compressed with
+       gzip. Defaults to the system's database; see :func:`find_pciids`.
+    :type path: str or Path or None
+    :param cache_dir: Folder to store the cache files in.
+       Defaults to :func:`default_cache_dir`.
+    :type cache_dir: str or Path or None
+    :raises FileNotFoundError: No path was set and no database was found.
+    """
+
+    cache_dir: Path
+    """
+    Folder holding the cache files.
+    """
+
+    def __init__(self,
+                 path: OptionalPath = None,
+                 cache_dir: OptionalPath = None) -> None:
+        super().__init__(path)
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self._table: Optional[_BinaryTable] = None
+        self._table_loaded: bool = False
+
+    @property
+    def cache_path(self) -> Path:
+        """
+        Path to the cache file for this ``pci.ids`` file.
+        """
+        digest = hashlib.sha1(
+            bytes(self.path.absolute())).hexdigest()[:16]
+        return self.cache_dir / 'pciids-{}.bin'.format(digest)
+
+    def _get_table(self) -> Optional[_BinaryTable]:
+        if not self._table_loaded:
+            self._table_loaded = True
+            stat = self.path.stat()
+            self._table = self._open_cache(stat.st_size, stat.st_mtime_ns)
+            if self._table is None:
+                self._table = self._build_cache(
+                    stat.st_size, stat.st_mtime_ns)
+        return self._table
+
+    def _open_cache(self, size: int, mtime: int) -> Optional[_BinaryTable]:
+        try:
+            with self.cache_path.open('rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            table = _BinaryTable(data)
+        except (OSError, ValueError, struct.error):
+            return None
+        if (table.source, table.size, table.mtime) \
+                != (bytes(self.path.absolute()), size, mtime):
+            return None
+        return table
+
+    def _build_cache(self, size: int, mtime: int) -> Optional[_BinaryTable]:
+        super().load()
+        entries: List[Tuple[Tuple[int, ...], str]] = []
+        for vendor, name in self._vendors.items():
+            entries.append(((_BinaryTable.VENDOR, vendor), name))
+        for key, name in self._devices.items():
+            entries.append(((_BinaryTable.DEVICE, ) + key, name))
+        for subsystem_key, name in self._subsystems.items():
+            entries.append(((_BinaryTable.SUBSYSTEM, ) + subsystem_key, name))
+        for cls, name in self._classes.items():
+            entries.append(((_BinaryTable.CLASS, cls), name))
+        for subclass_key, name in self._subclasses.items():
+            entries.append(((_BinaryTable.SUBCLASS, ) + subclass_key, name))
+        for progif_key, name in self._progifs.items():
+            entries.append(((_BinaryTable.PROGIF, ) + progif_key, name))
+        data = _BinaryTable.build(
+            bytes(self.path.absolute()), size, mtime, entries)
+
+        # Write to a temporary file then rename it, so that other processes
+        # never see an incomplete cache.
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                dir=str(self.cache_dir), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, str(self.cache_path))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            return None
+        return _BinaryTable(data)
+
+    def load(self) -> None:
+        """
+        Open the cache file, or parse the ``pci.ids`` file and build the cache
+        if it is missing or stale.
+        """
+        self._get_table()
+
+    def vendor_name(self, vendor: int) -> Optional[str]:
+        table = self._get_table()
+        if table is None:
+            return super().vendor_name(vendor)
+        return table.lookup(table.VENDOR, vendor)
+
+    def device_name(self, vendor: int, device: int) -> Optional[str]:
+        table = self._get_table()
+        if table is None:
+            return super().device_name(vendor, device)
+        return table.lookup(table.DEVICE, vendor, device)
+
+    def _find_subsystem(self,
+                        vendor: int,
+                        device: int,
+                        subsystem_vendor: int,
+                        subsystem_device: int) -> Optional[str]:
+        table = self._get_table()
+        if table is None:
+            return super()._find_subsystem(
+                vendor, device, subsystem_vendor, subsystem_device)
+        return table.lookup(
+            table.SUBSYSTEM,
+            vendor, device, subsystem_vendor, subsystem_device,
+        )
+
+    def class_name(self, cls: int) -> Optional[str]:
+        table = self._get_table()
+        if table is None:
+            return super().class_name(cls)
+        return table.lookup(table.CLASS, cls)
+
+    def subclass_name(self, cls: int, subclass: int) -> Optional[str]:
+        table = self._get_table()
+        if table is None:
+            return super().subclass_name(cls, subclass)
+        return table.lookup(table.SUBCLASS, cls, subclass)
+
+    def progif_name(self,
+                    cls: int,
+                    subclass: int,
+                    progif: int) -> Optional[str]:
+        table = self._get_table()
+        if table is None:
+            return super().progif_name(cls, subclass, progif)
+        return table.lookup(table.PROGIF, cls, subclass, progif)
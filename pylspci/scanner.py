@@ -0,0 +1,194 @@
+"""
+A scanner shared between threads, for programs such as exporters that may
+be asked for the same devices by many threads at once.
+
+Identical requests made while a scan is in progress do not start another
+scan: they wait for the scan in progress and get its result, or a
+:class:`ScanError` if it failed. The scanner also limits how many different
+scans run at once. Unlike :class:`LspciCache <pylspci.cache.LspciCache>`,
+results are never reused once their scan has ended; both can be combined.
+"""
+import inspect
+import threading
+from typing import (
+    Any, Callable, Dict, Hashable, List, Optional, TypeVar, Union, cast
+)
+
+from pylspci.command import CommandBuilder, lspci
+from pylspci.device import Device
+from pylspci.fields import PCIAccessParameter
+from pylspci.instrumentation import count
+from pylspci.parsers.base import Parser
+
+T = TypeVar('T')
+
+_LSPCI_ARGUMENTS = frozenset(inspect.signature(lspci).parameters)
+
+
+class ScanError(Exception):
+    """
+    A scan shared with other threads failed. The exception raised by the scan
+    is available as the ``__cause__`` of this exception.
+    """
+
+
+class _Flight(object):
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Scanner(object):
+    """
+    Runs scans on behalf of many threads, coalescing identical concurrent
+    scans into one and limiting how many scans run at once.
+
+    A single scanner can safely be shared between threads.
+
+    :param int max_concurrency: Maximum number of scans running at once.
+    :param timeout: Time in seconds to wait for a scan to be allowed to
+       start when too many are running. Set to None to wait forever.
+    :type timeout: float or None
+    """
+
+    max_concurrency: int
+    """
+    Maximum number of scans running at once.
+    """
+
+    scans: int
+    """
+    Number of scans that were run.
+    """
+
+    coalesced: int
+    """
+    Number of requests that reused the result of a scan in progress.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 1,
+                 timeout: Optional[float] = None) -> None:
+        assert max_concurrency > 0, 'The maximum concurrency must be positive'
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.scans = 0
+        self.coalesced = 0
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def __repr__(self) -> str:
+        return '{}(max_concurrency={!r})'.format(
+            self.__class__.__name__, self.max_concurrency)
+
+    def __len__(self) -> int:
+        """
+        Number of scans in progress or waiting to start.
+        """
+        return len(self._flights)
+
+    def call(self, key: Hashable, scan: Callable[[], T]) -> T:
+        """
+        Run a scan, unless a scan with the same key is in progress, in which
+        case wait for it to end and return its result. The result is shared
+        by all the waiting threads and should not be modified.
+
+        When the scan fails, the thread that ran it gets its exception, and
+        each waiting thread gets its own :class:`ScanError` caused by it.
+
+        :param key: Identifies identical scans.
+        :type key: Hashable
+        :param scan: A function running the scan.
+        :type scan: Callable[[], T]
+        :returns: The result of the scan.
+        :rtype: T
+        :raises TimeoutError: Too many scans were running to start a new one
+           in time.
+        :raises ScanError: The scan this call waited for failed.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            count('scans_coalesced')
+            flight.done.wait()
+            if flight.error is not None:
+                raise ScanError(
+                    'Shared scan failed: {!r}'.format(flight.error)
+                ) from flight.error
+            return flight.result
+
+        try:
+            if not self._slots.acquire(timeout=self.timeout):
+                raise TimeoutError('Too many scans in progress')
+            try:
+                with self._lock:
+                    self.scans += 1
+                flight.result = scan()
+            finally:
+                self._slots.release()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def scan(self, builder: CommandBuilder) -> List[
+            Union[str, Device, PCIAccessParameter]]:
+        """
+        Iterate over a command builder, sharing the result with concurrent
+        calls using builders with the same settings.
+
+        :param builder: The command builder to iterate over.
+        :type builder: CommandBuilder
+        :returns: The strings, devices or pcilib parameters returned
+           by the builder.
+        :rtype: List[Union[str, Device, PCIAccessParameter]]
+        """
+        # Each caller gets its own list, which it may modify
+        return list(self.call(builder.key(), lambda: list(builder)))
+
+    def run(self,
+            parser: Parser,
+            stream: bool = False,
+            **kwargs: Any) -> List[Device]:
+        """
+        Call lspci and parse its output, like :meth:`Parser.run
+        <pylspci.parsers.base.Parser.run>`, sharing the result with
+        concurrent calls using the same parser settings and arguments.
+
+        :param parser: The parser to use.
+        :type parser: pylspci.parsers.Parser
+        :param bool stream: Parse the output of lspci as it arrives, as with
+           :meth:`CommandBuilder.stream
+           <pylspci.command.CommandBuilder.stream>`.
+        :param \\**kwargs: Optional arguments to override the parser's default
+           arguments. See :func:`lspci <pylspci.command.lspci>`'s
+           documentation for a list of available arguments.
+        :type \\**kwargs: Any
+        :returns: A list of parsed devices.
+        :rtype: List[Device]
+        :raises TypeError: Some arguments are not supported by
+           :func:`lspci <pylspci.command.lspci>`.
+        """
+        unsupported = sorted(set(kwargs) - _LSPCI_ARGUMENTS)
+        if unsupported:
+            raise TypeError('Unsupported lspci arguments: {}'.format(
+                ', '.join(unsupported)))
+        builder = CommandBuilder(**parser.lspci_kwargs(kwargs)) \
+            .with_parser(parser) \
+            .stream(stream)
+        return cast(List[Device], self.scan(builder))
@@ -0,0 +1,232 @@
+"""
+Fast serialization of devices to and from JSON or MessagePack, for large
+snapshots such as the devices of a whole fleet of hosts.
+
+The JSON format is the same as :meth:`Device.as_dict
+<pylspci.device.Device.as_dict>`. The orjson_ and msgpack_ packages are
+used when they are installed; JSON falls back to the :mod:`json` module.
+
+.. _orjson: https://pypi.org/project/orjson/
+.. _msgpack: https://pypi.org/project/msgpack/
+"""
+import importlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Union
+
+from pylspci.device import Device, DeviceDict
+from pylspci.fields import CACHE_SIZE, Slot, SlotDict
+from pylspci.instrumentation import span
+
+
+def _import(name: str) -> Optional[ModuleType]:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+orjson = _import('orjson')
+msgpack = _import('msgpack')
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+"""
+Name of the module used to read and write JSON: ``orjson`` when it is
+installed, otherwise ``json``.
+"""
+
+FORMATS = ['json'] + (['msgpack'] if msgpack is not None else [])
+"""
+The available serialization formats. ``msgpack`` requires the msgpack
+package.
+"""
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _encode_parent(slot: Slot) -> SlotDict:
+    """
+    Encode a parent bridge's slot. Bridges are shared by many devices, so
+    their dicts are cached instead of following the parent chain each time.
+    """
+    return {
+        "domain": slot.domain,
+        "bus": slot.bus,
+        "device": slot.device,
+        "function": slot.function,
+        "parent": _encode_parent(slot.parent) if slot.parent else None,
+    }
+
+
+def encode(device: Device) -> DeviceDict:
+    """
+    Serialize a device as a JSON-serializable `dict`, like
+    :meth:`Device.as_dict <pylspci.device.Device.as_dict>` but faster.
+
+    The dicts of parent slots are cached and shared between devices,
+    so the result should not be modified.
+
+    :param device: The device to serialize.
+    :type device: Device
+    :returns: The serialized device.
+    :rtype: Dict[str, Any]
+    """
+    slot = device.slot
+    cls = device.cls
+    vendor = device.vendor
+    name = device.device
+    subsystem_vendor = device.subsystem_vendor
+    subsystem_device = device.subsystem_device
+    return {
+        "slot": {
+            "domain": slot.domain,
+            "bus": slot.bus,
+            "device": slot.device,
+            "function": slot.function,
+            "parent": _encode_parent(slot.parent) if slot.parent else None,
+        },
+        "cls": {"id": cls.id, "name": cls.name},
+        "vendor": {"id": vendor.id, "name": vendor.name},
+        "device": {"id": name.id, "name": name.name},
+        "subsystem_vendor": {
+            "id": subsystem_vendor.id,
+            "name": subsystem_vendor.name,
+        } if subsystem_vendor else None,
+        "subsystem_device": {
+            "id": subsystem_device.id,
+            "name": subsystem_device.name,
+        } if subsystem_device else None,
+        "revision": device.revision,
+        "progif": device.progif,
+        "driver": device.driver,
+        "kernel_modules": device.kernel_modules,
+        "numa_node": device.numa_node,
+        "iommu_group": device.iommu_group,
+        "physical_slot": device.physical_slot,
+    }
+
+
+def decode(data: Mapping[str, Any]) -> Device:
+    """
+    Build a device from a `dict`, as written by :func:`encode` or
+    :meth:`Device.as_dict <pylspci.device.Device.as_dict>`.
+    Alias to :meth:`Device.from_dict <pylspci.device.Device.from_dict>`.
+
+    :param data: The serialized device.
+    :type data: Mapping[str, Any]
+    :returns: The device.
+    :rtype: Device
+    :raises KeyError: A required field is missing.
+    :raises TypeError: A field has an invalid type.
+    :raises ValueError: The slot is invalid.
+    """
+    return Device.from_dict(data)
+
+
+def _check_format(format: str) -> None:
+    if format == 'msgpack' and msgpack is None:
+        raise ImportError('The msgpack package is required for MessagePack')
+    if format not in ('json', 'msgpack'):
+        raise ValueError('Unsupported format {!r}'.format(format))
+
+
+def dumps(devices: Iterable[Device], format: str = 'json') -> bytes:
+    """
+    Serialize devices as a list, using :func:`encode`.
+
+    :param devices: The devices to serialize.
+    :type devices: Iterable[Device]
+    :param str format: ``json`` or ``msgpack``. See :data:`FORMATS`.
+    :returns: The serialized devices.
+    :rtype: bytes
+    :raises ValueError: The format is not supported.
+    :raises ImportError: The format requires a package that is not
+       installed.
+    """
+    _check_format(format)
+    with span('serialize'):
+        data = list(map(encode, devices))
+        if format == 'msgpack':
+            assert msgpack is not None
+            return msgpack.packb(data)
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data).encode('utf-8')
+
+
+def loads(data: bytes, format: str = 'json') -> List[Device]:
+    """
+    Deserialize a list of devices, as written by :func:`dumps` or by the
+    ``pylspci`` command, using :func:`decode`.
+
+    :param bytes data: The serialized devices.
+    :param str format: ``json`` or ``msgpack``. See :data:`FORMATS`.
+    :returns: The devices.
+    :rtype: List[Device]
+    :raises ValueError: The format is not supported, or the data is not
+       a valid list of devices.
+    :raises ImportError: The format requires a package that is not
+       installed.
+    """
+    _check_format(format)
+    items: Any
+    with span('deserialize'):
+        if format == 'msgpack':
+            assert msgpack is not None
+            items = msgpack.unpackb(data)
+        else:
+            items = _json_loads(data)
+        if not isinstance(items, list):
+            raise ValueError('Expected a list of devices')
+        try:
+            return list(map(decode, items))
+        except (AttributeError, KeyError, TypeError) as e:
+            raise ValueError('Invalid device: {!r}'.format(e))
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_decode_ndjson(lines: Iterable[Union[str, bytes]]) -> Iterator[Device]:
+    """
+    Decode newline-delimited JSON, with one device on each line, such as
+    written by ``pylspci --ndjson``, and yield each device as soon as its
+    line is read. Blank lines are ignored.
+
+    Slots and names are shared between devices, as with
+    :meth:`Slot.from_dict <pylspci.fields.Slot.from_dict>`, so devices
+    behind the same bridges share their parent slots.
+
+    :param lines: Lines of JSON, as strings or bytes.
+    :type lines: Iterable[str or bytes]
+    :returns: An iterator of devices.
+    :rtype: Iterator[Device]
+    :raises ValueError: A line is not a valid device.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield Device.from_dict(_json_loads(line))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(
+                'Invalid device on line {}: {!r}'.format(number, e))
+
+
+def iter_load_ndjson(path: Union[str, Path]) -> Iterator[Device]:
+    """
+    Read devices from a newline-delimited JSON file, without holding the
+    whole file in memory. See :func:`iter_decode_ndjson`.
+
+    :param path: Path to the file.
+    :type path: str or Path
+    :returns: An iterator of devices.
+    :rtype: Iterator[Device]
+    :raises ValueError: A line is not a valid device.
+    """
+    with open(str(path), 'rb') as f:
+        yield from iter_decode_ndjson(f)
@@ -0,0 +1,310 @@
+import os
+import re
+from fnmatch import translate
+from heapq import merge
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple, Union
+
+from pylspci.capabilities import ConfigSpace
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+
+OptionalPath = Optional[Union[str, Path]]
+
+DEFAULT_SYSFS_PATH = Path('/sys')
+"""
+Default mount point of sysfs.
+"""
+
+# A PCI modalias, such as pci:v00008086d0000244Esv...bc06sc04i01, has the
+# vendor ID at [5:13], the device ID at [14:22] and the base class at
+# [44:46]. Aliases are indexed on the vendor and device IDs, or on the base
+# class for aliases matching any vendor, when they contain no wildcards, so
+# that each device is only matched against the few aliases that can apply.
+_VENDOR = slice(5, 13)
+_DEVICE = slice(14, 22)
+_BASE_CLASS = slice(44, 46)
+_WILDCARDS = re.compile(r'[*?[]')
+# Modaliases use uppercase hexadecimal, so the lowercase bc only appears once
+_BASE_CLASS_PATTERN = re.compile(r'bc([0-9A-F]{2})sc')
+
+# Vendor ID, device ID and base class
+AliasKey = Tuple[Optional[str], Optional[str], Optional[str]]
+# Position in the alias files, pattern and module name of each alias
+Alias = Tuple[int, str, str]
+
+
+def _alias_key(pattern: str) -> AliasKey:
+    vendor = pattern[_VENDOR]
+    if pattern[4:5] != 'v' or pattern[13:14] != 'd' \
+            or _WILDCARDS.search(vendor):
+        match = _BASE_CLASS_PATTERN.search(pattern)
+        return (None, None, match.group(1) if match else None)
+    device = pattern[_DEVICE]
+    if pattern[22:24] != 'sv' or _WILDCARDS.search(device):
+        return (vendor, None, None)
+    return (vendor, device, None)
+
+
+class SysfsReader(object):
+    """
+    Lists PCI devices by reading ``/sys/bus/pci/devices`` directly,
+    without calling ``lspci``. Devices are built with the same fields as the
+    :class:`VerboseParser <pylspci.parsers.VerboseParser>` would give for
+    ``lspci -vvvmmnk``, with IDs but no names.
+
+    This only works on Linux.
+
+    :param root: Path to the sysfs mount point.
+    :type root: str or Path or None
+    :param modules_alias: Paths to the kernel module alias files.
+       Defaults to the ``modules.alias`` and ``modules.builtin.alias``
+       files of the running kernel.
+    :type modules_alias: List[str or Path] or None
+    """
+
+    root: Path
+    """
+    Path to the sysfs mount point.
+    """
+
+    modules_alias: List[Path]
+    """
+    Paths to the kernel module alias files, used to find the kernel modules
+    able to handle each device.
+    """
+
+    def __init__(self,
+                 root: OptionalPath = DEFAULT_SYSFS_PATH,
+                 modules_alias: Optional[List[Union[str, Path]]] = None,
+                 ) -> None:
+        self.root = Path(root or DEFAULT_SYSFS_PATH)
+        if modules_alias is None:
+            modules_dir = Path('/lib/modules', os.uname().release)
+            modules_alias = [
+                modules_dir / 'modules.alias',
+                modules_dir / 'modules.builtin.alias',
+            ]
+        self.modules_alias = list(map(Path, modules_alias))
+        self._aliases: Optional[Dict[AliasKey, List[Alias]]] = None
+        self._patterns: Dict[str, Pattern[str]] = {}
+
+    @property
+    def devices_path(self) -> Path:
+        """
+        Path to the sysfs folder holding one symlink for each PCI device.
+        """
+        return self.root / 'bus' / 'pci' / 'devices'
+
+    def read_devices(self,
+                     kernel_modules: bool = False,
+                     config: bool = False) -> List[Device]:
+        """
+        Read all the PCI devices, sorted by slot.
+
+        :param bool kernel_modules: Also look for the kernel modules able to
+           handle each device. This requires reading the module alias files.
+        :param bool config: Also read the configuration space of each device
+           into :attr:`Device.config <pylspci.device.Device.config>`.
+           This reads up to 4 KiB more for each device.
+        :returns: A list of devices.
+        :rtype: List[Device]
+        """
+        physical_slots = self._read_physical_slots()
+        return [
+            self.read_device(
+                name,
+                kernel_modules=kernel_modules,
+                physical_slots=physical_slots,
+                config=config,
+            )
+            for name in sorted(os.listdir(str(self.devices_path)))
+        ]
+
+    def read_device(self,
+                    name: str,
+                    kernel_modules: bool = False,
+                    physical_slots: Optional[Dict[str, str]] = None,
+                    config: bool = False,
+                    ) -> Device:
+        """
+        Read a single PCI device.
+
+        :param str name: Name of the device in ``/sys/bus/pci/devices``,
+           which is its full slot, such as ``0000:00:1c.3``.
+        :param bool kernel_modules: Also look for the kernel modules able to
+           handle this device. This requires reading the module alias files.
+        :param physical_slots: A mapping of ``domain:bus:device`` addresses
+           to physical slot names. Read from sysfs when omitted.
+        :type physical_slots: Dict[str, str] or None
+        :param bool config: Also read the configuration space of the device
+           into :attr:`Device.config <pylspci.device.Device.config>`.
+           This reads up to 4 KiB more.
+        :returns: The device.
+        :rtype: Device
+        """
+        path = self.devices_path / name
+        if physical_slots is None:
+            physical_slots = self._read_physical_slots()
+
+        cls = self._read_int(path / 'class', 16)
+        revision = self._read_int(path / 'revision', 16)
+        subsystem_vendor = subsystem_device = None
+        subsystem_vendor_id = self._read_int(path / 'subsystem_vendor', 16)
+        if subsystem_vendor_id and subsystem_vendor_id != 0xffff:
+            subsystem_vendor = self._name(subsystem_vendor_id)
+            subsystem_device = self._name(
+                self._read_int(path / 'subsystem_device', 16))
+
+        numa_node = self._read_int(path / 'numa_node', 10)
+        if numa_node is not None and numa_node < 0:
+            # -1 when the platform does not provide NUMA information
+            numa_node = None
+
+        modules: List[str] = []
+        if kernel_modules:
+            modalias = self._read(path / 'modalias')
+            if modalias:
+                modules = self._find_modules(modalias)
+
+        return Device(
+            slot=Slot(name),
+            cls=self._name(None if cls is None else cls >> 8),
+            vendor=self._name(self._read_int(path / 'vendor', 16)),
+            device=self._name(self._read_int(path / 'device', 16)),
+            subsystem_vendor=subsystem_vendor,
+            subsystem_device=subsystem_device,
+            # lspci omits the revision and programming interface when zero
+            revision=revision or None,
+            progif=None if cls is None else (cls & 0xff) or None,
+            driver=self._read_link(path / 'driver'),
+            kernel_modules=modules,
+            numa_node=numa_node,
+            iommu_group=self._read_int_link(path / 'iommu_group'),
+            physical_slot=physical_slots.get(name.rpartition('.')[0]),
+            # Read now, so that the device is a snapshot of this scan
+            config=ConfigSpace(self._read_bytes(path / 'config'))
+            if config else None,
+        )
+
+    @staticmethod
+    def _name(value: Optional[int]) -> NameWithID:
+        return NameWithID(None if value is None else '{:04x}'.format(value))
+
+    @staticmethod
+    def _read(path: Path) -> str:
+        try:
+            return path.read_text().strip()
+        except OSError:
+            return ''
+
+    @staticmethod
+    def _read_bytes(path: Path) -> bytes:
+        try:
+            return path.read_bytes()
+        except OSError:
+            return b''
+
+    def _read_int(self, path: Path, base: int) -> Optional[int]:
+        try:
+            return int(self._read(path), base)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _read_link(path: Path) -> Optional[str]:
+        try:
+            return os.path.basename(os.readlink(str(path)))
+        except OSError:
+            return None
+
+    def _read_int_link(self, path: Path) -> Optional[int]:
+        try:
+            return int(self._read_link(path) or '')
+        except ValueError:
+            return None
+
+    def _read_physical_slots(self) -> Dict[str, str]:
+        """
+        Read the physical slot names from ``/sys/bus/pci/slots``, as a mapping
+        of ``domain:bus:device`` addresses to slot names.
+        """
+        slots_path = self.root / 'bus' / 'pci' / 'slots'
+        try:
+            names = os.listdir(str(slots_path))
+        except OSError:
+            return {}
+        slots: Dict[str, str] = {}
+        for name in names:
+            address = self._read(slots_path / name / 'address')
+            if address:
+                slots[address] = name
+        return slots
+
+    def _load_aliases(self) -> Dict[AliasKey, List[Alias]]:
+        aliases: Dict[AliasKey, List[Alias]] = {}
+        position = 0
+        for alias_path in self.modules_alias:
+            try:
+                with alias_path.open() as f:
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) == 3 and parts[0] == 'alias' \
+                                and parts[1].startswith('pci:'):
+                            aliases.setdefault(_alias_key(parts[1]), []) \
+                                .append((position, parts[1], parts[2]))
+                            position += 1
+            except OSError:
+                continue
+        return aliases
+
+    def _find_modules(self, modalias: str) -> List[str]:
+        """
+        Find the kernel modules whose aliases match a device's modalias,
+        as ``lspci -k`` does through libkmod.
+        """
+        if self._aliases is None:
+            self._aliases = self._load_aliases()
+        vendor, device = modalias[_VENDOR], modalias[_DEVICE]
+        # Candidates are merged back in the order of the alias files
+        candidates = merge(*(
+            self._aliases.get(key, []) for key in (
+                (vendor, device, None),
+                (vendor, None, None),
+                (None, None, modalias[_BASE_CLASS]),
+                (None, None, None),
+            )
+        ))
+
+        modules: List[str] = []
+        for _, pattern, module in candidates:
+            if module in modules:
+                continue
+            regex = self._patterns.get(pattern)
+            if regex is None:
+                regex = self._patterns[pattern] = re.compile(
+                    translate(pattern))
+            if regex.match(modalias):
+                modules.append(module)
+        return modules
+
+
+def read_devices(root: OptionalPath = DEFAULT_SYSFS_PATH,
+                 kernel_modules: bool = False,
+                 config: bool = False) -> List[Device]:
+    """
+    Read all the PCI devices from sysfs, without calling ``lspci``.
+    Shortcut for :meth:`SysfsReader.read_devices`.
+
+    :param root: Path to the sysfs mount point.
+    :type root: str or Path or None
+    :param bool kernel_modules: Also look for the kernel modules able to
+       handle each device.
+    :param bool config: Also read the configuration space of each device.
+    :returns: A list of devices, sorted by slot.
+    :rtype: List[Device]
+    """
+    return SysfsReader(root).read_devices(
+        kernel_modules=kernel_modules,
+        config=config,
+    )
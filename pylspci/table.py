@@ -0,0 +1,408 @@
+from array import array
+from typing import (
+    Dict, Iterable, Iterator, List, Optional, Sequence, Union, overload
+)
+
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+from pylspci.filters import DeviceFilter, SlotFilter
+
+NONE = -1
+"""
+Sentinel for a missing number, or for a missing name or string
+in the string pool.
+"""
+
+ABSENT = -2
+"""
+Sentinel for a missing subsystem vendor or device, as opposed to a subsystem
+that is present but has no name.
+"""
+
+
+class StringPool(object):
+    """
+    Stores each distinct string once, and refers to them by their index.
+    A single pool can be shared by many :class:`DeviceTable` instances,
+    for example to store the devices of many hosts.
+    """
+
+    strings: List[str]
+    """
+    All the strings of the pool, in insertion order.
+    """
+
+    def __init__(self) -> None:
+        self.strings = []
+        self._indexes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def add(self, value: Optional[str]) -> int:
+        """
+        Add a string to the pool if it is not already present.
+
+        :param value: The string to add.
+        :type value: str or None
+        :returns: The index of the string, or :data:`NONE` for ``None``.
+        :rtype: int
+        """
+        if value is None:
+            return NONE
+        index = self._indexes.get(value)
+        if index is None:
+            index = self._indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def get(self, index: int) -> Optional[str]:
+        """
+        Get a string from its index.
+
+        :param int index: Index of a string, or :data:`NONE`.
+        :returns: The string, or ``None`` for :data:`NONE`.
+        :rtype: str or None
+        """
+        if index < 0:
+            return None
+        return self.strings[index]
+
+
+class DeviceTable(Sequence[Device]):
+    """
+    A columnar container of devices, storing the numeric fields of each device
+    in typed arrays, and strings in a :class:`StringPool`. This uses far less
+    memory than a list of :class:`Device` instances, making it suitable to
+    store the devices of many hosts or many snapshots.
+
+    Missing numbers are stored as :data:`NONE`; missing subsystems are stored
+    as :data:`ABSENT`. Devices are rebuilt when accessed, by indexing or
+    iterating over the table. Configuration spaces are not stored.
+
+    :param devices: Devices to add to the table.
+    :type devices: Iterable[Device]
+    :param pool: A string pool to share with other tables.
+       Defaults to a new pool.
+    :type pool: StringPool or None
+    """
+
+    pool: StringPool
+    """
+    Pool holding the names, drivers, kernel modules, physical slots
+    and parent bridges of the devices.
+    """
+
+    domain: array
+    """
+    Slot domains.
+    """
+
+    bus: array
+    """
+    Slot buses.
+    """
+
+    device_number: array
+    """
+    Slot device numbers.
+    """
+
+    function: array
+    """
+    Slot functions.
+    """
+
+    cls_id: array
+    """
+    Class IDs.
+    """
+
+    vendor_id: array
+    """
+    Vendor IDs.
+    """
+
+    device_id: array
+    """
+    Device IDs.
+    """
+
+    subsystem_vendor_id: array
+    """
+    Subsystem vendor IDs.
+    """
+
+    subsystem_device_id: array
+    """
+    Subsystem device IDs.
+    """
+
+    revision: array
+    """
+    Revision numbers.
+    """
+
+    progif: array
+    """
+    Programming interface numbers.
+    """
+
+    numa_node: array
+    """
+    NUMA nodes.
+    """
+
+    iommu_group: array
+    """
+    IOMMU groups.
+    """
+
+    _NAME_FIELDS = (
+        'cls', 'vendor', 'device', 'subsystem_vendor', 'subsystem_device')
+
+    def __init__(self,
+                 devices: Iterable[Device] = (),
+                 pool: Optional[StringPool] = None) -> None:
+        self.pool = pool if pool is not None else StringPool()
+        # Domains are 32-bit, such as Intel VMD domains from 0x10000
+        self.domain = array('I')
+        self.bus = array('B')
+        self.device_number = array('B')
+        self.function = array('B')
+        self.revision = array('h')
+        self.progif = array('h')
+        self.numa_node = array('i')
+        self.iommu_group = array('i')
+        for field in self._NAME_FIELDS:
+            setattr(self, field + '_id', array('i'))
+            setattr(self, '_' + field + '_name', array('i'))
+        self._parent = array('i')
+        self._driver = array('i')
+        self._physical_slot = array('i')
+        # Kernel modules are stored as a flat array of pool indexes;
+        # the modules of device i are from _module_offsets[i]
+        # to _module_offsets[i + 1].
+        self._modules = array('i')
+        self._module_offsets = array('I', [0])
+        self.extend(devices)
+
+    def __len__(self) -> int:
+        return len(self.domain)
+
+    @overload
+    def __getitem__(self, index: int) -> Device:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> 'DeviceTable':
+        ...
+
+    def __getitem__(
+            self,
+            index: Union[int, slice]) -> Union[Device, 'DeviceTable']:
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('DeviceTable index out of range')
+        return self._build(index)
+
+    def __iter__(self) -> Iterator[Device]:
+        return map(self._build, range(len(self)))
+
+    def __repr__(self) -> str:
+        return '<{} of {} devices>'.format(self.__class__.__name__, len(self))
+
+    def append(self, device: Device) -> None:
+        """
+        Add a device at the end of the table.
+
+        :param device: The device to add.
+        :type device: Device
+        """
+        pool = self.pool
+        slot = device.slot
+        self.domain.append(slot.domain)
+        self.bus.append(slot.bus)
+        self.device_number.append(slot.device)
+        self.function.append(slot.function)
+        self._parent.append(
+            pool.add(str(slot.parent)) if slot.parent else NONE)
+
+        for field in self._NAME_FIELDS:
+            value: Optional[NameWithID] = getattr(device, field)
+            ids: array = getattr(self, field + '_id')
+            names: array = getattr(self, '_' + field + '_name')
+            if value is None:
+                ids.append(NONE)
+                names.append(ABSENT)
+            else:
+                ids.append(NONE if value.id is None else value.id)
+                names.append(pool.add(value.name))
+
+        self.revision.append(self._number(device.revision))
+        self.progif.append(self._number(device.progif))
+        self.numa_node.append(self._number(device.numa_node))
+        self.iommu_group.append(self._number(device.iommu_group))
+        self._driver.append(pool.add(device.driver))
+        self._physical_slot.append(pool.add(device.physical_slot))
+        self._modules.extend(map(pool.add, device.kernel_modules))
+        self._module_offsets.append(len(self._modules))
+
+    def extend(self, devices: Iterable[Device]) -> None:
+        """
+        Add devices at the end of the table.
+
+        :param devices: The devices to add.
+        :type devices: Iterable[Device]
+        """
+        for device in devices:
+            self.append(device)
+
+    def take(self, indexes: Iterable[int]) -> 'DeviceTable':
+        """
+        Build a new table holding only some devices, sharing the same
+        string pool.
+
+        :param indexes: Indexes of the devices to keep, in order.
+        :type indexes: Iterable[int]
+        :returns: A new table.
+        :rtype: DeviceTable
+        """
+        indexes = list(indexes)
+        table = self.__class__(pool=self.pool)
+        for name in ('domain', 'bus', 'device_number', 'function',
+                     'revision', 'progif', 'numa_node', 'iommu_group',
+                     '_parent', '_driver', '_physical_slot') \
+                + tuple(field + '_id' for field in self._NAME_FIELDS) \
+                + tuple('_' + field + '_name' for field in self._NAME_FIELDS):
+            column: array = getattr(self, name)
+            getattr(table, name).extend(column[i] for i in indexes)
+
+        offsets = self._module_offsets
+        for i in indexes:
+            table._modules.extend(self._modules[offsets[i]:offsets[i + 1]])
+            table._module_offsets.append(len(table._modules))
+        return table
+
+    def indexes(self,
+                slot_filter: Optional[SlotFilter] = None,
+                device_filter: Optional[DeviceFilter] = None) -> List[int]:
+        """
+        Find the devices matching a slot filter and a device filter,
+        column by column, without building any device.
+
+        :param slot_filter: An optional slot filter.
+        :type slot_filter: SlotFilter or None
+        :param device_filter: An optional device filter.
+        :type device_filter: DeviceFilter or None
+        :returns: The indexes of the matching devices.
+        :rtype: List[int]
+        """
+        criteria = []
+        if slot_filter:
+            criteria.extend([
+                (self.domain, slot_filter.domain),
+                (self.bus, slot_filter.bus),
+                (self.device_number, slot_filter.device),
+                (self.function, slot_filter.function),
+            ])
+        if device_filter:
+            criteria.extend([
+                (self.vendor_id, device_filter.vendor),
+                (self.device_id, device_filter.device),
+                (self.cls_id, device_filter.cls),
+            ])
+        result: Optional[List[int]] = None
+        for column, expected in criteria:
+            if expected is None:
+                continue
+            if result is None:
+                # Scan the whole first column, then only check
+                # the remaining candidates in the next columns.
+                result = [
+                    i for i, value in enumerate(column) if value == expected]
+            else:
+                result = [i for i in result if column[i] == expected]
+        if result is None:
+            return list(range(len(self)))
+        return result
+
+    def select(self,
+               slot_filter: Optional[SlotFilter] = None,
+               device_filter: Optional[DeviceFilter] = None,
+               ) -> 'DeviceTable':
+        """
+        Build a new table holding only the devices matching a slot filter
+        and a device filter, like the ``-s`` and ``-d`` options of lspci.
+
+        :param slot_filter: An optional slot filter.
+        :type slot_filter: SlotFilter or None
+        :param device_filter: An optional device filter.
+        :type device_filter: DeviceFilter or None
+        :returns: A new table, sharing the same string pool.
+        :rtype: DeviceTable
+        """
+        return self.take(self.indexes(
+            slot_filter=slot_filter, device_filter=device_filter))
+
+    def to_devices(self) -> List[Device]:
+        """
+        Build all the devices of this table.
+
+        :returns: A list of devices.
+        :rtype: List[Device]
+        """
+        return list(self)
+
+    @staticmethod
+    def _number(value: Optional[int]) -> int:
+        return NONE if value is None else value
+
+    @staticmethod
+    def _optional(value: int) -> Optional[int]:
+        return None if value < 0 else value
+
+    def _name(self, field: str, index: int) -> NameWithID:
+        return NameWithID._from_fields(
+            self._optional(getattr(self, field + '_id')[index]),
+            self.pool.get(getattr(self, '_' + field + '_name')[index]),
+        )
+
+    def _subsystem(self, field: str, index: int) -> Optional[NameWithID]:
+        if getattr(self, '_' + field + '_name')[index] == ABSENT:
+            return None
+        return self._name(field, index)
+
+    def _build(self, index: int) -> Device:
+        pool = self.pool
+        slot = '{:04x}:{:02x}:{:02x}.{:x}'.format(
+            self.domain[index],
+            self.bus[index],
+            self.device_number[index],
+            self.function[index],
+        )
+        parent = pool.get(self._parent[index])
+        if parent:
+            slot = '{}/{}'.format(parent, slot)
+        offsets = self._module_offsets
+        return Device(
+            slot=Slot(slot),
+            cls=self._name('cls', index),
+            vendor=self._name('vendor', index),
+            device=self._name('device', index),
+            subsystem_vendor=self._subsystem('subsystem_vendor', index),
+            subsystem_device=self._subsystem('subsystem_device', index),
+            revision=self._optional(self.revision[index]),
+            progif=self._optional(self.progif[index]),
+            driver=pool.get(self._driver[index]),
+            kernel_modules=[
+                pool.strings[i]
+                for i in self._modules[offsets[index]:offsets[index + 1]]
+            ],
+            numa_node=self._optional(self.numa_node[index]),
+            iommu_group=self._optional(self.iommu_group[index]),
+            physical_slot=pool.get(self._physical_slot[index]),
+        )
@@ -0,0 +1,249 @@
+import asyncio
+import os
+import subprocess
+import sys
+from typing import Any, AsyncIterator, List
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+
+from pylspci.cache import LspciCache
+from pylspci.command import (
+    CommandBuilder, aiter_lspci, async_lspci, lspci_args
+)
+from pylspci.device import Device
+from pylspci.parsers import SimpleParser, VerboseParser
+
+SIMPLE_LINE: str = (
+    '00:1c.3 "PCI bridge [0604]" "Intel Corporation [8086]" '
+    '"82801 PCI Bridge [244e]" -rd5 -p01 "Intel Corporation [8086]" '
+    '"82801 PCI Bridge [244e]"\n'
+)
+
+VERBOSE_DEVICE: str = (
+    'Slot:\t{}\n'
+    'Class:\tPCI bridge [0604]\n'
+    'Vendor:\tIntel Corporation [8086]\n'
+    'Device:\t82801 PCI Bridge [244e]\n'
+    '\n'
+)
+
+
+def python(script: str) -> List[str]:
+    """
+    Command line running a Python script, standing for lspci
+    in the subprocess tests.
+    """
+    return [sys.executable, '-c', script]
+
+
+def is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+class AsyncTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self) -> None:
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine: Any) -> Any:
+        return self.loop.run_until_complete(coroutine)
+
+
+async def collect(iterator: AsyncIterator[Any]) -> List[Any]:
+    return [item async for item in iterator]
+
+
+class TestAsyncLspci(AsyncTestCase):
+
+    @patch('pylspci.command.lspci_args')
+    def test_async_lspci(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python('print("a")\nprint("b")')
+        self.assertEqual(self.run_async(async_lspci(verbose=True)), 'a\nb\n')
+        self.assertEqual(args_mock.call_args, call(verbose=True))
+
+    @patch('pylspci.command.lspci_args')
+    def test_async_lspci_error(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python('print("a")\nexit(1)')
+        with self.assertRaises(subprocess.CalledProcessError) as ctx:
+            self.run_async(async_lspci())
+        self.assertEqual(ctx.exception.output, 'a\n')
+
+    @patch('pylspci.command.lspci_args')
+    def test_async_lspci_timeout(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python(
+            'import os, time\nprint(os.getpid(), flush=True)\ntime.sleep(60)')
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_async(async_lspci(timeout=0.5))
+
+    @patch('pylspci.command.lspci_args')
+    def test_aiter_lspci(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python('print("a")\nprint("b")')
+        self.assertListEqual(
+            self.run_async(collect(aiter_lspci(verbose=True))),
+            ['a\n', 'b\n'],
+        )
+        self.assertEqual(args_mock.call_args, call(verbose=True))
+
+    @patch('pylspci.command.lspci_args')
+    def test_aiter_lspci_error(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python('print("a")\nexit(1)')
+        with self.assertRaises(subprocess.CalledProcessError):
+            self.run_async(collect(aiter_lspci()))
+
+    @patch('pylspci.command.lspci_args')
+    def test_aiter_lspci_timeout(self, args_mock: MagicMock) -> None:
+        """
+        The timeout applies to the whole output, and lspci is killed.
+        """
+        args_mock.return_value = python(
+            'import os, time\nprint(os.getpid(), flush=True)\ntime.sleep(60)')
+        pids: List[int] = []
+
+        async def run() -> None:
+            async for line in aiter_lspci(timeout=0.5):
+                pids.append(int(line))
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_async(run())
+        self.assertEqual(len(pids), 1)
+        self.assertFalse(is_running(pids[0]))
+
+    @patch('pylspci.command.lspci_args')
+    def test_aiter_lspci_cancel(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python(
+            'import os, time\nprint(os.getpid(), flush=True)\ntime.sleep(60)')
+        pids: List[int] = []
+
+        async def run() -> None:
+            async for line in aiter_lspci():
+                pids.append(int(line))
+
+        async def cancel() -> None:
+            task = asyncio.ensure_future(run())
+            while not pids:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.run_async(cancel())
+        self.assertFalse(is_running(pids[0]))
+
+    @patch('pylspci.command.lspci_args')
+    def test_aiter_lspci_close(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python(
+            'import os, time\nprint(os.getpid(), flush=True)\ntime.sleep(60)')
+
+        async def run() -> int:
+            lines = aiter_lspci()
+            pid = int(await lines.__anext__())
+            await lines.aclose()  # type: ignore
+            return pid
+
+        self.assertFalse(is_running(self.run_async(run())))
+
+
+async def fake_lines(*lines: str) -> AsyncIterator[str]:
+    for line in lines:
+        # Let other tasks run between lines, as with a real pipe
+        await asyncio.sleep(0)
+        yield line
+
+
+class TestAsyncParsers(AsyncTestCase):
+
+    def test_simple_aiter_parse(self) -> None:
+        devices = self.run_async(collect(SimpleParser().aiter_parse(
+            fake_lines(SIMPLE_LINE, '\n', SIMPLE_LINE))))
+        self.assertEqual(len(devices), 2)
+        self.assertIsInstance(devices[0], Device)
+        self.assertEqual(devices[0].cls.id, 0x0604)
+
+    def test_verbose_aiter_parse(self) -> None:
+        parsed: List[Device] = []
+
+        async def lines() -> AsyncIterator[str]:
+            for slot in ('00:01.0', '00:02.0'):
+                # The previous device is parsed before reading the next one
+                self.assertEqual(len(parsed), int(slot[-3]) - 1)
+                for line in VERBOSE_DEVICE.format(slot).splitlines(True):
+                    yield line
+
+        async def run() -> None:
+            async for device in VerboseParser().aiter_parse(lines()):
+                parsed.append(device)
+
+        self.run_async(run())
+        self.assertListEqual(
+            [str(device.slot) for device in parsed],
+            ['0000:00:01.0', '0000:00:02.0'],
+        )
+
+    @patch('pylspci.command.aiter_lspci')
+    def test_arun(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = fake_lines(SIMPLE_LINE, SIMPLE_LINE)
+        devices = self.run_async(SimpleParser().arun(timeout=5))
+        self.assertEqual(len(devices), 2)
+        self.assertEqual(cmd_mock.call_args, call(timeout=5))
+
+    @patch('pylspci.command.lspci_args')
+    def test_arun_cache(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = python(
+            'print({!r}, end="")'.format(SIMPLE_LINE))
+        cache = LspciCache()
+        devices = self.run_async(SimpleParser().arun(cache=cache))
+        self.assertEqual(len(devices), 1)
+        self.assertEqual(args_mock.call_args, call())
+        self.assertEqual(
+            self.run_async(async_lspci(cache=cache)), SIMPLE_LINE)
+        # Caches are not used asynchronously
+        self.assertEqual(len(cache), 0)
+
+    def test_arun_verbose_error(self) -> None:
+        with self.assertRaises(ValueError):
+            self.run_async(SimpleParser().arun(verbose=True))
+
+
+class TestAsyncCommandBuilder(AsyncTestCase):
+
+    @patch('pylspci.command.aiter_lspci')
+    def test_parser(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = fake_lines(SIMPLE_LINE, SIMPLE_LINE)
+        builder = CommandBuilder().with_parser(SimpleParser()) \
+            .with_timeout(5)
+        devices = self.run_async(collect(builder.__aiter__()))
+        self.assertEqual(len(devices), 2)
+        self.assertIsInstance(devices[0], Device)
+        self.assertEqual(cmd_mock.call_args, call(timeout=5))
+
+    @patch('pylspci.command.async_lspci')
+    def test_raw(self, cmd_mock: MagicMock) -> None:
+        async def fake_lspci(**kwargs: Any) -> str:
+            return 'a\nb\n'
+        cmd_mock.side_effect = fake_lspci
+        builder = CommandBuilder().verbose()
+        self.assertListEqual(
+            self.run_async(collect(builder.__aiter__())), ['a\nb\n'])
+        self.assertEqual(cmd_mock.call_args, call(timeout=None, verbose=True))
+
+    @patch('pylspci.command.list_access_methods')
+    def test_list_access_methods(self, list_mock: MagicMock) -> None:
+        list_mock.return_value = ['a', 'b']
+        builder = CommandBuilder().list_access_methods()
+        self.assertListEqual(
+            self.run_async(collect(builder.__aiter__())), ['a', 'b'])
+
+    def test_lspci_args(self) -> None:
+        """
+        Ensure the subprocess tests do not hide a change in lspci_args.
+        """
+        self.assertListEqual(lspci_args(), ['lspci', '-mm', '-nn'])
@@ -1,9 +1,30 @@
 from pathlib import Path
+from typing import List, Tuple
 from unittest import TestCase
 from unittest.mock import MagicMock, call, patch
 
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pylspci.cache import LspciCache
 from pylspci.command import CommandBuilder, IDResolveOption
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
 from pylspci.parsers import SimpleParser, VerboseParser
+from pylspci.tests.test_filters import device_filters, devices, slot_filters
+
+SIMPLE_OUTPUT = '\n'.join([
+    '00:00.0 "Host bridge [0600]" "Intel Corporation [8086]" '
+    '"Device [0c00]" -r06 "" ""',
+    '00:01.0 "PCI bridge [0604]" "Intel Corporation [8086]" '
+    '"Device [0c01]" -r06 "" ""',
+    '01:00.0 "VGA compatible controller [0300]" "NVIDIA Corporation [10de]" '
+    '"Device [1c82]" -ra1 "" ""',
+    '01:00.1 "Audio device [0403]" "NVIDIA Corporation [10de]" '
+    '"Device [0fb9]" -ra1 "" ""',
+    '',
+])
 
 
 class TestCommandBuilder(TestCase):
@@ -199,6 +220,37 @@ class TestCommandBuilder(TestCase):
         self.assertEqual(lspci_mock.call_args, call(file=Path('somefile')))
         self.assertFalse(isfile_mock.called)
 
+    @patch('pylspci.command.find_pciids')
+    @patch('pylspci.command.DumpReader')
+    @patch('pylspci.command.lspci')
+    def test_from_file_native(self,
+                              lspci_mock: MagicMock,
+                              reader_mock: MagicMock,
+                              find_mock: MagicMock) -> None:
+        find_mock.return_value = None
+        devices = [
+            Device(
+                slot=Slot(slot),
+                cls=NameWithID('0604'),
+                vendor=NameWithID('8086'),
+                device=NameWithID('244e'),
+            )
+            for slot in ('00:13.0', '00:14.0')
+        ]
+        reader_mock.return_value.iter_devices.return_value = iter(devices)
+        builder = CommandBuilder() \
+            .with_default_parser() \
+            .slot_filter('14') \
+            .from_file('somefile', check=False, native=True)
+        self.assertListEqual(list(builder), devices[1:])
+        self.assertFalse(lspci_mock.called)
+        self.assertEqual(reader_mock.call_args, call(Path('somefile')))
+
+        builder.from_file('somefile', check=False)
+        lspci_mock.return_value = ''
+        self.assertListEqual(list(builder), [])
+        self.assertEqual(lspci_mock.call_count, 1)
+
     @patch('pylspci.command.lspci')
     def test_verbose(self, lspci_mock: MagicMock) -> None:
         lspci_mock.return_value = ['a', 'b']
@@ -379,3 +431,199 @@ class TestCommandBuilder(TestCase):
         self.assertListEqual(list(builder), ['parsed_a', 'parsed_b'])
         self.assertEqual(parser_mock.parse.call_count, 1)
         self.assertEqual(parser_mock.parse.call_args, call(['a', 'b']))
+
+    @patch('pylspci.command.iter_lspci')
+    @patch('pylspci.command.lspci')
+    def test_stream(self,
+                    lspci_mock: MagicMock,
+                    iter_mock: MagicMock) -> None:
+        iter_mock.return_value = iter(['a\n', 'b\n'])
+        parser_mock = MagicMock(spec=SimpleParser)
+        parser_mock.iter_parse.return_value = iter(['parsed_a', 'parsed_b'])
+        builder = CommandBuilder().with_parser(parser_mock).stream()
+        self.assertListEqual(list(builder), ['parsed_a', 'parsed_b'])
+        self.assertFalse(lspci_mock.called)
+        self.assertEqual(iter_mock.call_args, call())
+        self.assertEqual(parser_mock.iter_parse.call_count, 1)
+        self.assertEqual(
+            parser_mock.iter_parse.call_args, call(iter_mock.return_value))
+
+        # Without a parser, the whole output is returned
+        lspci_mock.return_value = 'a\nb\n'
+        self.assertListEqual(
+            list(CommandBuilder().stream()), ['a\nb\n'])
+        self.assertFalse(builder.stream(False)._stream)
+
+    @patch('pylspci.command.subprocess.check_output')
+    def test_use_cache(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = 'a\nb\n'
+        cache = LspciCache(ttl=60)
+        builder = CommandBuilder().use_cache(cache)
+        self.assertListEqual(list(builder), ['a\nb\n'])
+        self.assertListEqual(list(builder), ['a\nb\n'])
+        self.assertListEqual(
+            list(CommandBuilder().use_cache(cache)), ['a\nb\n'])
+        self.assertEqual(cmd_mock.call_count, 1)
+        self.assertEqual(cache.hits, 2)
+
+        builder.use_cache(None)
+        self.assertListEqual(list(builder), ['a\nb\n'])
+        self.assertEqual(cmd_mock.call_count, 2)
+
+    @patch('pylspci.command.SysfsReader')
+    @patch('pylspci.command.Path.is_dir')
+    @patch('pylspci.command.lspci')
+    def test_use_sysfs(self,
+                       lspci_mock: MagicMock,
+                       isdir_mock: MagicMock,
+                       reader_mock: MagicMock) -> None:
+        isdir_mock.return_value = True
+        reader_mock.return_value.read_devices.return_value = ['a', 'b']
+        builder = CommandBuilder() \
+            .with_default_parser() \
+            .include_kernel_drivers() \
+            .use_sysfs('/somewhere')
+        self.assertListEqual(list(builder), ['a', 'b'])
+        self.assertFalse(lspci_mock.called)
+        self.assertEqual(isdir_mock.call_count, 1)
+        self.assertEqual(reader_mock.call_args, call(Path('/somewhere')))
+        self.assertEqual(
+            reader_mock.return_value.read_devices.call_args,
+            call(kernel_modules=True, config=False),
+        )
+
+        builder.use_sysfs('/somewhere', config=True)
+        self.assertListEqual(list(builder), ['a', 'b'])
+        self.assertEqual(
+            reader_mock.return_value.read_devices.call_args,
+            call(kernel_modules=True, config=True),
+        )
+
+        builder.use_sysfs(None)
+        lspci_mock.return_value = ''
+        self.assertListEqual(list(builder), [])
+        self.assertEqual(lspci_mock.call_count, 1)
+
+    @patch('pylspci.command.Path.is_dir')
+    def test_use_sysfs_check(self, isdir_mock: MagicMock) -> None:
+        isdir_mock.return_value = False
+        with self.assertRaisesRegex(AssertionError, 'not found'):
+            CommandBuilder().use_sysfs('/somewhere')
+        self.assertEqual(isdir_mock.call_count, 1)
+
+    @patch('pylspci.command.SysfsReader')
+    def test_use_sysfs_filters(self, reader_mock: MagicMock) -> None:
+        devices = [
+            Device(
+                slot=Slot(slot),
+                cls=NameWithID('0604'),
+                vendor=NameWithID(vendor),
+                device=NameWithID('244e'),
+            )
+            for slot, vendor in (
+                ('00:13.0', '8086'),
+                ('00:13.1', '10de'),
+                ('00:14.0', '8086'),
+            )
+        ]
+        reader_mock.return_value.read_devices.return_value = devices
+        builder = CommandBuilder() \
+            .use_sysfs('/somewhere', check=False) \
+            .with_names(False) \
+            .slot_filter('13')
+        self.assertListEqual(list(builder), devices[:2])
+        builder.device_filter(vendor=0x8086)
+        self.assertListEqual(list(builder), devices[:1])
+
+    @patch('pylspci.command.find_pciids')
+    @patch('pylspci.command.CachedPciIdsDatabase')
+    @patch('pylspci.command.SysfsReader')
+    def test_use_sysfs_names(self,
+                             reader_mock: MagicMock,
+                             database_mock: MagicMock,
+                             find_mock: MagicMock) -> None:
+        reader_mock.return_value.read_devices.return_value = ['a', 'b']
+        database_mock.return_value.resolve.side_effect = str.upper
+        find_mock.return_value = Path('/pci.ids')
+
+        builder = CommandBuilder().use_sysfs('/somewhere', check=False)
+        self.assertListEqual(list(builder), ['A', 'B'])
+        self.assertEqual(database_mock.call_args, call(Path('/pci.ids')))
+
+        builder.use_pciids('/other.ids', check=False)
+        self.assertListEqual(list(builder), ['A', 'B'])
+        self.assertEqual(database_mock.call_args, call(Path('/other.ids')))
+
+        builder.with_names(False)
+        self.assertListEqual(list(builder), ['a', 'b'])
+        self.assertEqual(database_mock.call_count, 2)
+
+        builder.with_names().use_pciids(None)
+        find_mock.return_value = None
+        self.assertListEqual(list(builder), ['a', 'b'])
+        self.assertEqual(database_mock.call_count, 2)
+
+    @patch('pylspci.command.lspci')
+    def test_query_many(self, lspci_mock: MagicMock) -> None:
+        lspci_mock.return_value = SIMPLE_OUTPUT
+        builder = CommandBuilder().with_default_parser()
+        intel, nvidia, gpu, bridge, empty = builder.query_many([
+            (None, '8086:'),
+            DeviceQuery(slot_filter='01:'),
+            ('01:00', DeviceFilter(cls=0x0300)),
+            (SlotFilter(bus=0), '::0604'),
+            ('02:', None),
+        ])
+        self.assertEqual(lspci_mock.call_count, 1)
+        self.assertEqual(lspci_mock.call_args, call())
+        self.assertEqual([str(device.slot) for device in intel],
+                         ['0000:00:00.0', '0000:00:01.0'])
+        self.assertEqual([str(device.slot) for device in nvidia],
+                         ['0000:01:00.0', '0000:01:00.1'])
+        self.assertEqual([device.device.id for device in gpu], [0x1c82])
+        self.assertEqual([device.device.id for device in bridge], [0x0c01])
+        self.assertEqual(empty, [])
+        self.assertEqual(builder.query_many([]), [])
+
+    @patch('pylspci.command.lspci')
+    def test_query_many_builder_filters(self, lspci_mock: MagicMock) -> None:
+        lspci_mock.return_value = SIMPLE_OUTPUT
+        builder = CommandBuilder().with_default_parser().slot_filter('01:')
+        self.assertEqual(
+            [len(devices) for devices in builder.query_many([
+                (None, None),
+                ('.1', None),
+            ])],
+            [4, 1],
+        )
+        # The builder's filters are still sent to lspci
+        self.assertEqual(
+            lspci_mock.call_args, call(slot_filter=SlotFilter(bus=1)))
+
+    def test_query_many_invalid(self) -> None:
+        with self.assertRaisesRegex(ValueError, 'require a parser'):
+            CommandBuilder().query_many([(None, None)])
+        with self.assertRaisesRegex(ValueError, 'require a parser'):
+            CommandBuilder().list_access_methods().with_default_parser() \
+                .query_many([(None, None)])
+        builder = CommandBuilder().with_default_parser().with_ids(False)
+        with self.assertRaisesRegex(ValueError, 'without IDs'):
+            builder.query_many([(None, '8086:')])
+
+    @given(
+        st.lists(devices),
+        st.lists(st.tuples(slot_filters, device_filters)),
+    )
+    def test_query_many_sysfs(self,
+                              items: List[Device],
+                              queries: List[Tuple[str, str]]) -> None:
+        with patch('pylspci.command.SysfsReader') as reader_mock:
+            reader_mock.return_value.read_devices.return_value = items
+            builder = CommandBuilder() \
+                .use_sysfs('/somewhere', check=False) \
+                .with_names(False)
+            self.assertEqual(builder.query_many(queries), [
+                DeviceQuery(*query).filter(items) for query in queries
+            ])
+            self.assertEqual(
+                reader_mock.return_value.read_devices.call_count, 1)
@@ -1,8 +1,10 @@
+import subprocess
 from unittest import TestCase
 from unittest.mock import MagicMock, call, patch
 
+from pylspci.cache import LspciCache
 from pylspci.command import (
-    IDResolveOption, list_access_methods, list_pcilib_params, lspci
+    IDResolveOption, iter_lspci, list_access_methods, list_pcilib_params, lspci
 )
 from pylspci.fields import PCIAccessParameter
 
@@ -239,6 +241,59 @@ class TestCommand(TestCase):
         ))
         self.assertEqual(is_file_mock.call_count, 3)
 
+    @patch('pylspci.command.subprocess.Popen')
+    def test_iter_lspci(self, popen_mock: MagicMock) -> None:
+        process = popen_mock.return_value.__enter__.return_value
+        process.stdout = iter(['a\n', 'b\n'])
+        process.returncode = 0
+        self.assertListEqual(list(iter_lspci(verbose=True)), ['a\n', 'b\n'])
+        self.assertEqual(popen_mock.call_count, 1)
+        self.assertEqual(popen_mock.call_args, call(
+            ['lspci', '-mm', '-vvv', '-nn'],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        ))
+        self.assertFalse(process.kill.called)
+
+    @patch('pylspci.command.subprocess.Popen')
+    def test_iter_lspci_error(self, popen_mock: MagicMock) -> None:
+        process = popen_mock.return_value.__enter__.return_value
+        process.stdout = iter(['a\n'])
+        process.returncode = 1
+        with self.assertRaises(subprocess.CalledProcessError):
+            list(iter_lspci())
+
+    @patch('pylspci.command.subprocess.Popen')
+    def test_iter_lspci_close(self, popen_mock: MagicMock) -> None:
+        """
+        Closing the iterator before the end of the output kills lspci.
+        """
+        process = popen_mock.return_value.__enter__.return_value
+        process.stdout = iter(['a\n', 'b\n'])
+        process.returncode = 0
+        lines = iter_lspci()
+        self.assertEqual(next(lines), 'a\n')
+        lines.close()
+        self.assertEqual(process.kill.call_count, 1)
+
+    @patch('pylspci.command.subprocess.check_output')
+    def test_cache(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = 'a\nb\n'
+        cache = LspciCache(ttl=60)
+        self.assertEqual(lspci(cache=cache), 'a\nb\n')
+        self.assertEqual(lspci(cache=cache), 'a\nb\n')
+        self.assertListEqual(list(iter_lspci(cache=cache)), ['a\n', 'b\n'])
+        self.assertEqual(cmd_mock.call_count, 1)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+
+        # Different arguments are cached separately
+        self.assertEqual(lspci(verbose=True, cache=cache), 'a\nb\n')
+        self.assertEqual(cmd_mock.call_count, 2)
+        self.assertEqual(cmd_mock.call_args, call(
+            ['lspci', '-mm', '-vvv', '-nn'], universal_newlines=True,
+        ))
+
     @patch('pylspci.command.subprocess.check_output')
     def test_list_access_methods(self, cmd_mock: MagicMock) -> None:
         cmd_mock.return_value = """
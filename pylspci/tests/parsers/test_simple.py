@@ -1,4 +1,6 @@
-from typing import List
+import pickle
+import shlex
+from typing import Iterator, List
 from unittest import TestCase
 from unittest.mock import MagicMock, call, patch
 
@@ -85,6 +87,65 @@ class TestSimpleParser(TestCase):
         self.assertIsNone(dev.revision)
         self.assertIsNone(dev.progif)
 
+    def test_parse_domain_and_bridge_paths(self) -> None:
+        dev: Device = self.parser.parse_line(
+            '0000:00:1c.3/0000:01:00.0 "PCI bridge [0604]" '
+            '"Intel Corporation [8086]" "82801 PCI Bridge [244e]" '
+            '-rd5 -p01 "Intel Corporation [8086]" "82801 PCI Bridge [244e]"'
+        )
+        self.assertEqual(str(dev.slot), '0000:00:1c.3/0000:01:00.0')
+        self.assertEqual(dev.cls.id, 0x0604)
+        self.assertEqual(dev.revision, 0xd5)
+        self.assertEqual(dev.progif, 0x01)
+
+    def test_parse_matches_argparse(self) -> None:
+        """
+        The line regex must give the same results as shlex and argparse,
+        with and without the optional revision and programming interface.
+        """
+        lines = [
+            '00:1c.3 "PCI bridge [0604]" "Intel Corporation [8086]" '
+            '"82801 PCI Bridge [244e]" -rd5 -p01 "Intel Corporation [8086]" '
+            '"82801 PCI Bridge [244e]"',
+            '00:1c.3 "PCI bridge" "Intel Corporation" "82801 PCI Bridge" '
+            '-rd5 "Intel Corporation" "82801 PCI Bridge"',
+            '00:1c.3 "0604" "8086" "244e" -p01 "" ""',
+            'cafe:13:07.2 "0604" "8086" "244e" "8086" "244e"',
+            '00:00.0 "" "" "" "" ""',
+        ]
+        for line in lines:
+            with self.subTest(line=line):
+                self.assertDictEqual(
+                    self.parser.parse_line(line).as_dict(),
+                    self.parser._parse_args(shlex.split(line)).as_dict(),
+                )
+
+    def test_parse_fallback(self) -> None:
+        """
+        Lines that do not follow the exact lspci -mm format
+        are still parsed using shlex and argparse.
+        """
+        dev: Device = self.parser.parse_line(
+            '00:1c.3 -p01 "PCI \\"bridge\\" [0604]" '
+            '"Intel Corporation [8086]" "82801 PCI Bridge [244e]" '
+            '"Intel Corporation [8086]" "82801 PCI Bridge [244e]" -rd5'
+        )
+        self.assertEqual(dev.cls.id, 0x0604)
+        self.assertEqual(dev.cls.name, 'PCI "bridge"')
+        self.assertEqual(dev.revision, 0xd5)
+        self.assertEqual(dev.progif, 0x01)
+
+    def test_pickle(self) -> None:
+        parser = SimpleParser()
+        # Build the argparse parser, which cannot be pickled
+        parser.parse_line('00:1c.3 -p01 "PCI bridge [0604]" "a" "b" "c" "d"')
+        copy = pickle.loads(pickle.dumps(parser))
+        self._check_device(copy.parse_line(
+            '00:1c.3 -p01 "PCI bridge [0604]" '
+            '"Intel Corporation [8086]" "82801 PCI Bridge [244e]" '
+            '"Intel Corporation [8086]" "82801 PCI Bridge [244e]" -rd5'
+        ))
+
     @patch('pylspci.command.lspci')
     def test_command(self, cmd_mock: MagicMock) -> None:
         cmd_mock.return_value = \
@@ -100,11 +161,29 @@ class TestSimpleParser(TestCase):
         self.assertEqual(cmd_mock.call_count, 1)
         self.assertEqual(cmd_mock.call_args, call())
 
+    @patch('pylspci.command.iter_lspci')
+    def test_iter_run(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = iter([
+            '00:1c.3 "PCI bridge [0604]" "Intel Corporation [8086]" '
+            '"82801 PCI Bridge [244e]" -rd5 -p01 "Intel Corporation [8086]" '
+            '"82801 PCI Bridge [244e]"\n',
+        ] * 2 + ['\n'])
+
+        devices: Iterator[Device] = self.parser.iter_run()
+        self._check_device(next(devices))
+        self._check_device(next(devices))
+        with self.assertRaises(StopIteration):
+            next(devices)
+
+        self.assertEqual(cmd_mock.call_count, 1)
+        self.assertEqual(cmd_mock.call_args, call())
+
     def test_verbose_error(self) -> None:
-        with self.assertRaises(ValueError) as ctx:
-            self.parser.run(verbose=True)
-        self.assertEqual(
-            ctx.exception.args[0],
-            'Verbose output is unsupported from the SimpleParser. '
-            'Please use the pylspci.parsers.VerboseParser instead.'
-        )
+        for method in (self.parser.run, self.parser.iter_run):
+            with self.assertRaises(ValueError) as ctx:
+                method(verbose=True)
+            self.assertEqual(
+                ctx.exception.args[0],
+                'Verbose output is unsupported from the SimpleParser. '
+                'Please use the pylspci.parsers.VerboseParser instead.'
+            )
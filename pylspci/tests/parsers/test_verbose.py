@@ -1,8 +1,11 @@
-from typing import List
+import pickle
+import warnings
+from typing import Iterator, List, cast
 from unittest import TestCase
 from unittest.mock import MagicMock, call, patch
 
-from pylspci.device import Device
+from pylspci.device import Device, LazyDevice
+from pylspci.fields import Slot
 from pylspci.parsers import VerboseParser
 
 SAMPLE_DEVICE: str = """
@@ -26,6 +29,7 @@ PhySlot:	4
 class TestVerboseParser(TestCase):
 
     parser: VerboseParser
+    device_type: type = Device
 
     @classmethod
     def setUpClass(cls) -> None:
@@ -33,7 +37,7 @@ class TestVerboseParser(TestCase):
         cls.parser = VerboseParser()
 
     def _check_device(self, dev: Device) -> None:
-        self.assertIsInstance(dev, Device)
+        self.assertIsInstance(dev, self.device_type)
         self.assertEqual(dev.slot.domain, 0x0000)
         self.assertEqual(dev.slot.bus, 0x00)
         self.assertEqual(dev.slot.device, 0x1c)
@@ -81,6 +85,39 @@ class TestVerboseParser(TestCase):
         self.assertEqual(cmd_mock.call_args,
                          call(verbose=True, kernel_drivers=True))
 
+    def test_iter_parse(self) -> None:
+        """
+        Each device is yielded as soon as the blank line ending it is read,
+        without reading the rest of the output.
+        """
+        read_lines: List[str] = []
+
+        def lines() -> Iterator[str]:
+            for line in '{0}\n\n{0}'.format(SAMPLE_DEVICE).splitlines(True):
+                read_lines.append(line)
+                yield line
+
+        devices: Iterator[Device] = self.parser.iter_parse(lines())
+        self._check_device(next(devices))
+        self.assertEqual(''.join(read_lines), SAMPLE_DEVICE + '\n')
+        self._check_device(next(devices))
+        with self.assertRaises(StopIteration):
+            next(devices)
+
+    @patch('pylspci.command.iter_lspci')
+    def test_command_stream(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = iter(
+            '{0}\n\n{0}'.format(SAMPLE_DEVICE).splitlines(True))
+
+        devices: List[Device] = self.parser.run(stream=True)
+        self.assertEqual(len(devices), 2)
+        self._check_device(devices[0])
+        self._check_device(devices[1])
+
+        self.assertEqual(cmd_mock.call_count, 1)
+        self.assertEqual(cmd_mock.call_args,
+                         call(verbose=True, kernel_drivers=True))
+
     def test_unknown_field(self) -> None:
         with self.assertWarns(
             UserWarning,
@@ -93,3 +130,101 @@ class TestVerboseParser(TestCase):
 
         self.assertEqual(len(devices), 1)
         self._check_device(devices[0])
+
+    def test_config_dump(self) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            devices: List[Device] = self.parser.parse(
+                SAMPLE_DEVICE
+                + '00: 86 80 4e 24 07 00 10 00 d5 01 04 06 00 00 01 00\n'
+                + '30: 00 00 00 00 50 00 00 00 00 00 00 00 ff 00 00 00\n'
+                + '50: 0d 00 00 00 86 80 4e 24\n'
+            )
+        self.assertEqual(len(devices), 1)
+        self._check_device(devices[0])
+        config = devices[0].config
+        assert config is not None
+        self.assertEqual(len(config), 0x58)
+        self.assertEqual(config.data[0x0b], 0x06)
+        self.assertEqual([c.id for c in config.capabilities], [0x0d])
+        self.assertIsNone(self.parser.parse(SAMPLE_DEVICE)[0].config)
+
+
+class TestLazyVerboseParser(TestVerboseParser):
+
+    device_type = LazyDevice
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.parser = VerboseParser(lazy=True)
+
+    def test_unknown_field(self) -> None:
+        devices = self.parser.parse(SAMPLE_DEVICE + 'NewField\tValue')
+        self.assertEqual(len(devices), 1)
+        # Fields are only read on the first access
+        with self.assertWarns(UserWarning):
+            self._check_device(devices[0])
+
+    def test_decode_on_access(self) -> None:
+        with patch.object(
+                self.parser, '_decode_field',
+                wraps=self.parser._decode_field) as decode_mock:
+            device = self.parser.parse(SAMPLE_DEVICE)[0]
+        self.assertFalse(decode_mock.called)
+        self.assertEqual(device.slot, Slot('00:1c.3'))
+        self.assertEqual(device.vendor.id, 0x8086)
+        self.assertEqual(device.vendor.name, 'Intel Corporation')
+        self.assertEqual(
+            decode_mock.call_args_list,
+            [call('slot', '00:1c.3'),
+             call('vendor', 'Intel Corporation [8086]')],
+        )
+
+    def test_device_api(self) -> None:
+        device = self.parser.parse(SAMPLE_DEVICE)[0]
+        eager = VerboseParser().parse(SAMPLE_DEVICE)[0]
+        self.assertEqual(device, eager)
+        self.assertEqual(eager, device)
+        self.assertFalse(device != eager)
+        self.assertEqual(device, self.parser.parse(SAMPLE_DEVICE)[0])
+        self.assertNotEqual(device, eager._replace(driver=None))
+        self.assertNotEqual(device, 'device')
+        self.assertLessEqual(device, eager)
+        with self.assertRaises(TypeError):  # Slots cannot be ordered
+            device < eager._replace(slot=Slot('00:1c.4'))
+
+        self.assertEqual(device.as_dict(), eager.as_dict())
+        self.assertEqual(device._asdict(), eager._asdict())
+        self.assertEqual(repr(device), 'Lazy' + repr(eager))
+        with self.assertRaises(TypeError):  # Lists are not hashable
+            hash(device)
+
+        replaced = device._replace(driver='vfio-pci')
+        self.assertIs(type(replaced), Device)
+        self.assertEqual(replaced, eager._replace(driver='vfio-pci'))
+
+        # Lazy devices are not tuples; regular devices are used instead
+        lazy = cast(LazyDevice, device)
+        self.assertNotIsInstance(lazy, tuple)
+        with self.assertRaises(TypeError):
+            len(lazy)  # type: ignore
+        with self.assertRaises(TypeError):
+            lazy + ()  # type: ignore
+        regular = lazy.as_device()
+        self.assertIs(type(regular), Device)
+        self.assertIs(lazy.as_device(), regular)
+        self.assertEqual(regular, eager)
+        self.assertEqual(tuple(regular), tuple(eager))
+        self.assertEqual(regular + (), tuple(eager))
+
+        unpickled = pickle.loads(pickle.dumps(device))
+        self.assertIs(type(unpickled), Device)
+        self.assertEqual(unpickled, eager)
+
+    def test_missing_fields(self) -> None:
+        device = self.parser.parse('Class:\tPCI bridge [0604]')[0]
+        self.assertIsNone(device.driver)
+        self.assertEqual(device.kernel_modules, [])
+        with self.assertRaisesRegex(TypeError, "'slot'"):
+            device.slot
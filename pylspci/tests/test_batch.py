@@ -0,0 +1,140 @@
+import io
+import json
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Iterator, List
+from unittest import TestCase
+from unittest.mock import patch
+
+from pylspci.batch import (
+    PENDING_CHUNKS_PER_WORKER, find_files, iter_parse_many, main, parse_many
+)
+from pylspci.device import Device
+from pylspci.parsers import SimpleParser
+
+VERBOSE_OUTPUT: str = """
+Slot:	00:1c.{function}
+Class:	PCI bridge [0604]
+Vendor:	Intel Corporation [8086]
+Device:	82801 PCI Bridge [244e]
+Driver:	pcieport
+"""
+
+SIMPLE_OUTPUT: str = \
+    '00:1c.{function} "PCI bridge [0604]" "Intel Corporation [8086]" ' \
+    '"82801 PCI Bridge [244e]" "" ""'
+
+
+class TestParseMany(TestCase):
+
+    def setUp(self) -> None:
+        self.sources = [
+            VERBOSE_OUTPUT.format(function=i % 8) * (i % 3)
+            for i in range(20)
+        ]
+
+    def _check(self, results: List[List[Device]]) -> None:
+        self.assertEqual(len(results), 20)
+        for i, devices in enumerate(results):
+            self.assertEqual(len(devices), i % 3)
+            for device in devices:
+                self.assertEqual(device.slot.function, i % 8)
+                self.assertEqual(device.vendor.id, 0x8086)
+                self.assertEqual(device.driver, 'pcieport')
+
+    def test_in_process(self) -> None:
+        self._check(parse_many(texts=self.sources, workers=1, chunksize=3))
+
+    def test_workers(self) -> None:
+        self._check(parse_many(texts=self.sources, workers=2, chunksize=3))
+
+    def test_parser(self) -> None:
+        results = parse_many(
+            texts=[SIMPLE_OUTPUT.format(function=i) for i in range(4)],
+            parser=SimpleParser(),
+            workers=2,
+            chunksize=1,
+        )
+        self.assertListEqual(
+            [devices[0].slot.function for devices in results],
+            [0, 1, 2, 3],
+        )
+
+    def test_iter(self) -> None:
+        self._check(list(iter_parse_many(texts=self.sources, chunksize=4)))
+
+    def test_bounded(self) -> None:
+        consumed: List[int] = []
+
+        def sources() -> Iterator[str]:
+            for i, source in enumerate(self.sources * 10):
+                consumed.append(i)
+                yield source
+
+        results = iter_parse_many(texts=sources(), workers=2, chunksize=1)
+        next(results)
+        # Only a few chunks are read ahead of the consumed results
+        self.assertEqual(len(consumed), 2 * PENDING_CHUNKS_PER_WORKER + 1)
+        self.assertEqual(len(list(results)), 199)
+        self.assertEqual(len(consumed), 200)
+
+    def test_empty(self) -> None:
+        self.assertListEqual(parse_many([], workers=2), [])
+        self.assertListEqual(parse_many(texts=[], workers=2), [])
+
+    def test_paths_or_texts(self) -> None:
+        with self.assertRaisesRegex(AssertionError, 'Either paths or texts'):
+            parse_many()
+        with self.assertRaisesRegex(AssertionError, 'Either paths or texts'):
+            parse_many([], texts=[])
+
+    def test_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for i, source in enumerate(self.sources):
+                path = Path(directory) / '{:02d}.txt'.format(i)
+                path.write_text(source)
+                paths.append(path)
+            self._check(parse_many(paths, workers=2, chunksize=3))
+            # Strings are paths, not outputs
+            self._check(parse_many(map(str, paths), workers=1, chunksize=3))
+
+
+class TestBatchCLI(TestCase):
+
+    def test_find_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            (root / 'b').write_text('')
+            (root / 'a').write_text('')
+            (root / 'sub').mkdir()
+            (root / 'sub' / 'c').write_text('')
+            self.assertListEqual(
+                find_files([root, root / 'sub' / 'c']),
+                [root / 'a', root / 'b', root / 'sub' / 'c'],
+            )
+
+    def test_main_empty(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            out = io.StringIO()
+            with patch('sys.argv', ['pylspci-batch', directory]), \
+                    redirect_stdout(out):
+                main()
+            self.assertEqual(json.loads(out.getvalue()), {})
+
+    def test_main(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            (root / 'a').write_text(SIMPLE_OUTPUT.format(function=1))
+            (root / 'b').write_text(SIMPLE_OUTPUT.format(function=2))
+            out = io.StringIO()
+            with patch('sys.argv', [
+                        'pylspci-batch', '--simple', '-w', '1', directory]), \
+                    redirect_stdout(out):
+                main()
+            result = json.loads(out.getvalue())
+            self.assertListEqual(
+                sorted(result.keys()), [str(root / 'a'), str(root / 'b')])
+            self.assertEqual(result[str(root / 'b')][0]['slot']['function'],
+                             2)
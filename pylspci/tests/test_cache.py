@@ -0,0 +1,132 @@
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from typing import List
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from pylspci.cache import LspciCache, SysfsInvalidator
+
+
+class FakeClock(object):
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLspciCache(TestCase):
+
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = LspciCache(ttl=10, maxsize=2, clock=self.clock)
+        self.call = MagicMock(side_effect=['first', 'second', 'third'])
+
+    def test_hit(self) -> None:
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'first')
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'first')
+        self.assertEqual(self.cache.get(('lspci', ), self.call), 'first')
+        self.assertEqual(self.call.call_count, 1)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(len(self.cache), 1)
+
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_ttl(self) -> None:
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'first')
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'first')
+        self.clock.now = 10
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'second')
+        self.clock.now = 15
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'second')
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_lru(self) -> None:
+        self.cache.get(['lspci', '-a'], self.call)
+        self.cache.get(['lspci', '-b'], self.call)
+        # Use -a again so that -b becomes the least recently used
+        self.cache.get(['lspci', '-a'], self.call)
+        self.cache.get(['lspci', '-c'], self.call)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get(['lspci', '-a'], self.call), 'first')
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_invalidate(self) -> None:
+        self.cache.get(['lspci', '-a'], self.call)
+        self.cache.get(['lspci', '-b'], self.call)
+        self.cache.invalidate(['lspci', '-a'])
+        self.cache.invalidate(['lspci', '-c'])
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.get(['lspci', '-a'], self.call), 'third')
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidator(self) -> None:
+        invalidator = MagicMock(return_value=False)
+        self.cache.add_invalidator(invalidator)
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'first')
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'first')
+        invalidator.return_value = True
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'second')
+        self.assertEqual(invalidator.call_count, 3)
+
+        self.cache.remove_invalidator(invalidator)
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'second')
+        self.assertEqual(invalidator.call_count, 3)
+        with self.assertRaises(ValueError):
+            self.cache.remove_invalidator(invalidator)
+
+    def test_error(self) -> None:
+        """
+        Errors are not cached.
+        """
+        self.call.side_effect = [OSError, 'first']
+        with self.assertRaises(OSError):
+            self.cache.get(['lspci'], self.call)
+        self.assertEqual(self.cache.get(['lspci'], self.call), 'first')
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_threads(self) -> None:
+        cache = LspciCache(ttl=60)
+        results: List[str] = []
+
+        def run() -> None:
+            for _ in range(100):
+                results.append(cache.get(['lspci'], lambda: 'output'))
+
+        threads = [Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['output'] * 800)
+        self.assertEqual(cache.hits + cache.misses, 800)
+
+
+class TestSysfsInvalidator(TestCase):
+
+    def test_hotplug(self) -> None:
+        with TemporaryDirectory() as tempdir:
+            devices_path = Path(tempdir) / 'bus' / 'pci' / 'devices'
+            devices_path.mkdir(parents=True)
+            (devices_path / '0000:00:00.0').touch()
+
+            invalidator = SysfsInvalidator(tempdir)
+            self.assertFalse(invalidator())
+            (devices_path / '0000:00:01.0').touch()
+            self.assertTrue(invalidator())
+            self.assertFalse(invalidator())
+            os.unlink(str(devices_path / '0000:00:00.0'))
+            self.assertTrue(invalidator())
+
+    def test_no_sysfs(self) -> None:
+        with TemporaryDirectory() as tempdir:
+            invalidator = SysfsInvalidator(tempdir)
+            self.assertFalse(invalidator())
@@ -0,0 +1,156 @@
+import pickle
+import struct
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pylspci.capabilities import (
+    Acs, AcsFlags, Capability, ConfigSpace, Msi, MsiX, PciExpress, SrIov
+)
+
+
+def make_config() -> bytearray:
+    """
+    Build the configuration space of a network card with MSI, MSI-X,
+    PCI Express, SR-IOV and ACS capabilities.
+    """
+    config = bytearray(4096)
+    struct.pack_into('<HHHH', config, 0, 0x15b3, 0x1017, 0x0406, 0x0010)
+    config[0x0b] = 0x02
+    config[0x34] = 0x60
+    # PCI Express: endpoint, 8 GT/s x16, running at 8 GT/s x8
+    struct.pack_into('<BBH', config, 0x60, 0x10, 0x9c, 0x0002)
+    struct.pack_into('<I', config, 0x6c, 0x0103)
+    struct.pack_into('<H', config, 0x72, 0x0083)
+    # MSI-X: 64 vectors, enabled, table in BAR 0 at 0x2000, PBA in BAR 0
+    struct.pack_into('<BBHII', config, 0x9c, 0x11, 0xc0, 0x803f,
+                     0x2000, 0x3000)
+    # MSI: 64-bit, 8 vectors, disabled
+    struct.pack_into('<BBH', config, 0xc0, 0x05, 0x00, 0x0086)
+    # SR-IOV, then ACS
+    struct.pack_into('<I', config, 0x100, 0x0010 | 1 << 16 | 0x180 << 20)
+    struct.pack_into('<HHHHHxxHHxxH', config, 0x108,
+                     0x0001, 0, 8, 8, 4, 2, 1, 0x1018)
+    struct.pack_into('<IHH', config, 0x180, 0x000d | 1 << 16, 0x005f, 0x001d)
+    return config
+
+
+class TestConfigSpace(TestCase):
+
+    def test_capabilities(self) -> None:
+        config = ConfigSpace(make_config())
+        self.assertListEqual(config.capabilities, [
+            Capability(id=0x10, offset=0x60),
+            Capability(id=0x11, offset=0x9c),
+            Capability(id=0x05, offset=0xc0),
+            Capability(id=0x10, offset=0x100, extended=True, version=1),
+            Capability(id=0x0d, offset=0x180, extended=True, version=1),
+        ])
+        self.assertEqual(config.find(0x10), config.capabilities[0])
+        self.assertEqual(config.find(0x10, extended=True),
+                         config.capabilities[3])
+        self.assertIsNone(config.find(0x01))
+
+    def test_decoded(self) -> None:
+        config = ConfigSpace(make_config())
+        self.assertEqual(config.pci_express, PciExpress(
+            offset=0x60,
+            version=2,
+            port_type=0,
+            max_link_speed=8.0,
+            max_link_width=16,
+            link_speed=8.0,
+            link_width=8,
+        ))
+        self.assertEqual(config.msix, MsiX(
+            offset=0x9c,
+            enabled=True,
+            masked=False,
+            table_size=64,
+            table_bar=0,
+            table_offset=0x2000,
+            pba_bar=0,
+            pba_offset=0x3000,
+        ))
+        self.assertEqual(config.msi, Msi(
+            offset=0xc0,
+            enabled=False,
+            vectors=8,
+            enabled_vectors=1,
+            is_64bit=True,
+            per_vector_masking=False,
+        ))
+        self.assertEqual(config.sriov, SrIov(
+            offset=0x100,
+            enabled=True,
+            initial_vfs=8,
+            total_vfs=8,
+            num_vfs=4,
+            vf_offset=2,
+            vf_stride=1,
+            vf_device=0x1018,
+        ))
+        acs = config.acs
+        assert acs is not None
+        self.assertEqual(acs, Acs(
+            offset=0x180,
+            capabilities=AcsFlags(0x5f),
+            control=AcsFlags(0x1d),
+        ))
+        self.assertIn(AcsFlags.RequestRedirect, acs.control)
+        self.assertNotIn(AcsFlags.TranslationBlocking, acs.control)
+
+    def test_header_only(self) -> None:
+        # lspci -x only dumps the first 64 bytes
+        config = ConfigSpace(make_config()[:64])
+        self.assertListEqual(config.capabilities, [])
+        self.assertIsNone(config.pci_express)
+        self.assertIsNone(config.sriov)
+
+    def test_standard_only(self) -> None:
+        # lspci -xxx only dumps the first 256 bytes
+        config = ConfigSpace(make_config()[:256])
+        self.assertEqual(len(config.capabilities), 3)
+        self.assertIsNotNone(config.msix)
+        self.assertIsNone(config.acs)
+
+    def test_no_capabilities(self) -> None:
+        data = make_config()
+        data[0x06] = 0
+        # Extended capabilities do not depend on the status register
+        self.assertListEqual(
+            [c.extended for c in ConfigSpace(data).capabilities],
+            [True, True],
+        )
+
+    def test_loops(self) -> None:
+        data = make_config()
+        data[0xc1] = 0x60
+        struct.pack_into('<I', data, 0x180, 0x000d | 0x100 << 20)
+        self.assertEqual(len(ConfigSpace(data).capabilities), 5)
+
+    def test_from_file(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'config'
+            config = ConfigSpace.from_file(path)
+            self.assertIn('from', repr(config))
+            path.write_bytes(bytes(make_config()))
+            self.assertEqual(len(config), 4096)
+            self.assertEqual(repr(config), '<ConfigSpace of 4096 bytes>')
+            self.assertEqual(config, ConfigSpace(make_config()))
+            self.assertIsNotNone(config.sriov)
+            # The file is only read once
+            path.write_bytes(b'')
+            self.assertEqual(len(config), 4096)
+
+    def test_from_file_missing(self) -> None:
+        config = ConfigSpace.from_file('/nonexistent')
+        self.assertEqual(len(config), 0)
+        self.assertListEqual(config.capabilities, [])
+
+    def test_pickle(self) -> None:
+        config = ConfigSpace(make_config())
+        copy = pickle.loads(pickle.dumps(config))
+        self.assertEqual(copy, config)
+        self.assertEqual(hash(copy), hash(config))
+        self.assertEqual(copy.sriov, config.sriov)
@@ -58,3 +58,32 @@ class TestDevice(TestCase):
             'iommu_group': 1,
             'physical_slot': '4-2',
         })
+
+    def test_from_dict(self) -> None:
+        d = Device(
+            slot=Slot('0000:00:01.0/cafe:13:07.2'),
+            cls=NameWithID('Something [caf3]'),
+            vendor=NameWithID('Something [caf3]'),
+            device=NameWithID('caf3'),
+            subsystem_vendor=NameWithID('Something'),
+            revision=20,
+            driver='self_driving',
+            kernel_modules=['snd-pcsp'],
+            numa_node=0,
+        )
+        self.assertEqual(Device.from_dict(d.as_dict()), d)
+
+    def test_from_dict_defaults(self) -> None:
+        self.assertEqual(Device.from_dict({
+            'slot': {'domain': 0, 'bus': 0x13, 'device': 7, 'function': 2},
+            'cls': {'id': 0xcaf3},
+            'vendor': {'name': 'Something'},
+            'device': {'id': 0xcaf3, 'name': 'Something'},
+        }), Device(
+            slot=Slot('13:07.2'),
+            cls=NameWithID('caf3'),
+            vendor=NameWithID('Something'),
+            device=NameWithID('Something [caf3]'),
+        ))
+        with self.assertRaises(KeyError):
+            Device.from_dict({})
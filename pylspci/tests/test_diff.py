@@ -0,0 +1,214 @@
+import io
+import json
+from contextlib import redirect_stdout
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+from unittest import TestCase
+from unittest.mock import patch
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pylspci.device import Device
+from pylspci.diff import FieldChange, diff, fingerprint, load_snapshot, main
+from pylspci.fields import NameWithID, Slot
+from pylspci.parsers import VerboseParser
+from pylspci.tests.test_filters import devices
+
+VERBOSE_OUTPUT = 'Slot:\t00:01.0\nClass:\tEthernet controller [0200]\n' \
+    'Vendor:\tIntel Corporation [8086]\nDevice:\tI350 [1521]\n' \
+    'Driver:\tigb\n\n'
+
+
+def make_device(slot: str, **kwargs: Any) -> Device:
+    return Device(
+        slot=Slot(slot),
+        cls=NameWithID('Ethernet controller [0200]'),
+        vendor=NameWithID('Intel Corporation [8086]'),
+        device=NameWithID('I350 Gigabit Network Connection [1521]'),
+        **kwargs  # type: ignore
+    )
+
+
+class TestDiff(TestCase):
+
+    def setUp(self) -> None:
+        self.old = [
+            make_device('00:01.0', driver='igb', numa_node=0),
+            make_device('00:02.0', kernel_modules=['igb']),
+            make_device('00:03.0', iommu_group=3),
+        ]
+
+    def test_same(self) -> None:
+        result = diff(self.old, list(self.old))
+        self.assertTrue(result.empty)
+        self.assertEqual(
+            result.as_dict(), {'added': [], 'removed': [], 'changed': []})
+
+    def test_changes(self) -> None:
+        new = [
+            make_device('00:03.0', iommu_group=4),
+            make_device('00:01.0', driver='vfio-pci', numa_node=1),
+            make_device('00:04.0'),
+        ]
+        result = diff(self.old, new)
+        self.assertFalse(result.empty)
+        self.assertListEqual(result.added, [new[2]])
+        self.assertListEqual(result.removed, [self.old[1]])
+        self.assertListEqual(
+            [change.slot for change in result.changed],
+            [Slot('00:03.0'), Slot('00:01.0')],
+        )
+        self.assertListEqual(result.changed[0].changes, [
+            FieldChange('iommu_group', 3, 4),
+        ])
+        self.assertListEqual(result.changed[1].changes, [
+            FieldChange('driver', 'igb', 'vfio-pci'),
+            FieldChange('numa_node', 0, 1),
+        ])
+        self.assertIs(result.changed[1].old, self.old[0])
+        self.assertIs(result.changed[1].new, new[1])
+        self.assertDictEqual(result.changed[1].as_dict(), {
+            'slot': '0000:00:01.0',
+            'changes': [
+                {'field': 'driver', 'old': 'igb', 'new': 'vfio-pci'},
+                {'field': 'numa_node', 'old': 0, 'new': 1},
+            ],
+        })
+
+    def test_kernel_modules(self) -> None:
+        result = diff(self.old, [make_device('00:02.0', kernel_modules=[])])
+        self.assertListEqual(result.changed[0].changes, [
+            FieldChange('kernel_modules', ['igb'], []),
+        ])
+
+    def test_names(self) -> None:
+        new = [self.old[0]._replace(vendor=NameWithID('8086'))]
+        change = diff(self.old[:1], new).changed[0].changes[0]
+        self.assertEqual(change.field, 'vendor')
+        self.assertEqual(change.as_dict()['new'], {'id': 0x8086, 'name': None})
+
+    def test_fields(self) -> None:
+        new = [make_device('00:01.0', driver='igb', numa_node=1)]
+        self.assertTrue(diff(self.old[:1], new, fields=['driver']).empty)
+        with self.assertRaisesRegex(ValueError, 'nope'):
+            diff(self.old, new, fields=['driver', 'nope'])
+
+    def test_hash_collision(self) -> None:
+        # hash(-1) == hash(-2) in CPython
+        old = [make_device('00:01.0', numa_node=-1)]
+        new = [make_device('00:01.0', numa_node=-2)]
+        self.assertEqual(fingerprint(old[0]), fingerprint(new[0]))
+        self.assertListEqual(diff(old, new).changed[0].changes, [
+            FieldChange('numa_node', -1, -2),
+        ])
+
+    def test_lazy_devices(self) -> None:
+        old = VerboseParser(lazy=True).parse(VERBOSE_OUTPUT)
+        new = VerboseParser().parse(VERBOSE_OUTPUT.replace('igb', 'vfio-pci'))
+        self.assertTrue(diff(old, VerboseParser().parse(VERBOSE_OUTPUT)).empty)
+        self.assertListEqual(diff(old, new).changed[0].changes, [
+            FieldChange('driver', 'igb', 'vfio-pci'),
+        ])
+        self.assertEqual(fingerprint(old[0], ['driver']),
+                         fingerprint(old[0]._replace(), ['driver']))
+
+    def test_fingerprint(self) -> None:
+        self.assertEqual(
+            fingerprint(self.old[1]),
+            fingerprint(make_device('00:05.0', kernel_modules=['igb'])),
+        )
+        self.assertNotEqual(fingerprint(self.old[0]), fingerprint(self.old[1]))
+
+    @given(st.lists(devices), st.lists(devices))
+    def test_matches_naive(self, old: Any, new: Any) -> None:
+        old = list({device.slot: device for device in old}.values())
+        new = list({device.slot: device for device in new}.values())
+        result = diff(old, new)
+        old_slots = {device.slot: device for device in old}
+        new_slots = {device.slot: device for device in new}
+        self.assertListEqual(
+            result.added, [d for d in new if d.slot not in old_slots])
+        self.assertListEqual(
+            result.removed, [d for d in old if d.slot not in new_slots])
+        self.assertListEqual(
+            [(change.old, change.new) for change in result.changed],
+            [
+                (old_slots[d.slot], d) for d in new
+                if d.slot in old_slots and d != old_slots[d.slot]
+            ],
+        )
+
+
+class TestDiffCLI(TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.old = [
+            make_device('00:01.0', driver='igb', numa_node=0),
+            Device(
+                slot=Slot('00:1c.0/01:00.0'),
+                cls=NameWithID('0108'),
+                vendor=NameWithID('144d'),
+                device=NameWithID('a808'),
+                subsystem_vendor=NameWithID('144d'),
+                subsystem_device=NameWithID('a801'),
+                revision=0, progif=2,
+                kernel_modules=['nvme'],
+            ),
+        ]
+        self.write('old.json', self.old)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def write(self, name: str, devices: Any) -> str:
+        path = self.root / name
+        path.write_text(json.dumps([device.as_dict() for device in devices]))
+        return str(path)
+
+    def run_main(self, *args: str) -> Any:
+        out = io.StringIO()
+        with patch('sys.argv', ['pylspci-diff', *args]), \
+                redirect_stdout(out), \
+                self.assertRaises(SystemExit) as ctx:
+            main()
+        return ctx.exception.code, json.loads(out.getvalue())
+
+    def test_load_snapshot(self) -> None:
+        self.assertListEqual(
+            load_snapshot(str(self.root / 'old.json')), self.old)
+
+    def test_invalid_snapshot(self) -> None:
+        (self.root / 'bad.json').write_text('{}')
+        with self.assertRaisesRegex(ValueError, 'list'):
+            load_snapshot(str(self.root / 'bad.json'))
+        (self.root / 'bad.json').write_text('[{}]')
+        with self.assertRaisesRegex(ValueError, 'Invalid device'):
+            load_snapshot(str(self.root / 'bad.json'))
+
+    def test_same(self) -> None:
+        code, output = self.run_main(
+            str(self.root / 'old.json'), self.write('new.json', self.old))
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            output, {'added': [], 'removed': [], 'changed': []})
+
+    def test_changed(self) -> None:
+        new = self.write('new.json', [
+            self.old[0]._replace(driver='vfio-pci', numa_node=1),
+        ])
+        code, output = self.run_main(str(self.root / 'old.json'), new)
+        self.assertEqual(code, 1)
+        self.assertEqual(output['removed'], [self.old[1].as_dict()])
+        self.assertEqual(
+            [c['field'] for c in output['changed'][0]['changes']],
+            ['driver', 'numa_node'],
+        )
+
+        code, output = self.run_main(
+            '-I', 'numa_node', '--ignore', 'driver',
+            str(self.root / 'old.json'), new)
+        self.assertEqual(output['changed'], [])
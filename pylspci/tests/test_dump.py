@@ -0,0 +1,163 @@
+import struct
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pylspci.dump import DumpReader, decode_header, read_devices
+from pylspci.fields import NameWithID, Slot
+
+HOST_BRIDGE: str = """
+00:00.0 Host bridge: Intel Corporation Device 5904 (rev 02)
+00: 86 80 04 59 06 00 90 20 02 00 00 06 00 00 00 00
+10: 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00
+20: 00 00 00 00 00 00 00 00 00 00 00 00 aa 17 4f 22
+30: 00 00 00 00 e0 00 00 00 00 00 00 00 00 00 00 00
+"""
+
+
+def make_config(size: int = 256) -> bytearray:
+    """
+    Build the configuration space of a PCI bridge with a Bridge Subsystem
+    Vendor ID capability, found after a PCI Express capability.
+    """
+    config = bytearray(size)
+    struct.pack_into('<HHHHBBBB', config, 0,
+                     0x8086, 0x9d10, 0x0407, 0x0010, 0xf1, 0x00, 0x04, 0x06)
+    config[0x0e] = 0x81
+    config[0x34] = 0x40
+    config[0x40:0x42] = b'\x10\x80'
+    if size > 0x80:
+        struct.pack_into('<BBHHH', config, 0x80,
+                         0x0d, 0x00, 0, 0x17aa, 0x224f)
+    return config
+
+
+def format_dump(header: str, config: bytearray) -> str:
+    """
+    Format a device in the same way as lspci -x.
+    """
+    lines = [header]
+    for offset in range(0, len(config), 16):
+        lines.append('{:02x}: {}'.format(offset, ' '.join(
+            '{:02x}'.format(value) for value in config[offset:offset + 16])))
+    return '\n'.join(lines) + '\n\n'
+
+
+class TestDecodeHeader(TestCase):
+
+    def test_normal(self) -> None:
+        config = bytearray(64)
+        struct.pack_into('<HH4xBBH', config, 0, 0x8086, 0x244e, 0xd5, 0x01,
+                         0x0604)
+        struct.pack_into('<HH', config, 0x2c, 0x1028, 0x04b2)
+        dev = decode_header(Slot('00:1c.3'), memoryview(config))
+        self.assertEqual(dev.slot, Slot('00:1c.3'))
+        self.assertEqual(dev.cls, NameWithID('0604'))
+        self.assertEqual(dev.vendor, NameWithID('8086'))
+        self.assertEqual(dev.device, NameWithID('244e'))
+        self.assertEqual(dev.subsystem_vendor, NameWithID('1028'))
+        self.assertEqual(dev.subsystem_device, NameWithID('04b2'))
+        self.assertEqual(dev.revision, 0xd5)
+        self.assertEqual(dev.progif, 0x01)
+        self.assertIsNone(dev.driver)
+        self.assertListEqual(dev.kernel_modules, [])
+
+    def test_no_subsystem(self) -> None:
+        config = bytearray(64)
+        struct.pack_into('<HH', config, 0, 0x8086, 0x244e)
+        struct.pack_into('<HH', config, 0x2c, 0xffff, 0xffff)
+        dev = decode_header(Slot('00:1c.3'), memoryview(config))
+        self.assertIsNone(dev.subsystem_vendor)
+        self.assertIsNone(dev.subsystem_device)
+        self.assertIsNone(dev.revision)
+        self.assertIsNone(dev.progif)
+
+    def test_bridge_capability(self) -> None:
+        dev = decode_header(Slot('00:1c.0'), memoryview(make_config()))
+        self.assertEqual(dev.cls, NameWithID('0604'))
+        self.assertEqual(dev.revision, 0xf1)
+        self.assertEqual(dev.subsystem_vendor, NameWithID('17aa'))
+        self.assertEqual(dev.subsystem_device, NameWithID('224f'))
+
+    def test_bridge_short(self) -> None:
+        # lspci -x only dumps the header, without the capabilities
+        dev = decode_header(Slot('00:1c.0'), memoryview(make_config(64)))
+        self.assertIsNone(dev.subsystem_vendor)
+
+    def test_capability_loop(self) -> None:
+        config = make_config(128)
+        config[0x41] = 0x40
+        dev = decode_header(Slot('00:1c.0'), memoryview(config))
+        self.assertIsNone(dev.subsystem_vendor)
+
+    def test_too_short(self) -> None:
+        with self.assertRaisesRegex(ValueError, 'too short'):
+            decode_header(Slot('00:1c.3'), memoryview(bytes(16)))
+
+
+class TestDumpReader(TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / 'dump.txt'
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_read_devices(self) -> None:
+        self.path.write_text(
+            HOST_BRIDGE + '\n'
+            + format_dump('0000:00:1c.0 PCI bridge: Intel Corporation',
+                          make_config(256))
+        )
+        devices = DumpReader(self.path).read_devices()
+        self.assertEqual(len(devices), 2)
+        self.assertEqual(devices[0].slot, Slot('00:00.0'))
+        self.assertEqual(devices[0].cls, NameWithID('0600'))
+        self.assertEqual(devices[0].device, NameWithID('5904'))
+        self.assertEqual(devices[0].subsystem_vendor, NameWithID('17aa'))
+        self.assertEqual(devices[0].revision, 0x02)
+        self.assertEqual(devices[1].slot, Slot('0000:00:1c.0'))
+        self.assertEqual(devices[1].subsystem_device, NameWithID('224f'))
+        config = devices[1].config
+        assert config is not None
+        self.assertEqual(len(config), 256)
+        self.assertEqual([c.id for c in config.capabilities], [0x10, 0x0d])
+        self.assertListEqual(read_devices(str(self.path)), devices)
+
+    def test_configs(self) -> None:
+        self.path.write_text(
+            format_dump('00:1c.0', make_config(4096)) + HOST_BRIDGE)
+        configs = list(DumpReader(self.path).iter_configs())
+        self.assertListEqual(
+            [slot for slot, _ in configs], [Slot('00:1c.0'), Slot('00:00.0')])
+        self.assertEqual(bytes(configs[0][1]), bytes(make_config(4096)))
+        self.assertEqual(len(configs[1][1]), 64)
+
+    def test_ignored_lines(self) -> None:
+        # lspci -F ignores anything that is not a slot or hexadecimal data,
+        # such as the verbose output from lspci -vx.
+        self.path.write_text(
+            '01: ff ff ff ff\n'
+            + HOST_BRIDGE.replace(
+                '\n00: ',
+                '\n\tSubsystem: Lenovo Device 224f\n'
+                '\tFlags: bus master, fast devsel, latency 0\r\n00: ',
+            )
+        )
+        devices = read_devices(self.path)
+        self.assertEqual(len(devices), 1)
+        self.assertEqual(devices[0].vendor, NameWithID('8086'))
+
+    def test_sparse(self) -> None:
+        self.path.write_text(
+            HOST_BRIDGE.replace('\n30: ', '\nf0: ') + '100: 01 02\n')
+        config = next(DumpReader(self.path).iter_configs())[1]
+        self.assertEqual(len(config), 0x102)
+        self.assertEqual(bytes(config[0x30:0x40]), bytes(16))
+        self.assertEqual(config[0xf4], 0xe0)
+        self.assertEqual(config[0x101], 0x02)
+
+    def test_empty(self) -> None:
+        self.path.write_text('')
+        self.assertListEqual(read_devices(self.path), [])
@@ -1,3 +1,4 @@
+import pickle
 from unittest import TestCase
 
 from pylspci.fields import NameWithID, PCIAccessParameter, Slot
@@ -83,6 +84,58 @@ class TestSlot(TestCase):
             "parent": None,
         })
 
+    def test_from_dict(self) -> None:
+        s = Slot('cafe:13:07.2/14:00.0')
+        self.assertEqual(Slot.from_dict(s.as_dict()), s)
+        self.assertEqual(Slot.from_dict({
+            "domain": 0xcafe,
+            "bus": 0x13,
+            "device": 0x07,
+            "function": 0x2,
+        }), Slot('cafe:13:07.2'))
+        # Parents are shared between slots behind the same bridge
+        other = Slot.from_dict(Slot('cafe:13:07.2/14:00.1').as_dict())
+        self.assertIs(Slot.from_dict(s.as_dict()).parent, other.parent)
+
+    def test_from_dict_invalid(self) -> None:
+        data = Slot('13:07.2').as_dict()
+        data['device'] = 0x20
+        with self.assertRaises(ValueError):
+            Slot.from_dict(data)
+        del data['bus']
+        with self.assertRaises(KeyError):
+            Slot.from_dict(data)
+
+    def test_interned(self) -> None:
+        self.assertIs(Slot('cafe:13:07.2'), Slot('cafe:13:07.2'))
+        s = Slot('cafe:13:07.2/14:00.0')
+        self.assertIs(s.parent, Slot('cafe:13:07.2'))
+
+    def test_equal(self) -> None:
+        self.assertEqual(Slot('13:07.2'), Slot('0000:13:07.2'))
+        self.assertEqual(
+            hash(Slot('13:07.2')),
+            hash(Slot('0000:13:07.2')),
+        )
+        self.assertNotEqual(Slot('13:07.2'), Slot('13:07.3'))
+        self.assertNotEqual(Slot('13:07.2'), Slot('12:00.0/13:07.2'))
+        self.assertNotEqual(Slot('13:07.2'), '0000:13:07.2')
+        self.assertEqual(len({Slot('13:07.2'), Slot('0000:13:07.2')}), 1)
+
+    def test_immutable(self) -> None:
+        s = Slot('cafe:13:07.2')
+        with self.assertRaises(AttributeError):
+            s.bus = 0x42  # type: ignore
+        with self.assertRaises(AttributeError):
+            del s.bus
+        with self.assertRaises(AttributeError):
+            s.something = 'else'  # type: ignore
+        self.assertEqual(s.bus, 0x13)
+
+    def test_pickle(self) -> None:
+        s = Slot('abcd:13:07.2/66:06.6')
+        self.assertEqual(pickle.loads(pickle.dumps(s)), s)
+
 
 class TestNameWithID(TestCase):
 
@@ -145,6 +198,49 @@ class TestNameWithID(TestCase):
             "name": "Something",
         })
 
+    def test_from_dict(self) -> None:
+        for value in ('Something [caf3]', 'caf3', 'Something', None):
+            n = NameWithID(value)
+            self.assertEqual(NameWithID.from_dict(n.as_dict()), n)
+        self.assertEqual(NameWithID.from_dict({}), NameWithID(None))
+        self.assertIs(
+            NameWithID.from_dict({"id": 0xcaf3, "name": "Something"}),
+            NameWithID.from_dict({"id": 0xcaf3, "name": "Something"}),
+        )
+
+    def test_interned(self) -> None:
+        self.assertIs(
+            NameWithID('Something [caf3]'),
+            NameWithID('Something [caf3]'),
+        )
+        self.assertIs(NameWithID(None), NameWithID(None))
+
+    def test_equal(self) -> None:
+        self.assertEqual(
+            NameWithID('Something [caf3]'),
+            NameWithID('Something [CAF3]'),
+        )
+        self.assertEqual(
+            hash(NameWithID('Something [caf3]')),
+            hash(NameWithID('Something [CAF3]')),
+        )
+        self.assertNotEqual(NameWithID('Something [caf3]'), NameWithID('caf3'))
+        self.assertNotEqual(NameWithID('Something'), 'Something')
+
+    def test_immutable(self) -> None:
+        n = NameWithID('Something [caf3]')
+        with self.assertRaises(AttributeError):
+            n.name = 'Else'  # type: ignore
+        with self.assertRaises(AttributeError):
+            del n.id
+        self.assertEqual(n.name, 'Something')
+
+    def test_pickle(self) -> None:
+        for value in ('Something [caf3]', 'caf3', '0000', None):
+            with self.subTest(value=value):
+                n = NameWithID(value)
+                self.assertEqual(pickle.loads(pickle.dumps(n)), n)
+
 
 class TestPCIAccessParameter(TestCase):
 
@@ -1,6 +1,131 @@
+from typing import List
 from unittest import TestCase
 
-from pylspci.filters import DeviceFilter, SlotFilter
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
+
+
+def _oracle_field(value: str) -> int:
+    """
+    Parse a single filter field as pciutils does: empty or ``*``
+    means any value, represented as -1.
+    """
+    if not value or value == '*':
+        return -1
+    return int(value, 16)
+
+
+def oracle_slot_match(value: str, device: Device) -> bool:
+    """
+    Port of pci_filter_parse_slot and pci_filter_match from pciutils'
+    lib/filter.c, working on strings, used as a reference implementation.
+    """
+    domain = bus = -1
+    colon_index = value.rfind(':')
+    mid = value
+    if colon_index >= 0:
+        start, mid = value[:colon_index], value[colon_index + 1:]
+        if ':' in start:
+            domain_str, bus_str = start.split(':', 1)
+            domain = _oracle_field(domain_str)
+        else:
+            bus_str = start
+        bus = _oracle_field(bus_str)
+    func = -1
+    if '.' in mid:
+        mid, func_str = mid.split('.', 1)
+        func = _oracle_field(func_str)
+    dev = _oracle_field(mid)
+    slot = device.slot
+    return all(
+        expected < 0 or expected == actual
+        for expected, actual in (
+            (domain, slot.domain),
+            (bus, slot.bus),
+            (dev, slot.device),
+            (func, slot.function),
+        )
+    )
+
+
+def oracle_id_match(value: str, device: Device) -> bool:
+    """
+    Port of pci_filter_parse_id and pci_filter_match from pciutils'
+    lib/filter.c, working on strings, used as a reference implementation.
+    """
+    if not value:
+        return True
+    vendor_str, _, rest = value.partition(':')
+    device_str, _, cls_str = rest.partition(':')
+    return all(
+        expected < 0 or expected == actual
+        for expected, actual in (
+            (_oracle_field(vendor_str), device.vendor.id),
+            (_oracle_field(device_str), device.device.id),
+            (_oracle_field(cls_str), device.cls.id),
+        )
+    )
+
+
+def field(digits: int, maximum: int) -> st.SearchStrategy:
+    """
+    A filter field: omitted, a wildcard, or a hexadecimal number.
+    """
+    return st.one_of(
+        st.just(''),
+        st.just('*'),
+        st.integers(0, maximum).map(('{:0%dx}' % digits).format),
+        st.integers(0, maximum).map('{:x}'.format),
+    )
+
+
+slot_filters = st.one_of(
+    # device
+    field(2, 0x1f),
+    # device.function
+    st.tuples(field(2, 0x1f), field(1, 7)).map('{0[0]}.{0[1]}'.format),
+    # bus:device[.function]
+    st.tuples(field(2, 0xff), field(2, 0x1f), field(1, 7))
+    .map('{0[0]}:{0[1]}.{0[2]}'.format),
+    st.tuples(field(2, 0xff), field(2, 0x1f)).map('{0[0]}:{0[1]}'.format),
+    # domain:bus:device[.function]
+    st.tuples(field(4, 0xffff), field(2, 0xff), field(2, 0x1f), field(1, 7))
+    .map('{0[0]}:{0[1]}:{0[2]}.{0[3]}'.format),
+    st.tuples(field(4, 0xffff), field(2, 0xff), field(2, 0x1f))
+    .map('{0[0]}:{0[1]}:{0[2]}'.format),
+)
+
+device_filters = st.one_of(
+    st.just(''),
+    st.tuples(field(4, 0xffff), field(4, 0xffff))
+    .map('{0[0]}:{0[1]}'.format),
+    st.tuples(field(4, 0xffff), field(4, 0xffff), field(4, 0xffff))
+    .map('{0[0]}:{0[1]}:{0[2]}'.format),
+)
+
+
+def _id(maximum: int) -> st.SearchStrategy:
+    # Use few distinct values so that filters often match
+    return st.one_of(
+        st.sampled_from(sorted({0, 1, min(0x1f, maximum), maximum})),
+        st.integers(0, maximum),
+    )
+
+
+devices = st.builds(
+    lambda domain, bus, dev, func, cls, vendor, device: Device(
+        slot=Slot('{:04x}:{:02x}:{:02x}.{:x}'.format(domain, bus, dev, func)),
+        cls=NameWithID('{:04x}'.format(cls)),
+        vendor=NameWithID('{:04x}'.format(vendor)),
+        device=NameWithID('{:04x}'.format(device)),
+    ),
+    _id(0xffff), _id(0xff), _id(0x1f), _id(7),
+    _id(0xffff), _id(0xffff), _id(0xffff),
+)
 
 
 class TestSlotFilter(TestCase):
@@ -55,6 +180,41 @@ class TestSlotFilter(TestCase):
             'not a filter',
         )
 
+    def test_matches(self) -> None:
+        dev = Device(
+            slot=Slot('cafe:13:07.2'),
+            cls=NameWithID('0604'),
+            vendor=NameWithID('8086'),
+            device=NameWithID('244e'),
+        )
+        self.assertTrue(SlotFilter().matches(dev))
+        self.assertTrue(SlotFilter.parse('13:7').matches(dev))
+        self.assertTrue(SlotFilter.parse('cafe:*:*.2').matches(dev))
+        self.assertFalse(SlotFilter.parse('0:13:7.2').matches(dev))
+        self.assertFalse(SlotFilter.parse('.3').matches(dev))
+        self.assertListEqual(SlotFilter(bus=0x13).filter([dev, dev]),
+                             [dev, dev])
+        self.assertListEqual(SlotFilter(bus=0x14).filter([dev]), [])
+
+    @given(slot_filters, devices)
+    def test_matches_lspci(self, value: str, dev: Device) -> None:
+        self.assertEqual(
+            SlotFilter.parse(value).matches(dev),
+            oracle_slot_match(value, dev),
+        )
+
+    @given(slot_filters, devices)
+    def test_matches_str(self, value: str, dev: Device) -> None:
+        """
+        A filter converted to a string, as passed to lspci, must select
+        the same devices.
+        """
+        f = SlotFilter.parse(value)
+        self.assertEqual(
+            f.matches(dev),
+            oracle_slot_match(str(f), dev),
+        )
+
 
 class TestDeviceFilter(TestCase):
 
@@ -107,3 +267,73 @@ class TestDeviceFilter(TestCase):
             DeviceFilter(vendor=0xc0ff, device=0xe, cls=0xe),
             'not a filter',
         )
+
+    def test_matches(self) -> None:
+        dev = Device(
+            slot=Slot('cafe:13:07.2'),
+            cls=NameWithID('PCI bridge [0604]'),
+            vendor=NameWithID('Intel Corporation [8086]'),
+            device=NameWithID('244e'),
+        )
+        self.assertTrue(DeviceFilter().matches(dev))
+        self.assertTrue(DeviceFilter.parse('8086:').matches(dev))
+        self.assertTrue(DeviceFilter.parse('*:244e:604').matches(dev))
+        self.assertFalse(DeviceFilter.parse('8086:244f').matches(dev))
+        self.assertFalse(DeviceFilter.parse('::0600').matches(dev))
+        self.assertListEqual(DeviceFilter(vendor=0x8086).filter([dev]),
+                             [dev])
+
+    def test_matches_no_ids(self) -> None:
+        dev = Device(
+            slot=Slot('cafe:13:07.2'),
+            cls=NameWithID('PCI bridge'),
+            vendor=NameWithID('Intel Corporation'),
+            device=NameWithID('82801 PCI Bridge'),
+        )
+        self.assertTrue(DeviceFilter().matches(dev))
+        self.assertFalse(DeviceFilter(vendor=0x8086).matches(dev))
+
+    @given(device_filters, devices)
+    def test_matches_lspci(self, value: str, dev: Device) -> None:
+        self.assertEqual(
+            DeviceFilter.parse(value).matches(dev),
+            oracle_id_match(value, dev),
+        )
+
+    @given(device_filters, devices)
+    def test_matches_str(self, value: str, dev: Device) -> None:
+        f = DeviceFilter.parse(value)
+        self.assertEqual(f.matches(dev), oracle_id_match(str(f), dev))
+
+
+class TestDeviceQuery(TestCase):
+
+    def test_parse(self) -> None:
+        q = DeviceQuery('13:', '8086:')
+        self.assertEqual(q.slot_filter, SlotFilter(bus=0x13))
+        self.assertEqual(q.device_filter, DeviceFilter(vendor=0x8086))
+        self.assertEqual(
+            repr(q),
+            'DeviceQuery(slot_filter=SlotFilter(domain=None, bus=19, '
+            'device=None, function=None), device_filter=DeviceFilter('
+            'cls=None, vendor=32902, device=None))',
+        )
+        self.assertEqual(q, DeviceQuery(
+            SlotFilter(bus=0x13), DeviceFilter(vendor=0x8086)))
+        self.assertNotEqual(q, DeviceQuery())
+        with self.assertRaises(ValueError):
+            DeviceQuery('g')
+
+    @given(slot_filters, device_filters, st.lists(devices, max_size=8))
+    def test_filter(self,
+                    slot_value: str,
+                    device_value: str,
+                    device_list: List[Device]) -> None:
+        self.assertListEqual(
+            DeviceQuery(slot_value, device_value).filter(device_list),
+            [
+                dev for dev in device_list
+                if oracle_slot_match(slot_value, dev)
+                and oracle_id_match(device_value, dev)
+            ],
+        )
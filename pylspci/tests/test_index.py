@@ -0,0 +1,121 @@
+from typing import List
+from unittest import TestCase
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+from pylspci.filters import DeviceFilter, DeviceQuery, SlotFilter
+from pylspci.index import DeviceIndex
+from pylspci.tests.test_filters import device_filters, devices, slot_filters
+
+
+def make_device(slot: str,
+                cls: str,
+                vendor: str,
+                device: str,
+                **kwargs: object) -> Device:
+    return Device(
+        slot=Slot(slot),
+        cls=NameWithID(cls),
+        vendor=NameWithID(vendor),
+        device=NameWithID(device),
+        **kwargs  # type: ignore
+    )
+
+
+class TestDeviceIndex(TestCase):
+
+    def setUp(self) -> None:
+        self.devices = [
+            make_device('0000:00:1c.3', '0604', '8086', '244e',
+                        driver='pcieport', numa_node=0, iommu_group=3),
+            make_device('0000:00:00.0', '0600', '8086', '0d57',
+                        numa_node=0, iommu_group=1),
+            make_device('0000:00:1c.3/0000:01:00.0', '0300', '10de', '1c82',
+                        driver='nvidia', numa_node=1, iommu_group=3),
+            make_device('0001:00:1c.0', '0604', '8086', '244e',
+                        driver='pcieport', numa_node=1),
+            make_device('0000:02:00.0', 'VGA compatible controller',
+                        'NVIDIA Corporation', 'Something'),
+        ]
+        self.index = DeviceIndex(self.devices)
+
+    def test_iter(self) -> None:
+        self.assertEqual(len(self.index), 5)
+        self.assertListEqual(list(self.index), self.devices)
+        self.assertEqual(repr(self.index), '<DeviceIndex of 5 devices>')
+
+    def test_by_vendor(self) -> None:
+        d = self.devices
+        self.assertListEqual(self.index.by_vendor(0x8086), [d[0], d[1], d[3]])
+        self.assertListEqual(
+            self.index.by_vendor(0x8086, 0x244e), [d[0], d[3]])
+        self.assertListEqual(self.index.by_vendor(0x8086, 0x42), [])
+        self.assertListEqual(self.index.by_vendor(0x42), [])
+
+    def test_by_class(self) -> None:
+        d = self.devices
+        self.assertListEqual(self.index.by_class(0x0604), [d[0], d[3]])
+        self.assertListEqual(self.index.by_class(0x0300), [d[2]])
+        self.assertListEqual(self.index.by_class(0x0200), [])
+
+    def test_by_driver(self) -> None:
+        d = self.devices
+        self.assertListEqual(self.index.by_driver('pcieport'), [d[0], d[3]])
+        self.assertListEqual(self.index.by_driver('nouveau'), [])
+
+    def test_by_numa_node(self) -> None:
+        d = self.devices
+        self.assertListEqual(self.index.by_numa_node(1), [d[2], d[3]])
+        self.assertListEqual(self.index.by_numa_node(2), [])
+
+    def test_by_iommu_group(self) -> None:
+        d = self.devices
+        self.assertListEqual(self.index.by_iommu_group(3), [d[0], d[2]])
+        self.assertListEqual(self.index.by_iommu_group(2), [])
+
+    def test_by_slot(self) -> None:
+        d = self.devices
+        self.assertIs(self.index.by_slot('00:1c.3'), d[0])
+        self.assertIs(self.index.by_slot(Slot('0001:00:1c.0')), d[3])
+        self.assertIs(self.index.by_slot('00:1c.3/01:00.0'), d[2])
+        self.assertIsNone(self.index.by_slot('01:00.0'))
+        self.assertIsNone(self.index.by_slot('00:1f.0'))
+
+    def test_select(self) -> None:
+        d = self.devices
+        self.assertListEqual(self.index.select(), d)
+        self.assertListEqual(self.index.select('1c.'), [d[0], d[3]])
+        self.assertListEqual(self.index.select('0:0:'), [d[0], d[1]])
+        self.assertListEqual(self.index.select('00:1c'), [d[0], d[3]])
+        self.assertListEqual(self.index.select('.0'), [d[1], d[2], d[3], d[4]])
+        self.assertListEqual(
+            self.index.select(SlotFilter(bus=0), DeviceFilter(cls=0x0604)),
+            [d[0], d[3]],
+        )
+        self.assertListEqual(
+            self.index.select(device_filter='8086:244e:0604'), [d[0], d[3]])
+        self.assertListEqual(self.index.select(device_filter='10de:'), [d[2]])
+        self.assertListEqual(
+            self.index.query(DeviceQuery('1::', '8086:')), [d[3]])
+
+    @given(
+        st.lists(devices, max_size=20),
+        slot_filters,
+        device_filters,
+    )
+    def test_select_matches_filter(self,
+                                   device_list: List[Device],
+                                   slot_filter: str,
+                                   device_filter: str) -> None:
+        """
+        Queries answered from the indexes must give the same results as
+        checking every device.
+        """
+        query = DeviceQuery(slot_filter, device_filter)
+        self.assertListEqual(
+            DeviceIndex(device_list).query(query),
+            query.filter(device_list),
+        )
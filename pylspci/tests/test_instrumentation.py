@@ -0,0 +1,247 @@
+import json
+import logging
+import stat
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Generator, List, Tuple, cast
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from pylspci import instrumentation
+from pylspci.__main__ import main
+from pylspci.cache import LspciCache
+from pylspci.command import iter_lspci, lspci
+from pylspci.device import Device
+from pylspci.instrumentation import (
+    CallbackSink, LoggingSink, NullSink, PrometheusTextfileSink, SummarySink,
+    count, enabled, get_sink, instrument, set_sink, span
+)
+from pylspci.parsers import SimpleParser, VerboseParser
+from pylspci.serialization import dumps, loads
+
+SIMPLE_OUTPUT = '\n'.join([
+    '00:00.0 "Host bridge [0600]" "Intel Corporation [8086]" '
+    '"Xeon E3-1200 v3 Processor DRAM Controller [0c08]" -r06 "" ""',
+    '00:02.0 "VGA compatible controller [0300]" '
+    '"Intel Corporation [8086]" "Xeon E3-1200 v3 Graphics [041a]" -r06 '
+    '"Dell [1028]" "Device [05a4]"',
+    '',
+])
+
+
+class TestSinks(TestCase):
+
+    def tearDown(self) -> None:
+        set_sink(None)
+
+    def test_disabled(self) -> None:
+        self.assertIsNone(get_sink())
+        self.assertFalse(enabled())
+        self.assertIs(span('parse'), instrumentation._NULL_SPAN)
+        with span('parse'):
+            count('devices_parsed')
+
+    def test_null(self) -> None:
+        with instrument(NullSink()):
+            self.assertTrue(enabled())
+            self.assertIsNot(span('parse'), instrumentation._NULL_SPAN)
+            with span('parse'):
+                count('devices_parsed')
+
+    def test_callback(self) -> None:
+        spans: List[Tuple[str, float]] = []
+        counts: List[Tuple[str, int]] = []
+        sink = CallbackSink(
+            on_span=lambda name, seconds: spans.append((name, seconds)),
+            on_count=lambda name, value: counts.append((name, value)),
+        )
+        with instrument(sink):
+            with span('parse'):
+                count('devices_parsed', 3)
+            count('unknown_fields')
+        self.assertEqual([name for name, _ in spans], ['parse'])
+        self.assertGreaterEqual(spans[0][1], 0)
+        self.assertEqual(
+            counts, [('devices_parsed', 3), ('unknown_fields', 1)])
+
+        # Callbacks are optional
+        with instrument(CallbackSink()):
+            with span('parse'):
+                count('devices_parsed')
+
+    def test_span_exception(self) -> None:
+        sink = SummarySink()
+        with instrument(sink), self.assertRaises(ValueError):
+            with span('parse'):
+                raise ValueError
+        self.assertEqual(sink.spans['parse'][0], 1)
+
+    def test_logging(self) -> None:
+        with self.assertLogs('pylspci', logging.DEBUG) as logs:
+            with instrument(LoggingSink()):
+                with span('lspci'):
+                    pass
+                count('lspci_chars', 42)
+        self.assertEqual(len(logs.records), 2)
+        self.assertRegex(logs.output[0], r'lspci took \d+\.\d{6}s')
+        self.assertIn('lspci_chars += 42', logs.output[1])
+
+    def test_instrument_restores(self) -> None:
+        first, second = NullSink(), NullSink()
+        self.assertIsNone(set_sink(first))
+        with instrument(second) as sink:
+            self.assertIs(sink, second)
+            self.assertIs(get_sink(), second)
+        self.assertIs(get_sink(), first)
+        self.assertIs(set_sink(None), first)
+
+    def test_summary(self) -> None:
+        sink = SummarySink()
+        sink.span('parse', 0.5)
+        sink.span('parse', 0.25)
+        sink.span('lspci', 0.25)
+        sink.count('devices_parsed', 2)
+        sink.count('devices_parsed', 3)
+        self.assertEqual(sink.spans, {
+            'parse': (2, 0.75),
+            'lspci': (1, 0.25),
+        })
+        self.assertEqual(sink.counters, {'devices_parsed': 5})
+        lines = sink.report().splitlines()
+        self.assertEqual(
+            lines[0].split(), ['Phase', 'Calls', 'Seconds', 'Share'])
+        self.assertEqual(lines[1].split(), ['parse', '2', '0.750000', '75.0%'])
+        self.assertEqual(lines[2].split(), ['lspci', '1', '0.250000', '25.0%'])
+        self.assertEqual(lines[4].split(), ['Counter', 'Value'])
+        self.assertEqual(lines[5].split(), ['devices_parsed', '5'])
+
+    def test_summary_empty(self) -> None:
+        self.assertEqual(SummarySink().report().split(),
+                         ['Phase', 'Calls', 'Seconds', 'Share'])
+
+    def test_prometheus(self) -> None:
+        with TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / 'pylspci.prom'
+            sink = PrometheusTextfileSink(path, prefix='test')
+            self.assertEqual(sink.render(), '')
+            sink.span('parse', 0.5)
+            sink.count('cache_hits', 2)
+            sink.write()
+            self.assertEqual(path.read_text(), '\n'.join([
+                '# HELP test_span_seconds_total Time spent in each phase.',
+                '# TYPE test_span_seconds_total counter',
+                'test_span_seconds_total{span="parse"} 0.5',
+                '# HELP test_span_calls_total Number of runs of each phase.',
+                '# TYPE test_span_calls_total counter',
+                'test_span_calls_total{span="parse"} 1',
+                '# TYPE test_cache_hits_total counter',
+                'test_cache_hits_total 2',
+                '',
+            ]))
+            # Only the metrics file is left behind
+            self.assertEqual(list(Path(tempdir).iterdir()), [path])
+
+    def test_prometheus_mode(self) -> None:
+        with TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / 'pylspci.prom'
+            PrometheusTextfileSink(path).write()
+            # Readable by a collector running as another user
+            self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o644)
+
+    @patch('pylspci.instrumentation.os.replace')
+    def test_prometheus_error(self, replace_mock: MagicMock) -> None:
+        replace_mock.side_effect = PermissionError('Permission denied')
+        with TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / 'pylspci.prom'
+            sink = PrometheusTextfileSink(path)
+            sink.count('cache_hits', 1)
+            with self.assertRaises(PermissionError):
+                sink.write()
+            # The temporary file is removed
+            self.assertEqual(list(Path(tempdir).iterdir()), [])
+
+
+class TestInstrumentedCode(TestCase):
+
+    def setUp(self) -> None:
+        self.sink = SummarySink()
+        self.previous = set_sink(self.sink)
+
+    def tearDown(self) -> None:
+        set_sink(self.previous)
+
+    @patch('pylspci.command.subprocess.check_output')
+    def test_lspci(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = SIMPLE_OUTPUT
+        cache = LspciCache()
+        lspci(cache=cache)
+        lspci(cache=cache)
+        self.assertEqual(cmd_mock.call_count, 1)
+        self.assertEqual(self.sink.spans['lspci'][0], 2)
+        self.assertEqual(self.sink.counters, {
+            'lspci_chars': 2 * len(SIMPLE_OUTPUT),
+            'cache_hits': 1,
+            'cache_misses': 1,
+        })
+
+    def test_parse(self) -> None:
+        devices = SimpleParser().parse(SIMPLE_OUTPUT)
+        self.assertEqual(self.sink.spans['parse'][0], 1)
+        self.assertEqual(self.sink.counters, {'devices_parsed': 2})
+
+        self.assertEqual(loads(dumps(devices)), devices)
+        self.assertEqual(self.sink.spans['serialize'][0], 1)
+        self.assertEqual(self.sink.spans['deserialize'][0], 1)
+
+    def test_iter_parse(self) -> None:
+        devices = list(SimpleParser().iter_parse(SIMPLE_OUTPUT.splitlines()))
+        self.assertEqual(len(devices), 2)
+        self.assertEqual(self.sink.counters, {'devices_parsed': 2})
+
+        # Devices are counted when the iterator is closed early
+        device = 'Slot:\t00:00.0\nClass:\tHost bridge\nVendor:\tIntel\n' \
+            'Device:\tSomething\n\n'
+        iterator = cast(Generator[Device, None, None],
+                        VerboseParser().iter_parse(
+                            (device * 2).splitlines()))
+        next(iterator)
+        iterator.close()
+        self.assertEqual(self.sink.counters, {'devices_parsed': 3})
+
+    @patch('pylspci.command.lspci_args')
+    def test_iter_lspci(self, args_mock: MagicMock) -> None:
+        args_mock.return_value = [
+            sys.executable, '-c', 'print({!r}, end="")'.format(SIMPLE_OUTPUT)]
+        self.assertEqual(''.join(iter_lspci()), SIMPLE_OUTPUT)
+        self.assertEqual(
+            self.sink.counters, {'lspci_chars': len(SIMPLE_OUTPUT)})
+
+    def test_unknown_fields(self) -> None:
+        with self.assertWarns(UserWarning):
+            VerboseParser().parse(
+                'Slot:\t00:00.0\nClass:\tHost bridge\nVendor:\tIntel\n'
+                'Device:\tSomething\nUnknown:\tValue\n')
+        self.assertEqual(self.sink.counters, {
+            'devices_parsed': 1,
+            'unknown_fields': 1,
+        })
+
+    @patch('pylspci.command.subprocess.check_output')
+    @patch('sys.argv', ['pylspci', '-nn', '--profile'])
+    def test_profile(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = SIMPLE_OUTPUT
+        stdout, stderr = StringIO(), StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            main()
+        self.assertEqual(len(json.loads(stdout.getvalue())), 2)
+        phases = [
+            line.split()[0]
+            for line in stderr.getvalue().split('\n\n')[0].splitlines()[1:]
+        ]
+        self.assertCountEqual(phases, ['lspci', 'parse', 'write'])
+        self.assertIn('devices_parsed', stderr.getvalue())
+        # The previous sink is restored
+        self.assertIs(get_sink(), self.sink)
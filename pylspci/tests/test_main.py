@@ -0,0 +1,56 @@
+import json
+from io import StringIO
+from typing import List
+from unittest import TestCase
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pylspci.__main__ import JSONItem, write_json, write_ndjson
+from pylspci.device import Device
+from pylspci.fields import NameWithID, PCIAccessParameter, Slot
+from pylspci.tests.test_filters import devices
+
+
+class TestJSONOutput(TestCase):
+
+    def test_write_json_empty(self) -> None:
+        output = StringIO()
+        write_json([], output)
+        self.assertEqual(output.getvalue(), '[]\n')
+
+    def test_write_json_mixed(self) -> None:
+        param = PCIAccessParameter(
+            'dump.name\tName of the bus dump file to read from ()')
+        device = Device(
+            slot=Slot('00:01.0'),
+            cls=NameWithID('Something [0420]'),
+            vendor=NameWithID('Something [4242]'),
+            device=NameWithID('Something [4242]'),
+        )
+        items: List[JSONItem] = ['a', param, device]
+        output = StringIO()
+        write_json(iter(items), output)
+        self.assertEqual(output.getvalue(), json.dumps([
+            'a',
+            param.as_dict(),
+            device.as_dict(),
+        ]) + '\n')
+
+    @given(st.lists(devices))
+    def test_write_json_identical(self, items: List[Device]) -> None:
+        output = StringIO()
+        write_json(items, output)
+        self.assertEqual(
+            output.getvalue(),
+            json.dumps([device.as_dict() for device in items]) + '\n',
+        )
+
+    @given(st.lists(devices))
+    def test_write_ndjson(self, items: List[Device]) -> None:
+        output = StringIO()
+        write_ndjson(items, output)
+        self.assertEqual(
+            [json.loads(line) for line in output.getvalue().splitlines()],
+            json.loads(json.dumps([device.as_dict() for device in items])),
+        )
@@ -0,0 +1,285 @@
+import gzip
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from pylspci.parsers import SimpleParser
+from pylspci.pciids import (
+    CachedPciIdsDatabase, PciIdsDatabase, default_cache_dir, find_pciids
+)
+
+SAMPLE_PCIIDS: str = """#
+#\tList of PCI ID's
+#
+# Vendors, devices and subsystems.
+#
+0001  SafeNet (wrong ID)
+0010  Allied Telesis, Inc (Wrong ID)
+# This is a relabelled RTL-8139
+\t8139  AT-2500TX V3 Ethernet
+8086  Intel Corporation
+\t0d57  Sample Host Bridge
+\t244e  82801 PCI Bridge
+\t\t1028 0001  PowerEdge 2400
+\t\t8086 1234  Some Subsystem
+ffff  Illegal Vendor ID
+
+# List of known device classes, subclasses and programming interfaces
+
+C 00  Unclassified device
+\t00  Non-VGA unclassified device
+C 06  Bridge
+\t00  Host bridge
+\t04  PCI bridge
+\t\t00  Normal decode
+\t\t01  Subtractive decode
+C 08  Generic system peripheral
+"""
+
+
+class TestPciIdsDatabase(TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / 'pci.ids'
+        self.path.write_text(SAMPLE_PCIIDS)
+        self.db = PciIdsDatabase(self.path)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_lazy(self) -> None:
+        self.assertIsNone(self.db._data)
+        self.assertEqual(self.db.vendor_name(0x8086), 'Intel Corporation')
+        self.assertIsNotNone(self.db._data)
+        self.assertSetEqual(self.db._parsed_vendors, set())
+        self.assertDictEqual(self.db._devices, {})
+
+        self.assertEqual(
+            self.db.device_name(0x8086, 0x244e),
+            '82801 PCI Bridge',
+        )
+        self.assertSetEqual(self.db._parsed_vendors, {0x8086})
+        self.assertFalse(self.db._classes_parsed)
+
+    def test_load(self) -> None:
+        self.db.load()
+        self.assertSetEqual(
+            self.db._parsed_vendors,
+            {0x0001, 0x0010, 0x8086, 0xffff},
+        )
+        self.assertTrue(self.db._classes_parsed)
+        self.assertEqual(len(self.db._devices), 3)
+        self.assertEqual(len(self.db._subsystems), 2)
+
+    def test_vendor_name(self) -> None:
+        self.assertEqual(self.db.vendor_name(0x0001), 'SafeNet (wrong ID)')
+        self.assertEqual(self.db.vendor_name(0xffff), 'Illegal Vendor ID')
+        self.assertIsNone(self.db.vendor_name(0x1234))
+
+    def test_device_name(self) -> None:
+        self.assertEqual(
+            self.db.device_name(0x0010, 0x8139),
+            'AT-2500TX V3 Ethernet',
+        )
+        self.assertEqual(
+            self.db.device_name(0x8086, 0x0d57),
+            'Sample Host Bridge',
+        )
+        self.assertIsNone(self.db.device_name(0x8086, 0x8139))
+        self.assertIsNone(self.db.device_name(0x1234, 0x8139))
+
+    def test_subsystem_name(self) -> None:
+        self.assertEqual(
+            self.db.subsystem_name(0x8086, 0x244e, 0x1028, 0x0001),
+            'PowerEdge 2400',
+        )
+        # Same IDs as the device falls back to the device name
+        self.assertEqual(
+            self.db.subsystem_name(0x8086, 0x244e, 0x8086, 0x244e),
+            '82801 PCI Bridge',
+        )
+        self.assertIsNone(
+            self.db.subsystem_name(0x8086, 0x244e, 0x1028, 0x0002))
+
+    def test_class_names(self) -> None:
+        self.assertEqual(self.db.class_name(0x06), 'Bridge')
+        self.assertEqual(self.db.class_name(0x08), 'Generic system peripheral')
+        self.assertIsNone(self.db.class_name(0x42))
+        self.assertEqual(self.db.subclass_name(0x06, 0x04), 'PCI bridge')
+        self.assertIsNone(self.db.subclass_name(0x06, 0x42))
+        self.assertEqual(
+            self.db.progif_name(0x06, 0x04, 0x01),
+            'Subtractive decode',
+        )
+        self.assertIsNone(self.db.progif_name(0x06, 0x00, 0x01))
+
+    def test_gzip(self) -> None:
+        gz_path = Path(self.tempdir.name) / 'pci.ids.gz'
+        with gzip.open(str(gz_path), 'wt') as f:
+            f.write(SAMPLE_PCIIDS)
+        db = PciIdsDatabase(gz_path)
+        self.assertEqual(db.vendor_name(0x8086), 'Intel Corporation')
+        self.assertEqual(db.subclass_name(0x06, 0x04), 'PCI bridge')
+
+    def test_resolve(self) -> None:
+        dev = self.db.resolve(SimpleParser().parse_line(
+            '00:1c.3 "0604" "8086" "244e" -rd5 -p01 "8086" "1234"'
+        ))
+        self.assertEqual(dev.cls.id, 0x0604)
+        self.assertEqual(dev.cls.name, 'PCI bridge')
+        self.assertEqual(dev.vendor.id, 0x8086)
+        self.assertEqual(dev.vendor.name, 'Intel Corporation')
+        self.assertEqual(dev.device.id, 0x244e)
+        self.assertEqual(dev.device.name, '82801 PCI Bridge')
+        assert dev.subsystem_vendor is not None
+        self.assertEqual(dev.subsystem_vendor.id, 0x8086)
+        self.assertEqual(dev.subsystem_vendor.name, 'Intel Corporation')
+        assert dev.subsystem_device is not None
+        self.assertEqual(dev.subsystem_device.id, 0x1234)
+        self.assertEqual(dev.subsystem_device.name, 'Some Subsystem')
+        self.assertEqual(dev.revision, 0xd5)
+        self.assertEqual(dev.progif, 0x01)
+
+    def test_resolve_unknown(self) -> None:
+        """
+        Unknown IDs, names that are already set and missing IDs are kept.
+        """
+        dev = self.db.resolve(SimpleParser().parse_line(
+            '00:1c.3 "4242" "Something [8086]" "244f" "" "Something"'
+        ))
+        self.assertEqual(dev.cls.id, 0x4242)
+        self.assertIsNone(dev.cls.name)
+        self.assertEqual(dev.vendor.name, 'Something')
+        self.assertEqual(dev.device.id, 0x244f)
+        self.assertIsNone(dev.device.name)
+        assert dev.subsystem_vendor is not None
+        self.assertIsNone(dev.subsystem_vendor.id)
+        self.assertEqual(dev.subsystem_vendor.name, '')
+        assert dev.subsystem_device is not None
+        self.assertEqual(dev.subsystem_device.name, 'Something')
+
+    def test_resolve_class_fallback(self) -> None:
+        dev = self.db.resolve(SimpleParser().parse_line(
+            '00:00.0 "0642" "8086" "0d57" "" ""'
+        ))
+        self.assertEqual(dev.cls.name, 'Bridge')
+
+    def test_default_path(self) -> None:
+        paths = [Path(self.tempdir.name) / 'nowhere', self.path]
+        with patch('pylspci.pciids.DEFAULT_PCIIDS_PATHS', paths):
+            self.assertEqual(find_pciids(), self.path)
+            self.assertEqual(PciIdsDatabase().path, self.path)
+
+        with patch('pylspci.pciids.DEFAULT_PCIIDS_PATHS', []):
+            self.assertIsNone(find_pciids())
+            with self.assertRaises(FileNotFoundError):
+                PciIdsDatabase()
+
+
+class TestCachedPciIdsDatabase(TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / 'pci.ids'
+        self.path.write_text(SAMPLE_PCIIDS)
+        self.cache_dir = Path(self.tempdir.name) / 'cache'
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _check_names(self, db: PciIdsDatabase) -> None:
+        self.assertEqual(db.vendor_name(0x8086), 'Intel Corporation')
+        self.assertIsNone(db.vendor_name(0x1234))
+        self.assertEqual(db.device_name(0x8086, 0x244e), '82801 PCI Bridge')
+        self.assertIsNone(db.device_name(0x8086, 0x8139))
+        self.assertEqual(
+            db.subsystem_name(0x8086, 0x244e, 0x1028, 0x0001),
+            'PowerEdge 2400',
+        )
+        self.assertEqual(
+            db.subsystem_name(0x8086, 0x244e, 0x8086, 0x244e),
+            '82801 PCI Bridge',
+        )
+        self.assertIsNone(db.subsystem_name(0x8086, 0x244e, 0x1028, 0x0002))
+        self.assertEqual(db.class_name(0x08), 'Generic system peripheral')
+        self.assertEqual(db.subclass_name(0x06, 0x04), 'PCI bridge')
+        self.assertEqual(db.progif_name(0x06, 0x04, 0x01),
+                         'Subtractive decode')
+        self.assertIsNone(db.progif_name(0x06, 0x00, 0x01))
+
+    def test_build_and_reuse(self) -> None:
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        self.assertFalse(db.cache_path.exists())
+        self._check_names(db)
+        self.assertTrue(db.cache_path.is_file())
+        self.assertEqual(db.cache_path.parent, self.cache_dir)
+
+        # A warm cache never reads the text database
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        with patch.object(PciIdsDatabase, '_read') as read_mock:
+            self._check_names(db)
+        self.assertFalse(read_mock.called)
+
+    def test_stale(self) -> None:
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        db.load()
+        stat = self.path.stat()
+
+        self.path.write_text(
+            SAMPLE_PCIIDS.replace('Intel Corporation', 'Intel Corp.'))
+        os.utime(str(self.path), ns=(stat.st_atime_ns,
+                                     stat.st_mtime_ns + 1000000000))
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        self.assertEqual(db.vendor_name(0x8086), 'Intel Corp.')
+
+    def test_corrupt(self) -> None:
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        self.cache_dir.mkdir()
+        for content in (b'', b'garbage', b'PYLSPCI1' + b'\xff' * 32):
+            with self.subTest(content=content):
+                db.cache_path.write_bytes(content)
+                db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+                self._check_names(db)
+                self.assertNotEqual(db.cache_path.read_bytes(), content)
+
+    def test_unwritable(self) -> None:
+        # A file where the cache folder should be
+        self.cache_dir.write_text('')
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        self._check_names(db)
+        self.assertIsNone(db._table)
+
+    def test_gzip(self) -> None:
+        gz_path = Path(self.tempdir.name) / 'pci.ids.gz'
+        with gzip.open(str(gz_path), 'wt') as f:
+            f.write(SAMPLE_PCIIDS)
+        db = CachedPciIdsDatabase(gz_path, cache_dir=self.cache_dir)
+        self._check_names(db)
+        self.assertNotEqual(
+            db.cache_path,
+            CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+            .cache_path,
+        )
+
+    def test_resolve(self) -> None:
+        db = CachedPciIdsDatabase(self.path, cache_dir=self.cache_dir)
+        dev = db.resolve(SimpleParser().parse_line(
+            '00:1c.3 "0604" "8086" "244e" -rd5 -p01 "8086" "1234"'
+        ))
+        self.assertEqual(dev.cls.name, 'PCI bridge')
+        self.assertEqual(dev.vendor.name, 'Intel Corporation')
+        self.assertEqual(dev.device.name, '82801 PCI Bridge')
+        assert dev.subsystem_device is not None
+        self.assertEqual(dev.subsystem_device.name, 'Some Subsystem')
+
+    def test_default_cache_dir(self) -> None:
+        with patch.dict('os.environ', {'XDG_CACHE_HOME': '/somewhere'}):
+            self.assertEqual(default_cache_dir(), Path('/somewhere/pylspci'))
+        with patch.dict('os.environ', {'XDG_CACHE_HOME': ''}):
+            self.assertEqual(
+                default_cache_dir(),
+                Path.home() / '.cache' / 'pylspci',
+            )
@@ -0,0 +1,256 @@
+import time
+from threading import Barrier, Event, Lock, Thread
+from typing import Any, Callable, List
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from pylspci.cache import LspciCache
+from pylspci.command import CommandBuilder
+from pylspci.parsers import SimpleParser, VerboseParser
+from pylspci.scanner import ScanError, Scanner
+
+SIMPLE_OUTPUT = '\n'.join([
+    '00:00.0 "Host bridge [0600]" "Intel Corporation [8086]" '
+    '"Xeon E3-1200 v3 Processor DRAM Controller [0c08]" -r06 "" ""',
+    '00:02.0 "VGA compatible controller [0300]" '
+    '"Intel Corporation [8086]" "Xeon E3-1200 v3 Graphics [041a]" -r06 '
+    '"Dell [1028]" "Device [05a4]"',
+    '',
+])
+
+VERBOSE_OUTPUT = 'Slot:\t00:00.0\nClass:\tHost bridge\nVendor:\tIntel\n' \
+    'Device:\tSomething\n\n'
+
+
+def start(count: int, target: Callable[[], Any]) -> List[Thread]:
+    threads = [Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def wait_until(condition: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 10
+    while not condition():
+        assert time.monotonic() < deadline, 'Timed out'
+        time.sleep(0.001)
+
+
+class TestScanner(TestCase):
+
+    def setUp(self) -> None:
+        self.scanner = Scanner()
+        self.release = Event()
+
+    def blocking_scan(self, result: Any = 'result') -> MagicMock:
+        def scan() -> Any:
+            self.release.wait(10)
+            return result
+        return MagicMock(side_effect=scan)
+
+    def test_coalescing(self) -> None:
+        scan = self.blocking_scan(object())
+        results: List[Any] = []
+
+        threads = start(50, lambda: results.append(
+            self.scanner.call('key', scan)))
+        # All threads are waiting for the first scan
+        wait_until(lambda: self.scanner.coalesced == 49)
+        self.assertEqual(len(self.scanner), 1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(self.scanner.scans, 1)
+        self.assertEqual(len(results), 50)
+        self.assertEqual(len(set(map(id, results))), 1)
+        self.assertEqual(len(self.scanner), 0)
+
+        # Results are not reused after the scan ended
+        self.assertIs(self.scanner.call('key', scan), results[0])
+        self.assertEqual(scan.call_count, 2)
+
+    def test_errors(self) -> None:
+        def scan() -> None:
+            self.release.wait(10)
+            raise ValueError('Scan failed')
+
+        errors: List[BaseException] = []
+
+        def call() -> None:
+            try:
+                self.scanner.call('key', scan)
+            except (ValueError, ScanError) as e:
+                errors.append(e)
+
+        threads = start(10, call)
+        wait_until(lambda: self.scanner.coalesced == 9)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 10)
+        self.assertEqual(self.scanner.scans, 1)
+        self.assertEqual(len(self.scanner), 0)
+
+        # The thread running the scan gets its exception
+        original = [e for e in errors if isinstance(e, ValueError)]
+        self.assertEqual(len(original), 1)
+        # Each waiting thread gets its own exception
+        wrapped = [e for e in errors if isinstance(e, ScanError)]
+        self.assertEqual(len(wrapped), 9)
+        self.assertEqual(len(set(map(id, wrapped))), 9)
+        for error in wrapped:
+            self.assertIs(error.__cause__, original[0])
+            self.assertIn('Scan failed', str(error))
+
+        self.assertEqual(self.scanner.call('key', lambda: 'ok'), 'ok')
+
+    def test_max_concurrency(self) -> None:
+        scanner = Scanner(max_concurrency=2)
+        lock = Lock()
+        running: List[int] = [0, 0]
+
+        def scan() -> None:
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        keys = iter(range(8))
+        threads = start(8, lambda: scanner.call(next(keys), scan))
+        for thread in threads:
+            thread.join()
+        self.assertEqual(scanner.scans, 8)
+        self.assertEqual(scanner.coalesced, 0)
+        self.assertEqual(running, [0, 2])
+
+    def test_timeout(self) -> None:
+        scanner = Scanner(timeout=0.05)
+        threads = start(1, lambda: scanner.call('first', self.blocking_scan()))
+        wait_until(lambda: scanner.scans == 1)
+        with self.assertRaisesRegex(TimeoutError, 'Too many scans'):
+            scanner.call('second', lambda: None)
+        self.assertEqual(len(scanner), 1)
+        self.release.set()
+        threads[0].join()
+        self.assertEqual(scanner.call('second', lambda: 'ok'), 'ok')
+
+
+class TestScannerCommand(TestCase):
+
+    def setUp(self) -> None:
+        self.scanner = Scanner()
+        self.release = Event()
+
+    def check_output(self, *args: Any, **kwargs: Any) -> str:
+        self.release.wait(10)
+        return SIMPLE_OUTPUT
+
+    @patch('pylspci.command.subprocess.check_output')
+    def test_scan(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.side_effect = self.check_output
+        results: List[List[Any]] = []
+
+        def scan() -> None:
+            results.append(self.scanner.scan(
+                CommandBuilder().with_default_parser()))
+
+        threads = start(20, scan)
+        wait_until(lambda: self.scanner.coalesced == 19)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(cmd_mock.call_count, 1)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(len(results[0]), 2)
+        self.assertTrue(all(result == results[0] for result in results))
+        # Each caller gets its own list
+        self.assertEqual(len(set(map(id, results))), 20)
+
+    @patch('pylspci.command.subprocess.check_output')
+    def test_run(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = VERBOSE_OUTPUT
+        devices = self.scanner.run(VerboseParser(), kernel_drivers=True)
+        self.assertEqual(devices, VerboseParser().parse(VERBOSE_OUTPUT))
+        cmd_mock.assert_called_once_with(
+            ['lspci', '-mm', '-vvv', '-k', '-nn'],
+            universal_newlines=True,
+        )
+
+    @patch('pylspci.command.iter_lspci')
+    def test_run_stream(self, cmd_mock: MagicMock) -> None:
+        cmd_mock.return_value = iter(VERBOSE_OUTPUT.splitlines(True))
+        devices = self.scanner.run(
+            VerboseParser(), stream=True, kernel_drivers=True)
+        self.assertEqual(devices, VerboseParser().parse(VERBOSE_OUTPUT))
+        cmd_mock.assert_called_once_with(
+            verbose=True, kernel_drivers=True)
+
+    @patch('pylspci.command.subprocess.check_output')
+    def test_run_unsupported(self, cmd_mock: MagicMock) -> None:
+        with self.assertRaisesRegex(
+                TypeError, 'Unsupported lspci arguments: colour, timeout'):
+            self.scanner.run(SimpleParser(), timeout=1, colour=True)
+        with self.assertRaisesRegex(ValueError, 'Verbose output'):
+            self.scanner.run(SimpleParser(), verbose=True)
+        self.assertFalse(cmd_mock.called)
+        self.assertEqual(len(self.scanner), 0)
+
+    def test_builder_key(self) -> None:
+        def key(builder: CommandBuilder) -> Any:
+            return builder.key()
+
+        self.assertEqual(
+            key(CommandBuilder().slot_filter(bus=1).with_parser(
+                SimpleParser())),
+            key(CommandBuilder().slot_filter(':1:.').with_parser(
+                SimpleParser()).use_cache(LspciCache())),
+        )
+        self.assertEqual(
+            key(CommandBuilder().verbose().with_parser(VerboseParser())),
+            key(CommandBuilder().verbose().with_parser(
+                VerboseParser()).stream()),
+        )
+        self.assertNotEqual(
+            key(CommandBuilder().slot_filter(bus=1)),
+            key(CommandBuilder().slot_filter(bus=2)),
+        )
+        self.assertNotEqual(
+            key(CommandBuilder().with_parser(SimpleParser())),
+            key(CommandBuilder()),
+        )
+        self.assertNotEqual(
+            key(CommandBuilder().verbose().with_parser(VerboseParser())),
+            key(CommandBuilder().verbose().with_parser(
+                VerboseParser(lazy=True))),
+        )
+        self.assertNotEqual(
+            key(CommandBuilder().use_sysfs('/sys')),
+            key(CommandBuilder()),
+        )
+        self.assertNotEqual(
+            key(CommandBuilder().use_sysfs('/sys', config=True)),
+            key(CommandBuilder().use_sysfs('/sys')),
+        )
+        self.assertNotEqual(
+            key(CommandBuilder().with_pcilib_params(a='1')),
+            key(CommandBuilder().with_pcilib_params(a='2')),
+        )
+
+    def test_simple_parser_threads(self) -> None:
+        parser = SimpleParser()
+        barrier = Barrier(10)
+        parsers: List[Any] = []
+
+        def get() -> None:
+            barrier.wait()
+            parsers.append(parser._parser)
+
+        for thread in start(10, get):
+            thread.join()
+        self.assertEqual(len(parsers), 10)
+        self.assertEqual(len(set(map(id, parsers))), 1)
@@ -0,0 +1,219 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Optional
+from unittest import TestCase, skipIf, skipUnless
+from unittest.mock import patch
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pylspci import serialization
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+from pylspci.serialization import (
+    decode, dumps, encode, iter_decode_ndjson, iter_load_ndjson, loads
+)
+
+
+def _slot(parent: Optional[Slot],
+          domain: int,
+          bus: int,
+          device: int,
+          function: int) -> Slot:
+    value = '{:04x}:{:02x}:{:02x}.{:x}'.format(domain, bus, device, function)
+    return Slot('{}/{}'.format(parent, value) if parent else value)
+
+
+slots = st.recursive(
+    st.builds(
+        _slot, st.none(), st.integers(0, 0xffff), st.integers(0, 0xff),
+        st.integers(0, 0x1f), st.integers(0, 7),
+    ),
+    lambda parents: st.builds(
+        _slot, parents, st.integers(0, 0xffff), st.integers(0, 0xff),
+        st.integers(0, 0x1f), st.integers(0, 7),
+    ),
+    max_leaves=3,
+)
+
+names = st.builds(
+    NameWithID._from_fields,
+    st.one_of(st.none(), st.integers(0, 0xffff)),
+    st.one_of(st.none(), st.text()),
+)
+
+optional_ints = st.one_of(st.none(), st.integers(0, 0xffff))
+optional_texts = st.one_of(st.none(), st.text())
+
+rich_devices = st.builds(
+    Device,
+    slot=slots,
+    cls=names,
+    vendor=names,
+    device=names,
+    subsystem_vendor=st.one_of(st.none(), names),
+    subsystem_device=st.one_of(st.none(), names),
+    revision=optional_ints,
+    progif=optional_ints,
+    driver=optional_texts,
+    kernel_modules=st.lists(st.text()),
+    numa_node=optional_ints,
+    iommu_group=optional_ints,
+    physical_slot=optional_texts,
+    config=st.none(),
+)
+
+
+class TestSerialization(TestCase):
+
+    @given(rich_devices)
+    def test_encode(self, device: Device) -> None:
+        self.assertEqual(encode(device), device.as_dict())
+
+    @given(rich_devices)
+    def test_decode(self, device: Device) -> None:
+        self.assertEqual(decode(device.as_dict()), device)
+        self.assertEqual(decode(json.loads(json.dumps(encode(device)))),
+                         device)
+
+    def test_decode_shared(self) -> None:
+        data = Device(
+            slot=Slot('0000:00:01.0/0000:01:00.0'),
+            cls=NameWithID('VGA compatible controller [0300]'),
+            vendor=NameWithID('NVIDIA Corporation [10de]'),
+            device=NameWithID('GP107 [1c82]'),
+        ).as_dict()
+        first, second = decode(data), decode(data)
+        self.assertIs(first.slot, second.slot)
+        self.assertIs(first.vendor, second.vendor)
+
+    def test_decode_defaults(self) -> None:
+        device = decode({
+            'slot': {'domain': 0, 'bus': 1, 'device': 2, 'function': 3},
+            'cls': {'id': 0x0300},
+            'vendor': {'name': 'Vendor'},
+            'device': {'id': 0x1234, 'name': 'Device'},
+        })
+        self.assertEqual(device, Device(
+            slot=Slot('0000:01:02.3'),
+            cls=NameWithID('0300'),
+            vendor=NameWithID('Vendor'),
+            device=NameWithID('Device [1234]'),
+        ))
+
+    def test_decode_invalid(self) -> None:
+        data = Device(
+            slot=Slot('0000:01:02.3'),
+            cls=NameWithID('0300'),
+            vendor=NameWithID('10de'),
+            device=NameWithID('1c82'),
+        ).as_dict()
+        data['slot']['device'] = 0x20  # type: ignore
+        with self.assertRaises(ValueError):
+            decode(data)
+        data['slot']['device'] = 2  # type: ignore
+        del data['cls']
+        with self.assertRaises(KeyError):
+            decode(data)
+
+    @given(st.lists(rich_devices))
+    def test_json(self, devices: List[Device]) -> None:
+        data = dumps(devices)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(
+            json.loads(data.decode('utf-8')),
+            [device.as_dict() for device in devices],
+        )
+        self.assertEqual(loads(data), devices)
+
+    @given(st.lists(rich_devices))
+    def test_json_fallback(self, devices: List[Device]) -> None:
+        with patch('pylspci.serialization.orjson', None):
+            data = dumps(devices)
+            self.assertEqual(
+                data,
+                json.dumps([device.as_dict() for device in devices])
+                .encode('utf-8'),
+            )
+            self.assertEqual(loads(data), devices)
+
+    @skipUnless(serialization.msgpack, 'msgpack is not installed')
+    @given(st.lists(rich_devices))
+    def test_msgpack(self, devices: List[Device]) -> None:
+        self.assertIn('msgpack', serialization.FORMATS)
+        self.assertEqual(loads(dumps(devices, 'msgpack'), 'msgpack'), devices)
+
+    @skipIf(serialization.msgpack, 'msgpack is installed')
+    def test_msgpack_missing(self) -> None:
+        self.assertNotIn('msgpack', serialization.FORMATS)
+        with self.assertRaises(ImportError):
+            dumps([], 'msgpack')
+        with self.assertRaises(ImportError):
+            loads(b'\x90', 'msgpack')
+
+    def test_invalid_format(self) -> None:
+        with self.assertRaisesRegex(ValueError, 'Unsupported format'):
+            dumps([], 'yaml')
+        with self.assertRaisesRegex(ValueError, 'Unsupported format'):
+            loads(b'', 'yaml')
+
+    def test_loads_invalid(self) -> None:
+        with self.assertRaisesRegex(ValueError, 'Expected a list'):
+            loads(b'{}')
+        with self.assertRaisesRegex(ValueError, 'Invalid device'):
+            loads(b'[{"slot": null}]')
+        with self.assertRaises(ValueError):
+            loads(b'not json')
+
+    @given(st.lists(rich_devices))
+    def test_ndjson(self, devices: List[Device]) -> None:
+        lines = [json.dumps(device.as_dict()) for device in devices]
+        self.assertEqual(list(iter_decode_ndjson(lines)), devices)
+        self.assertEqual(list(iter_decode_ndjson(
+            [line.encode('utf-8') for line in lines])), devices)
+
+    def test_ndjson_shared_parents(self) -> None:
+        lines = [
+            json.dumps(Device(
+                slot=Slot('0000:00:01.0/0000:01:00.{}'.format(function)),
+                cls=NameWithID('0300'),
+                vendor=NameWithID('10de'),
+                device=NameWithID('1c82'),
+            ).as_dict()) + '\n'
+            for function in range(4)
+        ]
+        devices = list(iter_decode_ndjson(lines))
+        self.assertEqual(len(devices), 4)
+        parents = {id(device.slot.parent) for device in devices}
+        self.assertEqual(len(parents), 1)
+
+    def test_ndjson_invalid(self) -> None:
+        iterator = iter_decode_ndjson(['', '{"slot": null}'])
+        with self.assertRaisesRegex(ValueError, 'line 2'):
+            next(iterator)
+        with self.assertRaisesRegex(ValueError, 'line 1'):
+            list(iter_decode_ndjson(['[]']))
+
+    def test_load_ndjson(self) -> None:
+        devices = [
+            Device(
+                slot=Slot('0000:00:01.0/0000:01:00.0'),
+                cls=NameWithID('VGA compatible controller [0300]'),
+                vendor=NameWithID('NVIDIA Corporation [10de]'),
+                device=NameWithID('GP107 [1c82]'),
+                driver='nvidia',
+            ),
+            Device(
+                slot=Slot('0000:00:00.0'),
+                cls=NameWithID('Host bridge [0600]'),
+                vendor=NameWithID('Intel Corporation [8086]'),
+                device=NameWithID('0d57'),
+            ),
+        ]
+        with TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / 'devices.ndjson'
+            path.write_text(''.join(
+                json.dumps(device.as_dict()) + '\n' for device in devices))
+            self.assertEqual(list(iter_load_ndjson(path)), devices)
+            self.assertEqual(list(iter_load_ndjson(str(path))), devices)
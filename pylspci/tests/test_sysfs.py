@@ -0,0 +1,229 @@
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, Optional
+from unittest import TestCase
+
+from pylspci.capabilities import ConfigSpace
+from pylspci.device import Device
+from pylspci.sysfs import SysfsReader, read_devices
+
+MODULES_ALIAS: str = """
+# Aliases extracted from modules themselves.
+alias pci:v00008086d0000244Esv*sd*bc*sc*i* nouveau
+alias pci:v*d*sv*sd*bc06sc04i01* nvidia
+alias pci:v*d*sv*sd*bc06sc04i01* nvidia
+alias pci:v000010DEd*sv*sd*bc03sc*i* nvidiafb
+alias usb:v*p*d*dc*dsc*dp*ic*isc*ip*in* usbcore
+"""
+
+
+def make_device(root: Path,
+                name: str,
+                files: Dict[str, str],
+                driver: Optional[str] = None,
+                iommu_group: Optional[int] = None) -> None:
+    """
+    Create a fake PCI device in a sysfs tree, mimicking the layout of
+    /sys/bus/pci/devices, where each device is a symlink to /sys/devices.
+    """
+    real_path = root / 'devices' / 'pci0000:00' / name
+    real_path.mkdir(parents=True)
+    for filename, content in files.items():
+        (real_path / filename).write_text(content + '\n')
+    if driver:
+        driver_path = root / 'bus' / 'pci' / 'drivers' / driver
+        driver_path.mkdir(parents=True, exist_ok=True)
+        os.symlink(str(driver_path), str(real_path / 'driver'))
+    if iommu_group is not None:
+        group_path = root / 'kernel' / 'iommu_groups' / str(iommu_group)
+        group_path.mkdir(parents=True, exist_ok=True)
+        os.symlink(str(group_path), str(real_path / 'iommu_group'))
+
+    devices_path = root / 'bus' / 'pci' / 'devices'
+    devices_path.mkdir(parents=True, exist_ok=True)
+    os.symlink(str(real_path), str(devices_path / name))
+
+
+class TestSysfsReader(TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.modules_alias = self.root / 'modules.alias'
+        self.modules_alias.write_text(MODULES_ALIAS)
+
+        make_device(self.root, '0000:00:1c.3', {
+            'vendor': '0x8086',
+            'device': '0x244e',
+            'class': '0x060401',
+            'revision': '0xd5',
+            'subsystem_vendor': '0x8086',
+            'subsystem_device': '0x244e',
+            'numa_node': '0',
+            'modalias':
+                'pci:v00008086d0000244Esv00008086sd0000244Ebc06sc04i01',
+        }, driver='pcieport', iommu_group=1)
+        make_device(self.root, '0000:00:00.0', {
+            'vendor': '0x8086',
+            'device': '0x0d57',
+            'class': '0x060000',
+            'revision': '0x00',
+            'subsystem_vendor': '0x0000',
+            'subsystem_device': '0x0000',
+            'numa_node': '-1',
+            'modalias':
+                'pci:v00008086d00000D57sv00000000sd00000000bc06sc00i00',
+        })
+
+        slot_path = self.root / 'bus' / 'pci' / 'slots' / '4'
+        slot_path.mkdir(parents=True)
+        (slot_path / 'address').write_text('0000:00:1c\n')
+
+        self.reader = SysfsReader(
+            self.root,
+            modules_alias=[self.modules_alias, self.root / 'nowhere'],
+        )
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _check_device(self, dev: Device) -> None:
+        self.assertIsInstance(dev, Device)
+        self.assertEqual(str(dev.slot), '0000:00:1c.3')
+        self.assertEqual(dev.cls.id, 0x0604)
+        self.assertIsNone(dev.cls.name)
+        self.assertEqual(dev.vendor.id, 0x8086)
+        self.assertIsNone(dev.vendor.name)
+        self.assertEqual(dev.device.id, 0x244e)
+        assert dev.subsystem_vendor is not None
+        self.assertEqual(dev.subsystem_vendor.id, 0x8086)
+        assert dev.subsystem_device is not None
+        self.assertEqual(dev.subsystem_device.id, 0x244e)
+        self.assertEqual(dev.revision, 0xd5)
+        self.assertEqual(dev.progif, 0x01)
+        self.assertEqual(dev.driver, 'pcieport')
+        self.assertEqual(dev.numa_node, 0)
+        self.assertEqual(dev.iommu_group, 1)
+        self.assertEqual(dev.physical_slot, '4')
+
+    def test_read_device(self) -> None:
+        dev = self.reader.read_device('0000:00:1c.3')
+        self._check_device(dev)
+        self.assertListEqual(dev.kernel_modules, [])
+
+    def test_read_device_kernel_modules(self) -> None:
+        dev = self.reader.read_device('0000:00:1c.3', kernel_modules=True)
+        self._check_device(dev)
+        self.assertListEqual(dev.kernel_modules, ['nouveau', 'nvidia'])
+
+    def test_read_device_empty(self) -> None:
+        """
+        Zero revisions, programming interfaces and subsystem IDs, or a NUMA
+        node of -1, are omitted, as in lspci.
+        """
+        dev = self.reader.read_device('0000:00:00.0', kernel_modules=True)
+        self.assertEqual(str(dev.slot), '0000:00:00.0')
+        self.assertEqual(dev.cls.id, 0x0600)
+        self.assertEqual(dev.vendor.id, 0x8086)
+        self.assertEqual(dev.device.id, 0x0d57)
+        self.assertIsNone(dev.subsystem_vendor)
+        self.assertIsNone(dev.subsystem_device)
+        self.assertIsNone(dev.revision)
+        self.assertIsNone(dev.progif)
+        self.assertIsNone(dev.driver)
+        self.assertListEqual(dev.kernel_modules, [])
+        self.assertIsNone(dev.numa_node)
+        self.assertIsNone(dev.iommu_group)
+        self.assertIsNone(dev.physical_slot)
+
+    def test_read_device_missing(self) -> None:
+        make_device(self.root, '0000:00:02.0', {'numa_node': '0'})
+        dev = self.reader.read_device('0000:00:02.0', kernel_modules=True)
+        self.assertIsNone(dev.cls.id)
+        self.assertIsNone(dev.vendor.id)
+        self.assertIsNone(dev.device.id)
+        self.assertIsNone(dev.revision)
+        self.assertIsNone(dev.progif)
+        self.assertListEqual(dev.kernel_modules, [])
+        self.assertEqual(len(self.reader.read_devices()), 3)
+
+    def test_find_modules(self) -> None:
+        patterns = [
+            'pci:v00008086d00001533sv*sd*bc*sc*i*',
+            'pci:v00008086d*sv*sd*bc02sc00i*',
+            'pci:v*d*sv*sd*bc02sc*i*',
+            'pci:v0000808?d00001533sv*sd*bc*sc*i*',
+            'pci:v00008086d0000153[0-9]sv*sd*bc*sc*i*',
+            'pci:v00008086d00001533sv00001028sd*bc*sc*i*',
+            'pci:v*d*sv*sd*bc*sc*i*',
+            'pci:v000010DEd00001533sv*sd*bc*sc*i*',
+            'pci:v*d*sv*sd*bc03sc*i*',
+        ]
+        self.modules_alias.write_text(''.join(
+            'alias {} module{}\n'.format(pattern, i)
+            for i, pattern in reversed(list(enumerate(patterns)))
+        ))
+        modalias = 'pci:v00008086d00001533sv00001028sd000005A4bc02sc00i00'
+        self.assertListEqual(
+            self.reader._find_modules(modalias),
+            ['module{}'.format(i) for i in reversed(range(7))],
+        )
+        self.assertListEqual(
+            self.reader._find_modules(
+                'pci:v000010DEd00000001sv00000000sd00000000bc03sc00i00'),
+            ['module8', 'module6'],
+        )
+
+    def test_read_devices(self) -> None:
+        devices = self.reader.read_devices(kernel_modules=True)
+        self.assertListEqual(
+            [str(dev.slot) for dev in devices],
+            ['0000:00:00.0', '0000:00:1c.3'],
+        )
+        self._check_device(devices[1])
+        self.assertListEqual(devices[1].kernel_modules, ['nouveau', 'nvidia'])
+
+    def test_config(self) -> None:
+        config_path = self.root / 'bus' / 'pci' / 'devices' / \
+            '0000:00:1c.3' / 'config'
+        config_path.write_bytes(b'\x86\x80\x4e\x24' + bytes(60))
+        # Configuration spaces are only read on request
+        self.assertIsNone(self.reader.read_device('0000:00:1c.3').config)
+        dev = self.reader.read_device('0000:00:1c.3', config=True)
+        config = dev.config
+        assert config is not None
+        self.assertEqual(len(config), 64)
+        self.assertEqual(config.data[0], 0x86)
+        self.assertListEqual(config.capabilities, [])
+        self.assertNotIn('config', dev.as_dict())
+
+        # The configuration space is a snapshot taken when reading the device
+        config_path.write_bytes(bytes(64))
+        self.assertEqual(config.data[0], 0x86)
+        same = self.reader.read_device('0000:00:1c.3', config=True)
+        self.assertEqual(same.config, ConfigSpace(bytes(64)))
+        self.assertNotEqual(dev, same)
+        self.assertEqual(dev, dev._replace())
+        self.assertEqual(
+            hash(config), hash(ConfigSpace(b'\x86\x80\x4e\x24' + bytes(60))))
+
+    def test_config_missing(self) -> None:
+        dev = self.reader.read_device('0000:00:00.0', config=True)
+        assert dev.config is not None
+        self.assertEqual(len(dev.config), 0)
+
+    def test_read_devices_shortcut(self) -> None:
+        devices = read_devices(self.root)
+        self.assertEqual(len(devices), 2)
+        self._check_device(devices[1])
+        self.assertIsNone(devices[1].config)
+        devices = read_devices(self.root, config=True)
+        self.assertIsInstance(devices[1].config, ConfigSpace)
+
+    def test_no_slots(self) -> None:
+        (self.root / 'bus' / 'pci' / 'slots' / '4' / 'address').unlink()
+        (self.root / 'bus' / 'pci' / 'slots' / '4').rmdir()
+        (self.root / 'bus' / 'pci' / 'slots').rmdir()
+        self.assertIsNone(
+            self.reader.read_device('0000:00:1c.3').physical_slot)
@@ -0,0 +1,137 @@
+import pickle
+from unittest import TestCase
+
+from pylspci.device import Device
+from pylspci.fields import NameWithID, Slot
+from pylspci.filters import DeviceFilter, SlotFilter
+from pylspci.table import DeviceTable, StringPool
+
+
+class TestStringPool(TestCase):
+
+    def test_pool(self) -> None:
+        pool = StringPool()
+        self.assertEqual(pool.add('a'), 0)
+        self.assertEqual(pool.add('b'), 1)
+        self.assertEqual(pool.add('a'), 0)
+        self.assertEqual(pool.add(None), -1)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.get(1), 'b')
+        self.assertIsNone(pool.get(-1))
+
+
+class TestDeviceTable(TestCase):
+
+    def setUp(self) -> None:
+        self.devices = [
+            Device(
+                slot=Slot('cafe:13:07.2'),
+                cls=NameWithID('Something [caf3]'),
+                vendor=NameWithID('Something [caf4]'),
+                device=NameWithID('Something [caf5]'),
+                subsystem_vendor=NameWithID('Something [caf6]'),
+                subsystem_device=NameWithID('Something [caf7]'),
+                revision=0,
+                progif=1,
+                driver='self_driving',
+                kernel_modules=['snd-pcsp', 'self_driving'],
+                numa_node=0,
+                iommu_group=1,
+                physical_slot='4-2',
+            ),
+            Device(
+                slot=Slot('00:1c.3/01:00.0'),
+                cls=NameWithID('0604'),
+                vendor=NameWithID('Intel Corporation'),
+                device=NameWithID(''),
+            ),
+            Device(
+                slot=Slot('00:1f.0'),
+                cls=NameWithID('0604'),
+                vendor=NameWithID('Intel Corporation [8086]'),
+                device=NameWithID('244e'),
+                subsystem_vendor=NameWithID(None),
+                subsystem_device=NameWithID('Intel Corporation [8086]'),
+                kernel_modules=['snd-pcsp'],
+            ),
+        ]
+        self.table = DeviceTable(self.devices)
+
+    def test_roundtrip(self) -> None:
+        self.assertEqual(len(self.table), 3)
+        self.assertListEqual(self.table.to_devices(), self.devices)
+        self.assertListEqual(list(self.table), self.devices)
+        self.assertEqual(self.table[-1], self.devices[-1])
+        with self.assertRaises(IndexError):
+            self.table[3]
+
+    def test_optional_fields(self) -> None:
+        dev = self.table[1]
+        self.assertEqual(str(dev.slot), '0000:00:1c.3/0000:01:00.0')
+        self.assertIsNone(dev.subsystem_vendor)
+        self.assertIsNone(dev.subsystem_device)
+        self.assertIsNone(dev.revision)
+        self.assertIsNone(dev.driver)
+        self.assertListEqual(dev.kernel_modules, [])
+        self.assertEqual(dev.device.name, '')
+
+        dev = self.table[2]
+        assert dev.subsystem_vendor is not None
+        self.assertIsNone(dev.subsystem_vendor.id)
+        self.assertIsNone(dev.subsystem_vendor.name)
+
+    def test_large_domain(self) -> None:
+        device = self.devices[2]._replace(slot=Slot('10000:e1:00.0'))
+        table = DeviceTable([device])
+        self.assertEqual(table.domain[0], 0x10000)
+        self.assertEqual(table[0], device)
+
+    def test_columns(self) -> None:
+        self.assertListEqual(list(self.table.domain), [0xcafe, 0, 0])
+        self.assertListEqual(list(self.table.vendor_id), [0xcaf4, -1, 0x8086])
+        self.assertListEqual(list(self.table.revision), [0, -1, -1])
+
+    def test_string_pool(self) -> None:
+        pool = StringPool()
+        first = DeviceTable(self.devices, pool=pool)
+        second = DeviceTable(self.devices, pool=pool)
+        self.assertIs(second.pool, pool)
+        self.assertEqual(len(pool.strings), len(set(pool.strings)))
+        self.assertEqual(
+            pool.strings.count('snd-pcsp'), 1)
+        self.assertListEqual(list(first), list(second))
+
+    def test_slice(self) -> None:
+        table = self.table[1:]
+        self.assertIsInstance(table, DeviceTable)
+        self.assertIs(table.pool, self.table.pool)
+        self.assertListEqual(list(table), self.devices[1:])
+        self.assertListEqual(list(self.table.take([2, 0])),
+                             [self.devices[2], self.devices[0]])
+
+    def test_select(self) -> None:
+        self.assertListEqual(
+            list(self.table.select(device_filter=DeviceFilter(cls=0x0604))),
+            self.devices[1:],
+        )
+        self.assertListEqual(
+            self.table.indexes(
+                slot_filter=SlotFilter(device=0x1f),
+                device_filter=DeviceFilter(cls=0x0604),
+            ),
+            [2],
+        )
+        self.assertListEqual(self.table.indexes(), [0, 1, 2])
+        self.assertListEqual(
+            list(self.table.select(slot_filter=SlotFilter(domain=0xcafe))),
+            self.devices[:1],
+        )
+        self.assertEqual(len(self.table.select()), 3)
+        self.assertEqual(
+            len(self.table.select(device_filter=DeviceFilter(vendor=0x42))),
+            0,
+        )
+
+    def test_pickle(self) -> None:
+        table = pickle.loads(pickle.dumps(self.table))
+        self.assertListEqual(list(table), self.devices)
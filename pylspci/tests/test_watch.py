@@ -0,0 +1,221 @@
+import os
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from pylspci.command import CommandBuilder
+from pylspci.fields import NameWithID, Slot
+from pylspci.filters import DeviceFilter, DeviceQuery
+from pylspci.tests.test_sysfs import make_device
+from pylspci.watch import (
+    DeviceEvent, DeviceWatcher, NetlinkSource, UEvent, watch
+)
+
+BRIDGE = {
+    'vendor': '0x8086',
+    'device': '0x244e',
+    'class': '0x060401',
+    'revision': '0xd5',
+}
+
+NIC = {
+    'vendor': '0x8086',
+    'device': '0x1533',
+    'class': '0x020000',
+    'revision': '0x03',
+}
+
+
+def uevent(action: str, name: str, subsystem: str = 'pci') -> bytes:
+    devpath = '/devices/pci0000:00/{}'.format(name)
+    return '\0'.join([
+        '{}@{}'.format(action, devpath),
+        'ACTION={}'.format(action),
+        'DEVPATH={}'.format(devpath),
+        'SUBSYSTEM={}'.format(subsystem),
+        'PCI_SLOT_NAME={}'.format(name),
+        '',
+    ]).encode('utf-8')
+
+
+class TestUEvent(TestCase):
+
+    def test_parse(self) -> None:
+        event = UEvent.parse(uevent('bind', '0000:00:1c.3'))
+        self.assertIsNotNone(event)
+        assert event is not None
+        self.assertEqual(event.action, 'bind')
+        self.assertEqual(event.devpath, '/devices/pci0000:00/0000:00:1c.3')
+        self.assertEqual(event.subsystem, 'pci')
+        self.assertEqual(event.properties['PCI_SLOT_NAME'], '0000:00:1c.3')
+
+    def test_parse_header_only(self) -> None:
+        event = UEvent.parse(b'remove@/devices/pci0000:00/0000:00:1c.3')
+        self.assertEqual(event, UEvent(
+            action='remove',
+            devpath='/devices/pci0000:00/0000:00:1c.3',
+            properties={},
+        ))
+        assert event is not None
+        self.assertIsNone(event.subsystem)
+
+    def test_parse_udev(self) -> None:
+        # Messages from udev start with a binary header
+        self.assertIsNone(UEvent.parse(b'libudev\0\xfe\xed\xca\xfe'))
+        self.assertIsNone(UEvent.parse(b''))
+
+
+class TestNetlinkSource(TestCase):
+
+    def test_many_sources(self) -> None:
+        try:
+            first = NetlinkSource(poll_interval=0.01)
+        except OSError as e:
+            self.skipTest('Netlink is unavailable: {}'.format(e))
+        with first, NetlinkSource(poll_interval=0.01) as second:
+            self.assertFalse(first.closed)
+            self.assertFalse(second.closed)
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+
+
+class TestDeviceWatcher(TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        make_device(self.root, '0000:00:1c.3', BRIDGE, driver='pcieport')
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def remove_device(self, name: str) -> None:
+        os.unlink(str(self.root / 'bus' / 'pci' / 'devices' / name))
+        shutil.rmtree(str(self.root / 'devices' / 'pci0000:00' / name))
+
+    def test_scan(self) -> None:
+        watcher = DeviceWatcher(self.root)
+        devices = watcher.scan()
+        self.assertEqual(len(devices), 1)
+        self.assertEqual(devices[0].slot, Slot('0000:00:1c.3'))
+        self.assertEqual(devices[0].driver, 'pcieport')
+        self.assertEqual(watcher.devices, {devices[0].slot: devices[0]})
+
+    def test_add_remove(self) -> None:
+        watcher = DeviceWatcher(self.root)
+        watcher.scan()
+
+        make_device(self.root, '0000:01:00.0', NIC)
+        event = watcher.handle(uevent('add', '0000:01:00.0'))
+        assert event is not None
+        self.assertEqual(event.action, 'add')
+        self.assertEqual(event.device.device, NameWithID('1533'))
+        self.assertEqual(len(watcher.devices), 2)
+
+        self.remove_device('0000:01:00.0')
+        removed = watcher.handle(uevent('remove', '0000:01:00.0'))
+        self.assertEqual(removed, DeviceEvent('remove', event.device))
+        self.assertEqual(len(watcher.devices), 1)
+
+        # Removing an unknown device does nothing
+        self.assertIsNone(watcher.handle(uevent('remove', '0000:01:00.0')))
+
+    def test_change(self) -> None:
+        watcher = DeviceWatcher(self.root)
+        watcher.scan()
+
+        # Nothing changed
+        self.assertIsNone(watcher.handle(uevent('change', '0000:00:1c.3')))
+
+        os.unlink(str(
+            self.root / 'devices' / 'pci0000:00' / '0000:00:1c.3' / 'driver'))
+        event = watcher.handle(uevent('unbind', '0000:00:1c.3'))
+        assert event is not None
+        self.assertEqual(event.action, 'change')
+        self.assertIsNone(event.device.driver)
+
+    def test_ignored(self) -> None:
+        watcher = DeviceWatcher(self.root)
+        watcher.scan()
+        self.assertIsNone(watcher.handle(
+            uevent('add', '0000:00:1c.3', subsystem='usb')))
+        self.assertIsNone(watcher.handle(b'libudev\0\xfe\xed\xca\xfe'))
+        # The device disappeared before being read
+        self.assertIsNone(watcher.handle(uevent('add', '0000:02:00.0')))
+
+    def test_config_ignored(self) -> None:
+        watcher = DeviceWatcher(self.root)
+        self.assertIsNone(watcher.scan()[0].config)
+        (self.root / 'bus' / 'pci' / 'devices' / '0000:00:1c.3' /
+         'config').write_bytes(bytes(64))
+        self.assertIsNone(watcher.handle(uevent('change', '0000:00:1c.3')))
+
+    def test_not_a_device(self) -> None:
+        make_device(self.root, '0000:01:00.0', NIC)
+        messages = [
+            uevent('add', 'slots'),
+            uevent('add', '.tmp1234', subsystem='pci'),
+            uevent('remove', '0000:01:00.0'),
+        ]
+        events = list(watch(messages, root=self.root))
+        self.assertEqual([event.action for event in events], ['remove'])
+
+    def test_change_hash_collision(self) -> None:
+        watcher = DeviceWatcher(self.root)
+        device = watcher.scan()[0]
+        # hash(-1) == hash(-2) in CPython
+        watcher.devices[device.slot] = device._replace(numa_node=-2)
+        with patch.object(
+                watcher, '_read', return_value=device._replace(numa_node=-1)):
+            event = watcher.handle(uevent('change', '0000:00:1c.3'))
+        assert event is not None
+        self.assertEqual(event.action, 'change')
+        self.assertEqual(event.device.numa_node, -1)
+
+    def test_query(self) -> None:
+        watcher = DeviceWatcher(self.root, query=DeviceQuery(
+            device_filter=DeviceFilter(cls=0x0200)))
+        self.assertEqual(watcher.scan(), [])
+
+        make_device(self.root, '0000:01:00.0', NIC)
+        self.assertIsNone(watcher.handle(uevent('add', '0000:00:1c.3')))
+        event = watcher.handle(uevent('add', '0000:01:00.0'))
+        assert event is not None
+        self.assertEqual(event.action, 'add')
+        self.assertEqual(list(watcher.devices), [Slot('0000:01:00.0')])
+
+    def test_watch(self) -> None:
+        make_device(self.root, '0000:01:00.0', NIC)
+        messages = [
+            uevent('add', '0000:01:00.0', subsystem='usb'),
+            uevent('remove', '0000:01:00.0'),
+        ]
+        events = list(watch(messages, root=self.root))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].action, 'remove')
+        self.assertEqual(events[0].device.slot, Slot('0000:01:00.0'))
+        self.assertEqual(events[0].as_dict(), {
+            'action': 'remove',
+            'device': events[0].device.as_dict(),
+        })
+
+    def test_watch_initial(self) -> None:
+        events = list(watch([], root=self.root, initial=True))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].action, 'add')
+        self.assertEqual(events[0].device.slot, Slot('0000:00:1c.3'))
+
+    def test_builder(self) -> None:
+        make_device(self.root, '0000:01:00.0', NIC)
+        builder = CommandBuilder() \
+            .use_sysfs(self.root) \
+            .with_names(False) \
+            .device_filter(cls=0x0200)
+        events = list(builder.watch(
+            [uevent('remove', '0000:01:00.0')], initial=True))
+        self.assertEqual(
+            [(event.action, str(event.device.slot)) for event in events],
+            [('add', '0000:01:00.0'), ('remove', '0000:01:00.0')],
+        )
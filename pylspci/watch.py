@@ -0,0 +1,340 @@
+import os
+import socket
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from pylspci.device import Device, DeviceDict
+from pylspci.fields import Slot
+from pylspci.filters import DeviceQuery
+from pylspci.pciids import PciIdsDatabase
+from pylspci.sysfs import DEFAULT_SYSFS_PATH, OptionalPath, SysfsReader
+
+NETLINK_KOBJECT_UEVENT = 15
+"""
+Netlink protocol used by the kernel to broadcast uevents.
+"""
+
+UEVENT_GROUP_KERNEL = 1
+"""
+Netlink multicast group receiving uevents directly from the kernel,
+rather than after their processing by udev.
+"""
+
+
+class UEvent(NamedTuple):
+    """
+    A kernel uevent, as received from netlink.
+    """
+
+    action: str
+    """
+    The event's action, such as ``add``, ``remove``, ``change``, ``bind``
+    or ``unbind``.
+    """
+
+    devpath: str
+    """
+    Path of the device in ``/sys``, such as
+    ``/devices/pci0000:00/0000:00:1c.0``.
+    """
+
+    properties: Dict[str, str]
+    """
+    Properties sent with the event, such as ``SUBSYSTEM`` or
+    ``PCI_SLOT_NAME``.
+    """
+
+    @property
+    def subsystem(self) -> Optional[str]:
+        """
+        The subsystem of the device, such as ``pci``.
+        """
+        return self.properties.get('SUBSYSTEM')
+
+    @classmethod
+    def parse(cls, data: bytes) -> Optional['UEvent']:
+        """
+        Parse a uevent message, made of an ``action@devpath`` header and
+        ``KEY=value`` properties, separated by null bytes.
+
+        :param bytes data: A message received from netlink.
+        :returns: The parsed event, or None if the message is not a kernel
+           uevent, such as a message from udev.
+        :rtype: UEvent or None
+        """
+        header, _, body = data.partition(b'\0')
+        action, at, devpath = header.decode('utf-8', 'replace').partition('@')
+        if not at or not devpath:
+            return None
+        properties: Dict[str, str] = {}
+        for line in body.split(b'\0'):
+            key, equal, value = line.decode('utf-8', 'replace').partition('=')
+            if equal:
+                properties[key] = value
+        return cls(
+            action=properties.get('ACTION', action),
+            devpath=properties.get('DEVPATH', devpath),
+            properties=properties,
+        )
+
+
+class NetlinkSource(object):
+    """
+    Receives kernel uevents from a netlink socket. This only works on Linux.
+
+    Iterating over the source blocks until events are received, and stops
+    once :meth:`close` has been called, possibly from another thread.
+
+    :param float poll_interval: Maximum time in seconds to wait for an event
+       before checking whether the source has been closed.
+    :param int buffer_size: Size of the socket's receive buffer. Bursts of
+       events, such as when enabling many SR-IOV virtual functions, can be
+       lost when it is too small.
+    :raises OSError: Netlink is unavailable.
+    """
+
+    def __init__(self,
+                 poll_interval: float = 1.0,
+                 buffer_size: int = 1024 * 1024) -> None:
+        family = getattr(socket, 'AF_NETLINK', None)
+        if family is None:
+            raise OSError('Netlink sockets are only available on Linux')
+        self._socket = socket.socket(
+            family, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        try:
+            self._socket.setsockopt(
+                socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+            # Let the kernel pick a unique port ID, as the process ID is
+            # already taken by the first netlink socket of the process
+            self._socket.bind((0, UEVENT_GROUP_KERNEL))
+        except OSError:
+            self._socket.close()
+            raise
+        self._socket.settimeout(poll_interval)
+        self.closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        while not self.closed:
+            try:
+                yield self._socket.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self.closed:
+                    return
+                raise
+
+    def close(self) -> None:
+        """
+        Stop receiving events and close the socket.
+        """
+        self.closed = True
+        self._socket.close()
+
+    def __enter__(self) -> 'NetlinkSource':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+class DeviceEvent(NamedTuple):
+    """
+    Describes a device that was added, removed or changed.
+    """
+
+    action: str
+    """
+    ``add``, ``remove`` or ``change``.
+    """
+
+    device: Device
+    """
+    The added or changed device, or the removed device as it was last seen.
+    """
+
+    def as_dict(self) -> Dict[str, Union[str, DeviceDict]]:
+        """
+        Serialize this event as a JSON-serializable `dict`.
+        """
+        return {
+            'action': self.action,
+            'device': self.device.as_dict(),
+        }
+
+
+def _slot_name(event: UEvent) -> str:
+    return event.properties.get('PCI_SLOT_NAME') \
+        or os.path.basename(event.devpath)
+
+
+class DeviceWatcher(object):
+    """
+    Keeps track of the PCI devices found in sysfs, and updates them from
+    kernel uevents, reading again only the device affected by each event.
+
+    :param root: Path to the sysfs mount point.
+    :type root: str or Path or None
+    :param bool kernel_modules: Also look for the kernel modules able to
+       handle each device.
+    :param query: Only keep track of devices matching a query.
+    :type query: DeviceQuery or None
+    :param database: A PCI ID database to add names to the devices.
+    :type database: PciIdsDatabase or None
+    """
+
+    devices: Dict[Slot, Device]
+    """
+    The devices currently known, by slot.
+    """
+
+    def __init__(self,
+                 root: OptionalPath = DEFAULT_SYSFS_PATH,
+                 kernel_modules: bool = False,
+                 query: Optional[DeviceQuery] = None,
+                 database: Optional[PciIdsDatabase] = None) -> None:
+        self.reader = SysfsReader(root)
+        self.kernel_modules = kernel_modules
+        self.query = query
+        self.database = database
+        self.devices = {}
+
+    def _read(self,
+              name: str,
+              physical_slots: Optional[Dict[str, str]] = None,
+              ) -> Optional[Device]:
+        if not (self.reader.devices_path / name).exists():
+            return None
+        try:
+            # Configuration spaces are not read, as their registers change
+            # at runtime and would turn every uevent into a change
+            device = self.reader.read_device(
+                name,
+                kernel_modules=self.kernel_modules,
+                physical_slots=physical_slots,
+            )
+        except (OSError, ValueError):
+            # The device was removed while reading it
+            return None
+        if self.query is not None and not self.query.matches(device):
+            return None
+        if self.database is not None:
+            device = self.database.resolve(device)
+        return device
+
+    def scan(self) -> List[Device]:
+        """
+        Read all the devices from sysfs, replacing the known devices.
+
+        :returns: The devices, sorted by slot.
+        :rtype: List[Device]
+        """
+        self.devices = {}
+        physical_slots = self.reader._read_physical_slots()
+        for name in sorted(os.listdir(str(self.reader.devices_path))):
+            device = self._read(name, physical_slots)
+            if device is not None:
+                self.devices[device.slot] = device
+        return list(self.devices.values())
+
+    def handle(self, message: bytes) -> Optional[DeviceEvent]:
+        """
+        Update the known devices from a uevent message.
+
+        :param bytes message: A raw uevent message, as received from netlink.
+        :returns: An event if a device was added, removed or changed.
+        :rtype: DeviceEvent or None
+        """
+        event = UEvent.parse(message)
+        if event is None or event.subsystem != 'pci':
+            return None
+        name = _slot_name(event)
+        try:
+            slot = Slot(name)
+        except ValueError:
+            # Not a PCI device, such as a PCI slot or a bus
+            return None
+        old = self.devices.get(slot)
+        # The device is gone or does not match the query anymore
+        new = None if event.action == 'remove' else self._read(name)
+        if new is None:
+            if old is None:
+                return None
+            del self.devices[slot]
+            return DeviceEvent('remove', old)
+        self.devices[slot] = new
+        if old is None:
+            return DeviceEvent('add', new)
+        if new != old:
+            return DeviceEvent('change', new)
+        return None
+
+    def watch(self,
+              source: Optional[Iterable[bytes]] = None,
+              initial: bool = False) -> Iterator[DeviceEvent]:
+        """
+        Scan the devices, then watch for devices being added, removed or
+        changed.
+
+        :param source: An iterable of raw uevent messages, as received from
+           netlink. Defaults to a new :class:`NetlinkSource`, closed when
+           the iterator is closed.
+        :type source: Iterable[bytes] or None
+        :param bool initial: Start by reporting all the current devices
+           as added.
+        :returns: An endless iterator of events, unless the source ends.
+        :rtype: Iterator[DeviceEvent]
+        :raises OSError: Netlink is unavailable.
+        """
+        netlink: Optional[NetlinkSource] = None
+        if source is None:
+            # Listen before scanning to not miss any event
+            source = netlink = NetlinkSource()
+        try:
+            for device in self.scan():
+                if initial:
+                    yield DeviceEvent('add', device)
+            for message in source:
+                event = self.handle(message)
+                if event is not None:
+                    yield event
+        finally:
+            if netlink is not None:
+                netlink.close()
+
+
+def watch(source: Optional[Iterable[bytes]] = None,
+          root: OptionalPath = DEFAULT_SYSFS_PATH,
+          kernel_modules: bool = False,
+          query: Optional[DeviceQuery] = None,
+          database: Optional[PciIdsDatabase] = None,
+          initial: bool = False) -> Iterator[DeviceEvent]:
+    """
+    Watch for PCI devices being added, removed or changed, such as on
+    hotplug, when enabling SR-IOV virtual functions or when binding a
+    device to another driver. Kernel uevents are received from netlink,
+    and only the device affected by each event is read again from sysfs.
+    Shortcut for :meth:`DeviceWatcher.watch`.
+
+    :param source: An iterable of raw uevent messages, as received from
+       netlink. Defaults to a new :class:`NetlinkSource`.
+    :type source: Iterable[bytes] or None
+    :param root: Path to the sysfs mount point.
+    :type root: str or Path or None
+    :param bool kernel_modules: Also look for the kernel modules able to
+       handle each device.
+    :param query: Only report devices matching a query.
+    :type query: DeviceQuery or None
+    :param database: A PCI ID database to add names to the devices.
+    :type database: PciIdsDatabase or None
+    :param bool initial: Start by reporting all the current devices
+       as added.
+    :returns: An endless iterator of events, unless the source ends.
+    :rtype: Iterator[DeviceEvent]
+    :raises OSError: Netlink is unavailable.
+    """
+    return DeviceWatcher(
+        root,
+        kernel_modules=kernel_modules,
+        query=query,
+        database=database,
+    ).watch(source, initial=initial)
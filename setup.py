@@ -16,10 +16,17 @@ setup(
     version=open('VERSION').read().strip(),
     author='Lucidiot',
     packages=find_packages(
-        exclude=["*.tests", "*.tests.*", "tests.*", "tests"],
+        exclude=[
+            "*.tests", "*.tests.*", "tests.*", "tests",
+            "benchmarks", "benchmarks.*",
+        ],
     ),
     entry_points={
-        'console_scripts': ['pylspci=pylspci.__main__:main'],
+        'console_scripts': [
+            'pylspci=pylspci.__main__:main',
+            'pylspci-batch=pylspci.batch:main',
+            'pylspci-diff=pylspci.diff:main',
+        ],
     },
     package_data={
         '': ['VERSION', 'LICENSE', 'README.rst'],
@@ -29,6 +36,8 @@ setup(
     install_requires=requirements,
     extras_require={
         'dev': dev_requirements,
+        'orjson': ['orjson>=3.0'],
+        'msgpack': ['msgpack>=1.0'],
     },
     test_suite='pylspci.tests',
     license='GNU General Public License 3',